@@ -84,6 +84,7 @@
 
 from src.retrieval.search import FaissSearcher
 from src.reasoning.mt5_reasoner import MT5Reasoner
+from src.core.model_pool import get_model_pool
 
 def build_context(results, all_chunks, window=2, max_chars=900):
     collected, used, total = [], set(), 0
@@ -105,8 +106,7 @@ def build_context(results, all_chunks, window=2, max_chars=900):
     return "\n".join(collected)
 
 def answer_question(question: str, top_k: int = 20):
-    llm = MT5Reasoner()
-    searcher = FaissSearcher()
+    searcher = FaissSearcher.load_current()
 
     results = searcher.search(question, top_k=top_k)
     print("results\n:", results[:5])  # debug
@@ -132,10 +132,12 @@ def answer_question(question: str, top_k: int = 20):
 """.strip()
 
 
-    print("Prompt tokens:", len(llm.tokenizer.encode(prompt))) 
-    print("\nPrompt sent to model:\n", prompt)
+    # held (not evicted by the model pool) until generation ends
+    with get_model_pool().use("mt5", MT5Reasoner) as llm:
+        print("Prompt tokens:", len(llm.tokenizer.encode(prompt)))
+        print("\nPrompt sent to model:\n", prompt)
 
-    return llm.generate(prompt)
+        return llm.generate(prompt)
 
 if __name__ == "__main__":
     q = input("Enter your question: ").strip()
@@ -0,0 +1,180 @@
+import asyncio
+import contextvars
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from src.core.config import get_section
+from src.core.tracing import record_stage
+from src.core.deadline import deadline_after
+from src.utils.text import normalize_query
+
+
+class StageOverloaded(RuntimeError):
+    """A stage queue is full; the request should be rejected (503)."""
+
+
+class StageExecutor:
+    """Bounded thread pool for one pipeline stage.
+
+    `workers` threads run the stage; at most `max_queue` jobs may wait behind
+    them before new ones are rejected. Queue depth, running jobs and wait
+    time are tracked so each stage can be tuned on its own.
+    """
+
+    def __init__(self, name: str, workers: int = 1, max_queue: int = 64):
+        self.name = name
+        self.workers = workers
+        self.max_queue = max_queue
+        self.pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix=f"{name}-stage")
+
+        self._lock = threading.Lock()
+        self.queued = 0
+        self.running = 0
+        self.completed = 0
+        self.rejected = 0
+        self._wait_total = 0.0
+        self._run_total = 0.0
+
+    def _call(self, submitted, fn, args, kwargs):
+        started = time.perf_counter()
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+            self._wait_total += started - submitted
+        record_stage(f"{self.name}_queue", started - submitted)
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self.running -= 1
+                self.completed += 1
+                self._run_total += time.perf_counter() - started
+
+    async def run(self, fn, *args, **kwargs):
+        with self._lock:
+            if self.queued >= self.max_queue:
+                self.rejected += 1
+                raise StageOverloaded(f"{self.name} queue full ({self.queued} waiting)")
+            self.queued += 1
+
+        # run in a copy of the caller's context so the request trace follows the job
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(
+            self.pool, context.run, self._call, time.perf_counter(), fn, args, kwargs
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            done = self.completed or 1
+            return {
+                "workers": self.workers,
+                "queued": self.queued,
+                "running": self.running,
+                "completed": self.completed,
+                "rejected": self.rejected,
+                "avg_wait_ms": round(1000 * self._wait_total / done, 1),
+                "avg_run_ms": round(1000 * self._run_total / done, 1),
+            }
+
+    def shutdown(self):
+        self.pool.shutdown(wait=False)
+
+
+class AskPipeline:
+    """Async /ask path over ChatModel's stages.
+
+    Language detection and retrieval (encoder + FAISS) run concurrently on
+    their own executors; generation runs on a separate, smaller one, so a
+    slow generation never blocks retrieval for other requests. Cache lookups
+    (semantic FAISS search, answer-cache disk reads) run on the retrieval
+    executor too, so the event loop never touches the index or the disk.
+    """
+
+    STAGES = ("detect", "retrieval", "generation")
+
+    def __init__(self, chat, executors: dict = None):
+        cfg = executors if executors is not None else (get_section("serving").get("executors") or {})
+        self.chat = chat
+        self.stages = {}
+        for name in self.STAGES:
+            stage_cfg = cfg.get(name) or {}
+            self.stages[name] = StageExecutor(
+                name,
+                workers=stage_cfg.get("workers", 1),
+                max_queue=stage_cfg.get("max_queue", 64)
+            )
+
+    async def answer(self, question: str, top_k: int = None, timeout: float = None, profile: str = None):
+        deadline = deadline_after(timeout)
+
+        query_lang, data = await asyncio.gather(
+            self.stages["detect"].run(self.chat.detect, question),
+            self.stages["retrieval"].run(self.chat.retrieve, question, top_k)
+        )
+
+        cached = await self.stages["retrieval"].run(self.chat.lookup, question, query_lang, data, profile)
+        if cached is not None:
+            return cached
+
+        return await self.stages["generation"].run(
+            self.chat.respond, question, query_lang, data, deadline, profile
+        )
+
+    async def answer_batch(self, questions: list, top_k: int = None, timeout: float = None, profile: str = None,
+                           group_size: int = 8):
+        """Answer many questions, yielding (index, result, cached) as they finish.
+
+        Retrieval is one batched encode + FAISS search. Cached answers are
+        yielded first; the rest is generated in groups of `group_size`
+        prompts, each group with its own `timeout` budget. Repeated questions
+        in a batch are generated once.
+        """
+        if not questions:
+            return
+        query_langs, contexts = await asyncio.gather(
+            self.stages["detect"].run(self.chat.detect_batch, questions),
+            self.stages["retrieval"].run(self.chat.retrieve_batch, questions, top_k)
+        )
+
+        hits = await self.stages["retrieval"].run(
+            self._lookup_batch, questions, query_langs, contexts, profile
+        )
+
+        pending = {}   # (normalized question, language) -> indices
+        for i, (question, cached) in enumerate(zip(questions, hits)):
+            if cached is not None:
+                yield i, cached, True
+                continue
+            pending.setdefault((normalize_query(question), query_langs[i]), []).append(i)
+
+        groups = list(pending.values())
+        for start in range(0, len(groups), group_size):
+            chunk = groups[start:start + group_size]
+            items = [(questions[g[0]], query_langs[g[0]], contexts[g[0]]) for g in chunk]
+
+            results = await self.stages["generation"].run(
+                self.chat.respond_batch, items, deadline_after(timeout), profile
+            )
+            for indices, result in zip(chunk, results):
+                for i in indices:
+                    yield i, result, False
+
+    def _lookup_batch(self, questions, query_langs, contexts, profile):
+        return [self.chat.lookup(q, lang, data, profile) for q, lang, data in zip(questions, query_langs, contexts)]
+
+    async def warm_up(self, question: str):
+        """Run `question` once through every stage (single and batched), bypassing the caches."""
+        query_lang, data = await asyncio.gather(
+            self.stages["detect"].run(self.chat.detect, question),
+            self.stages["retrieval"].run(self.chat.retrieve, question)
+        )
+        await self.stages["retrieval"].run(self.chat.retrieve_batch, [question, question])
+        await self.stages["generation"].run(self.chat.generate, question, query_lang, data)
+
+    def stats(self) -> dict:
+        return {name: stage.stats() for name, stage in self.stages.items()}
+
+    def shutdown(self):
+        for stage in self.stages.values():
+            stage.shutdown()
@@ -0,0 +1,188 @@
+"""
+Opt-in traffic recorder for /ask (serving.recorder in settings.yaml).
+
+One compact JSON line per request ("t" is when it arrived), appended to
+<dir>/traffic-<pid>.jsonl (one file per worker process, so forked workers
+never interleave):
+
+    {"t": 1718000000.123, "q": "Namaz ki kitni rakat hain?", "lang": "roman",
+     "profile": null, "status": 200, "ms": 412.5, "ids": ["abc_12", ...],
+     "cache": "exact", "shared": false, "v": "20240610-101500",
+     "stages": {"detect": 1.2, "encode": 20.1, ...}}
+
+`record` only queues the line; a writer thread per process does the file
+I/O, so the request path never blocks on disk. When `max_pending` lines are
+waiting, new ones are dropped (and counted).
+
+Past `max_mb` the file is gzipped to traffic-<pid>-<timestamp>.jsonl.gz and a
+new one is started; only the newest `keep` rotated files are kept.
+`read_records` yields everything back in time order for src.bench.replay.
+"""
+import glob
+import gzip
+import json
+import os
+import queue
+import random
+import shutil
+import threading
+import time
+from src.core.config import get_section
+from src.core.logging import logger
+
+_RECORDER = None
+
+
+class TrafficRecorder:
+    def __init__(self, directory: str, max_mb: float = 64, keep: int = 10, sample_rate: float = 1.0,
+                 max_pending: int = 10000):
+        self.directory = directory
+        self.max_bytes = int(max_mb * 2 ** 20)
+        self.keep = keep
+        self.sample_rate = sample_rate
+        self.max_pending = max_pending
+        self.recorded = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._fd = None
+        self._pid = None
+        self._queue = None
+        self._writer_pid = None
+
+    @property
+    def path(self) -> str:
+        return os.path.join(self.directory, f"traffic-{os.getpid()}.jsonl")
+
+    def _open(self):
+        # reopen after fork: the file is per process
+        if self._fd is None or self._pid != os.getpid():
+            os.makedirs(self.directory, exist_ok=True)
+            self._fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+            self._pid = os.getpid()
+        return self._fd
+
+    def _pending(self) -> queue.Queue:
+        # threads do not survive fork: start this process's writer on first use
+        if self._writer_pid != os.getpid():
+            with self._lock:
+                if self._writer_pid != os.getpid():
+                    self._queue = queue.Queue(self.max_pending)
+                    threading.Thread(
+                        target=self._drain, args=(self._queue,), name="traffic-recorder", daemon=True
+                    ).start()
+                    self._writer_pid = os.getpid()
+        return self._queue
+
+    def record(self, question: str, status: int, latency_ms: float, profile: str = None, trace=None,
+               shared: bool = False, index_version: str = None):
+        """Queue one request for the writer thread; never blocks on disk."""
+        if self.sample_rate < 1.0 and random.random() >= self.sample_rate:
+            return
+        notes = trace.notes if trace is not None else {}
+        entry = {
+            # arrival time: replay sends requests on this schedule
+            "t": round(time.time() - latency_ms / 1000, 3),
+            "q": question,
+            "lang": notes.get("lang"),
+            "profile": profile,
+            "status": status,
+            "ms": round(latency_ms, 1),
+            "ids": notes.get("chunk_ids"),
+            "cache": notes.get("cache"),
+            "shared": shared,
+            "v": index_version,
+            "stages": trace.breakdown()["stages_ms"] if trace is not None else None,
+        }
+        line = (json.dumps(entry, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        try:
+            self._pending().put_nowait(line)
+        except queue.Full:
+            # recording must never slow down or fail a request
+            self.dropped += 1
+
+    def _drain(self, pending: queue.Queue):
+        while True:
+            lines = [pending.get()]
+            while True:
+                try:
+                    lines.append(pending.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(b"".join(lines), len(lines))
+            finally:
+                for _ in lines:
+                    pending.task_done()
+
+    def _write(self, data: bytes, count: int):
+        try:
+            with self._lock:
+                fd = self._open()
+                os.write(fd, data)
+                self.recorded += count
+                if os.fstat(fd).st_size >= self.max_bytes:
+                    self._rotate()
+        except OSError as e:
+            logger.warning(f"Traffic recorder write failed: {e}")
+
+    def flush(self, timeout: float = 5.0) -> bool:
+        """Wait until every queued line is written; False on timeout."""
+        end = time.monotonic() + timeout
+        while self._queue is not None and self._writer_pid == os.getpid() and self._queue.unfinished_tasks:
+            if time.monotonic() >= end:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def _rotate(self):
+        os.close(self._fd)
+        self._fd = None
+        stamp = time.strftime("%Y%m%d-%H%M%S")
+        target, n = os.path.join(self.directory, f"traffic-{os.getpid()}-{stamp}.jsonl.gz"), 1
+        while os.path.exists(target):
+            n += 1
+            target = os.path.join(self.directory, f"traffic-{os.getpid()}-{stamp}.{n}.jsonl.gz")
+        with open(self.path, "rb") as src, gzip.open(target, "wb") as dst:
+            shutil.copyfileobj(src, dst)
+        os.remove(self.path)
+
+        rotated = sorted(glob.glob(os.path.join(self.directory, "traffic-*-*.jsonl.gz")), key=os.path.getmtime)
+        for old in rotated[:-self.keep] if self.keep else []:
+            os.remove(old)
+
+    def stats(self) -> dict:
+        return {"dir": self.directory, "recorded": self.recorded, "dropped": self.dropped,
+                "sample_rate": self.sample_rate}
+
+
+def read_records(path: str):
+    """Records from a traffic file (.jsonl or .jsonl.gz) or a recorder directory, oldest first."""
+    files = sorted(glob.glob(os.path.join(path, "traffic-*.jsonl*"))) if os.path.isdir(path) else [path]
+    records = []
+    for name in files:
+        opener = gzip.open if name.endswith(".gz") else open
+        with opener(name, "rt", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    continue   # torn last line of a crashed worker
+    records.sort(key=lambda r: r.get("t", 0))
+    return records
+
+
+def get_recorder():
+    """Shared TrafficRecorder from serving.recorder in settings.yaml (None if disabled)."""
+    global _RECORDER
+    if _RECORDER is None:
+        cfg = get_section("serving").get("recorder") or {}
+        if not cfg.get("enabled"):
+            return None
+        _RECORDER = TrafficRecorder(
+            cfg.get("dir") or "data/traffic",
+            max_mb=float(cfg.get("max_mb") or 64),
+            keep=int(cfg.get("keep") or 10),
+            sample_rate=float(cfg.get("sample_rate", 1.0)),
+            max_pending=int(cfg.get("max_pending") or 10000)
+        )
+    return _RECORDER
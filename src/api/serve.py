@@ -0,0 +1,141 @@
+"""
+Preload-then-fork API server.
+
+    python -m src.api.serve --workers 4 --port 8000
+
+The master process imports src.app once (models + FAISS index, the index
+memory-mapped read-only), opens the listening socket and then forks the
+workers. Model weights and the index stay shared copy-on-write, so N
+workers cost roughly the RAM of one plus each worker's own heap. Running
+`uvicorn --workers N` instead loads everything N times.
+
+The master must not run inference before forking: torch / OpenMP thread
+pools do not survive fork(). Each worker runs its own warm-up query at
+startup and reports ready on /readyz. Per-worker memory is at GET /memory or
+`python -m src.api.serve --report <master pid>`.
+"""
+import argparse
+import gc
+import json
+import os
+import signal
+import socket
+import sys
+import time
+from src.core.config import get_section
+from src.core.logging import logger
+from src.core.memory import worker_memory_report
+
+MASTER_ENV = "RAG_SERVE_MASTER_PID"
+
+# A worker that dies sooner than this after start is not restarted
+MIN_UPTIME = 10.0
+
+
+def _listen(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _run_worker(app, sock, index: int, log_level: str):
+    import uvicorn
+    from src.core.threads import configure_threads
+
+    # default handlers back; uvicorn installs its own for a graceful stop
+    signal.signal(signal.SIGTERM, signal.SIG_DFL)
+    signal.signal(signal.SIGINT, signal.SIG_DFL)
+    configure_threads("api", worker_index=index)
+
+    config = uvicorn.Config(app, log_level=log_level, lifespan="on")
+    uvicorn.Server(config).run(sockets=[sock])
+
+
+def serve(workers: int, host: str, port: int, backlog: int = 2048, log_level: str = "info"):
+    os.environ[MASTER_ENV] = str(os.getpid())
+
+    # 1. Load everything once, in the master
+    started = time.perf_counter()
+    from src.app import app, load_components
+    load_components()
+    logger.info(f"Models and index loaded in {time.perf_counter() - started:.1f}s")
+
+    sock = _listen(host, port, backlog)
+
+    # 2. Keep the GC from touching (and so copying) the preloaded objects
+    gc.collect()
+    gc.freeze()
+
+    children = {}   # pid -> (worker index, start time)
+    stopping = False
+
+    def spawn(index):
+        pid = os.fork()
+        if pid == 0:
+            code = 0
+            try:
+                _run_worker(app, sock, index, log_level)
+            except Exception:
+                logger.exception(f"Worker {index} crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        children[pid] = (index, time.monotonic())
+        logger.info(f"Started worker {index} (pid {pid})")
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    # 3. Fork the workers and keep them running
+    for index in range(workers):
+        spawn(index)
+    logger.info(f"Serving on http://{host}:{port} with {workers} workers (master pid {os.getpid()})")
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        index, since = children.pop(pid, (None, None))
+        if index is None or stopping:
+            continue
+
+        uptime = time.monotonic() - since
+        logger.warning(f"Worker {index} (pid {pid}) exited with status {status} after {uptime:.0f}s")
+        if uptime < MIN_UPTIME:
+            logger.error(f"Worker {index} is failing at startup, not restarting it")
+            continue
+        spawn(index)
+
+    sock.close()
+
+
+if __name__ == "__main__":
+    cfg = get_section("serving")
+    parser = argparse.ArgumentParser(description="Serve the API with preloaded, fork-shared models")
+    parser.add_argument("--workers", type=int, default=int(cfg.get("workers") or 1))
+    parser.add_argument("--host", default=cfg.get("host") or "0.0.0.0")
+    parser.add_argument("--port", type=int, default=int(cfg.get("port") or 8000))
+    parser.add_argument("--log-level", default="info")
+    parser.add_argument("--report", type=int, metavar="PID", help="print the memory report of a running master")
+    args = parser.parse_args()
+
+    if args.report:
+        print(json.dumps(worker_memory_report(args.report), indent=2))
+        sys.exit(0)
+
+    serve(args.workers, args.host, args.port, log_level=args.log_level)
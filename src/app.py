@@ -1,9 +1,33 @@
+import asyncio
+import json
 import logging
+import os
 import sys
-from fastapi import FastAPI
-from pydantic import BaseModel
-from src.chat.model_loader import ModelLoader
-from src.chat.chat_model import ChatModel
+import time
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, Field
+from src.core.threads import apply_library_threads, configure_threads, applied_settings
+
+# Thread environment must be in place before torch / FAISS spin up their pools;
+# their own thread counts are set once load_components has imported them
+configure_threads("api")
+
+from src.core.config import get_section
+from src.core.logging import logger
+from src.core.startup import Startup
+from src.reasoning.profiles import get_profile, get_profiles, profile_latency
+from src.cache.single_flight import AsyncSingleFlight
+from src.api.pipeline import AskPipeline, StageOverloaded
+from src.retrieval.shards import ShardsUnavailable
+from src.utils.text import normalize_query
+from src.core.memory import process_memory, worker_memory_report
+from src.core.metrics import CONTENT_TYPE, REGISTRY
+from src.core.tracing import current_trace, start_trace
+from src.api.recorder import get_recorder
+from src.core.profiling import get_profiler
+from src.core.model_pool import get_model_pool
+from src.translation.service import get_translation_service
 
 sys.stdout.reconfigure(encoding="utf-8")
 logging.basicConfig(level=logging.INFO, handlers=[logging.StreamHandler(sys.stdout)])
@@ -14,19 +38,366 @@ app = FastAPI(
     version="1.0.0"
 )
 
-model_loader = ModelLoader()
-chat = ChatModel(model_loader)
+# Models, index and pipeline are built by load_components(), on a background
+# thread at startup (or in the master before forking, see src.api.serve), so
+# the server binds at once and /readyz reports when it can take traffic.
+startup = Startup()
+chat = None
+pipeline = None
+index_watcher = None
+
+RETRIEVAL = get_section("retrieval")
+WARMUP_QUESTION = "What is Imaan?"
+
+def load_components(state: Startup = startup):
+    """Import and build everything heavy, timing each component. Idempotent."""
+    global chat, pipeline, index_watcher
+    if chat is not None:
+        return
+    state.state = "loading"
+
+    with state.timed("imports"):
+        from src.chat.model_loader import load_reasoner
+        from src.chat.chat_model import ChatModel
+        from src.storage.retriever import Retriever
+        from src.retrieval.index_watcher import IndexWatcher
+
+    with state.timed("llm"):
+        # pipeline.reasoner / pipeline.model; STUB_LLM=true loads no model (load tests).
+        # Pinned in the model pool: counted against its budget, never evicted.
+        model_loader = get_model_pool().get("chat", load_reasoner, pinned=True)
+    with state.timed("retriever"):
+        retriever = Retriever()
+    # torch and FAISS are imported by now
+    apply_library_threads()
+    with state.timed("chat"):
+        loaded = ChatModel(model_loader, retriever=retriever)
+
+    # detect / retrieval / generation stages on their own bounded executors
+    pipeline = AskPipeline(loaded)
+    # New index bundles (CURRENT pointer) are loaded in the background and swapped in
+    index_watcher = IndexWatcher(retriever, interval=RETRIEVAL.get("watch_interval") or 30)
+    chat = loaded
+
+def _start(state: Startup):
+    load_components(state)
+
+    # one question through every stage executor: JIT, allocator and tokenizer warm-up
+    state.state = "warming"
+    with state.timed("warmup"):
+        asyncio.run(pipeline.warm_up(WARMUP_QUESTION))
+
+    # per process (each forked worker under src.api.serve runs its own);
+    # shard servers reload their own bundles
+    if RETRIEVAL.get("watch_interval") and not hasattr(chat.retriever.searcher, "endpoints"):
+        index_watcher.start()
+
+@app.on_event("startup")
+def start_loading():
+    startup.run_in_background(_start)
+
+def _require_ready():
+    if not startup.ready:
+        raise HTTPException(status_code=503, detail=f"Service {startup.state}", headers={"Retry-After": "5"})
+
+# Prometheus metrics; stage timings and token counts come from src.core.tracing
+REQUESTS = REGISTRY.counter("rag_http_requests_total", "HTTP requests", ["endpoint", "status"])
+REQUEST_SECONDS = REGISTRY.histogram("rag_http_request_seconds", "HTTP request latency", ["endpoint"])
+ANSWER_SECONDS = REGISTRY.histogram("rag_answer_seconds", "/ask latency per decoding profile", ["profile", "shared"])
+
+# Per-endpoint latency budgets (seconds), see serving.deadlines in settings.yaml
+DEADLINES = get_section("serving").get("deadlines") or {}
+
+# Identical questions arriving together share one retrieval + generation
+inflight = AsyncSingleFlight()
+
+# Opt-in /ask traffic log for src.bench.replay (serving.recorder)
+recorder = get_recorder()
+
+# Opt-in per-request cProfile + torch.profiler traces (serving.profiling)
+profiler = get_profiler()
 
 class QuestionRequest(BaseModel):
     question: str
+    # decoding speed tier: fast | balanced | quality (None = model defaults)
+    profile: str | None = None
+    # attach the per-stage timing breakdown to the response
+    timings: bool = False
+
+class BatchRequest(BaseModel):
+    # an empty batch is a 422, not a stream that fails after the 200
+    questions: list[str] = Field(min_length=1)
+    profile: str | None = None
 
 class AnswerResponse(BaseModel):
     answer: str
     sources: list[str] | None = []
+    profile: str | None = None
+    latency_ms: float | None = None
+    index_version: str | None = None
+    timings: dict | None = None
+
+def _check_profile(profile):
+    if profile:
+        try:
+            get_profile(profile)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+def _profile_requested(request: Request) -> bool:
+    flag = request.headers.get("X-Debug-Profile") or request.query_params.get("debug_profile")
+    return (flag or "").lower() in ("1", "true", "yes")
+
+async def _traced_answer(question, **kwargs):
+    """pipeline.answer plus the trace it ran under (the leader's, for coalesced callers)."""
+    return await pipeline.answer(question, **kwargs), current_trace()
 
 @app.post("/ask", response_model=AnswerResponse)
-def ask_question(req: QuestionRequest):
-    result = chat.answer(req.question)
-    if isinstance(result, dict):
-        return result
-    return {"answer": str(result), "sources": []}
+async def ask_question(req: QuestionRequest, request: Request, http_response: Response):
+    _require_ready()
+    _check_profile(req.profile)
+
+    start = time.perf_counter()
+    trace = start_trace()
+    key = (normalize_query(req.question), req.profile)
+    try:
+        if profiler is not None and profiler.wanted(_profile_requested(request)):
+            # the whole ChatModel.answer path in one thread, so one cProfile sees all of it
+            result, profile_id = await pipeline.stages["generation"].run(
+                profiler.run, chat.answer, req.question, timeout=DEADLINES.get("ask"), profile=req.profile,
+                meta={"question": req.question, "profile": req.profile}
+            )
+            shared = False
+            http_response.headers["X-Profile-Id"] = profile_id
+        else:
+            (result, leader_trace), shared = await inflight.do(
+                key, _traced_answer, req.question, timeout=DEADLINES.get("ask"), profile=req.profile
+            )
+            if shared:
+                # the stages ran under the leader's trace: record what they found here too
+                trace.adopt(leader_trace)
+    except (StageOverloaded, ShardsUnavailable) as e:
+        if recorder is not None:
+            recorder.record(req.question, 503, 1000 * (time.perf_counter() - start), req.profile, trace)
+        raise HTTPException(status_code=503, detail=str(e))
+    elapsed = time.perf_counter() - start
+    profile_latency.record(req.profile, elapsed)
+    ANSWER_SECONDS.observe(elapsed, profile=req.profile or "default", shared=str(shared).lower())
+
+    if not isinstance(result, dict):
+        result = {"answer": str(result), "sources": []}
+    response = {**result, "profile": req.profile, "latency_ms": round(elapsed * 1000, 1)}
+    if recorder is not None:
+        recorder.record(req.question, 200, elapsed * 1000, req.profile, trace, shared, result.get("index_version"))
+    if req.timings:
+        # shared: the stages were run by the request this one was coalesced with
+        response["timings"] = dict(trace.breakdown(), shared=shared)
+    return response
+
+@app.post("/ask/batch")
+async def ask_batch(req: BatchRequest):
+    """Answer a list of questions, streaming one NDJSON line per answer as it completes."""
+    _require_ready()
+    _check_profile(req.profile)
+    cfg = get_section("serving").get("batch") or {}
+    max_questions = cfg.get("max_questions", 500)
+    if len(req.questions) > max_questions:
+        raise HTTPException(status_code=400, detail=f"At most {max_questions} questions per batch")
+
+    async def lines():
+        start = time.perf_counter()
+        try:
+            async for i, result, cached in pipeline.answer_batch(
+                req.questions,
+                timeout=DEADLINES.get("ask_batch"),
+                profile=req.profile,
+                group_size=cfg.get("group_size", 8)
+            ):
+                line = {
+                    "index": i,
+                    "question": req.questions[i],
+                    **result,
+                    "cached": cached,
+                    "elapsed_ms": round((time.perf_counter() - start) * 1000, 1),
+                }
+                yield json.dumps(line, ensure_ascii=False) + "\n"
+        except (StageOverloaded, ShardsUnavailable) as e:
+            yield json.dumps({"error": str(e)}) + "\n"
+        except Exception as e:
+            # headers are already sent; end the stream with an error line instead of truncating it
+            logger.exception("ask_batch failed mid-stream")
+            yield json.dumps({"error": f"{type(e).__name__}: {e}"}) + "\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+@app.get("/cache")
+def cache_stats():
+    """Hit rates of the exact and semantic answer caches and the translation cache."""
+    _require_ready()
+    return {
+        "answers": chat.cache.stats() if chat.cache else None,
+        "semantic": chat.semantic_cache.stats() if chat.semantic_cache else None,
+        "inflight": inflight.stats(),
+        "translation": get_translation_service().stats(),
+    }
+
+@app.get("/pipeline")
+def pipeline_stats():
+    """Queue depth, running jobs and wait/run time per stage, thread settings and reasoner routing."""
+    _require_ready()
+    router = chat.llm.stats() if hasattr(chat.llm, "routes_by_language") else None
+    return {"stages": pipeline.stats(), "threads": applied_settings(), "router": router}
+
+@app.get("/memory")
+def memory_report():
+    """Unique vs shared memory per worker (whole group under src.api.serve), plus this worker's model pool."""
+    pool = get_model_pool().stats()
+    master = os.environ.get("RAG_SERVE_MASTER_PID")
+    if master and int(master) != os.getpid():
+        return dict(worker_memory_report(int(master)), model_pool=pool)
+    return {"master": process_memory(), "workers": [], "model_pool": pool}
+
+@app.get("/index")
+def index_status():
+    """Active index version and the state of the bundle watcher (or of the shards)."""
+    _require_ready()
+    searcher = chat.retriever.searcher
+    if hasattr(searcher, "endpoints"):
+        return {"active_version": searcher.version, "shards": searcher.stats()}
+    return index_watcher.status()
+
+@app.get("/debug/profiles")
+def list_debug_profiles():
+    """Stored request profiles, newest first (serving.profiling)."""
+    if profiler is None:
+        raise HTTPException(status_code=404, detail="Profiling is disabled (serving.profiling.enabled)")
+    return {"dir": profiler.directory, "sample_rate": profiler.sample_rate, "profiles": profiler.list()}
+
+@app.get("/debug/profiles/{profile_id}/{name}")
+def download_profile(profile_id: str, name: str):
+    """One file of a stored profile: python.prof, python.txt, torch_trace-<n>.json or meta.json."""
+    path = profiler.file_path(profile_id, name) if profiler is not None else None
+    if path is None:
+        raise HTTPException(status_code=404, detail="No such profile file")
+    return FileResponse(path, filename=f"{profile_id}-{name}")
+
+@app.middleware("http")
+async def record_request(request: Request, call_next):
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+        return response
+    finally:
+        route = request.scope.get("route")
+        endpoint = route.path if route is not None else "unmatched"
+        REQUESTS.inc(endpoint=endpoint, status=str(status))
+        REQUEST_SECONDS.observe(time.perf_counter() - start, endpoint=endpoint)
+
+def _service_metrics():
+    """Stats kept by the caches, executors, ... as metric families (read per scrape)."""
+    families = [
+        ("rag_ready", "gauge", "1 once models are loaded and warmed up", [({}, int(startup.ready))]),
+        ("rag_startup_component_seconds", "gauge", "Load time per component",
+         [({"component": name}, seconds) for name, seconds in startup.components.items()]),
+        ("rag_singleflight_calls_total", "counter", "Coalesced vs leading /ask calls",
+         [({"role": "leader"}, inflight.leaders), ({"role": "coalesced"}, inflight.coalesced)]),
+    ]
+
+    pool = get_model_pool().stats()
+    families.append(("rag_model_pool_bytes", "gauge", "Model pool RAM budget and resident model size",
+                     [({"kind": "budget"}, pool["budget_mb"] * 2 ** 20), ({"kind": "used"}, pool["used_mb"] * 2 ** 20)]))
+    families.append(("rag_model_pool_models", "gauge", "Models in the pool by state",
+                     [({"state": state}, sum(m["state"] == state for m in pool["models"]))
+                      for state in ("loaded", "offloaded")]))
+    families.append(("rag_model_pool_events_total", "counter", "Model pool loads, hits, evictions, offloads, restores",
+                     [({"event": event}, pool[event]) for event in ("loads", "hits", "evictions", "offloads", "restores")]))
+    if chat is None:
+        return families
+
+    caches = [("answers", chat.cache), ("semantic", chat.semantic_cache)]
+    lookups, entries = [], []
+    for name, cache in caches:
+        if cache is None:
+            continue
+        stats = cache.stats()
+        for result in ("hits", "disk_hits", "misses"):
+            if result in stats:
+                lookups.append(({"cache": name, "result": result}, stats[result]))
+        entries.append(({"cache": name}, stats["entries"]))
+    families.append(("rag_cache_lookups_total", "counter", "Answer cache lookups by result", lookups))
+    families.append(("rag_cache_entries", "gauge", "Entries held per cache", entries))
+    if chat.semantic_cache is not None:
+        stats = chat.semantic_cache.stats()
+        families.append(("rag_semantic_cache_audits_total", "counter", "Audited semantic cache hits",
+                         [({"result": "ok"}, stats["audits"] - stats["false_hits"]),
+                          ({"result": "false_hit"}, stats["false_hits"])]))
+        families.append(("rag_semantic_cache_rejected_total", "counter",
+                         "Semantic cache hits not served: evidence did not match the query's retrieval",
+                         [({}, stats["rejected"])]))
+
+    stages = pipeline.stats()
+    families.append(("rag_stage_queue_depth", "gauge", "Jobs waiting per stage executor",
+                     [({"stage": name}, s["queued"]) for name, s in stages.items()]))
+    families.append(("rag_stage_running", "gauge", "Jobs running per stage executor",
+                     [({"stage": name}, s["running"]) for name, s in stages.items()]))
+    families.append(("rag_stage_jobs_total", "counter", "Finished and rejected jobs per stage executor",
+                     [({"stage": name, "result": r}, s[r]) for name, s in stages.items()
+                      for r in ("completed", "rejected")]))
+
+    assisted = getattr(chat.llm, "assisted_stats", None)
+    snap = assisted() if assisted is not None else None
+    if snap:
+        families.append(("rag_assisted_acceptance_rate", "gauge", "Draft token acceptance rate",
+                         [({}, snap["acceptance_rate"])]))
+        families.append(("rag_assisted_speedup", "gauge", "Assisted vs plain decoding speed",
+                         [({}, snap["speedup"])]))
+
+    if hasattr(chat.llm, "routes_by_language"):
+        routes = chat.llm.stats()
+        families.append(("rag_router_expected_seconds", "gauge", "Expected generate latency per reasoner backend",
+                         [({"backend": name}, r["expected_ms"] / 1000) for name, r in routes.items()]))
+        families.append(("rag_router_in_flight", "gauge", "Generate calls running per reasoner backend",
+                         [({"backend": name}, r["in_flight"]) for name, r in routes.items()]))
+        families.append(("rag_router_calls_total", "counter", "Generate calls per reasoner backend",
+                         [({"backend": name, "result": result}, r["calls"] - r["errors"] if result == "ok" else r["errors"])
+                          for name, r in routes.items() for result in ("ok", "error")]))
+
+    families.append(("rag_index_info", "gauge", "Active index version",
+                     [({"version": chat.retriever.version}, 1)]))
+    return families
+
+REGISTRY.add_collector(_service_metrics)
+
+@app.get("/metrics")
+def metrics():
+    """Prometheus text exposition."""
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the process is up (models may still be loading)."""
+    return {"status": "ok", "uptime_s": startup.report()["uptime_s"]}
+
+@app.get("/readyz")
+def readyz():
+    """Readiness, with the load time of each component (503 until warmed up)."""
+    report = startup.report()
+    if not startup.ready:
+        return JSONResponse(status_code=503, content=report)
+    return report
+
+@app.on_event("shutdown")
+def shutdown_pipeline():
+    if index_watcher is not None:
+        index_watcher.stop()
+    if pipeline is not None:
+        pipeline.shutdown()
+    if recorder is not None:
+        recorder.flush()
+
+@app.get("/profiles")
+def list_profiles():
+    """Decoding profiles with their measured end-to-end latency."""
+    return {"profiles": get_profiles(), "latency": profile_latency.summary()}
@@ -0,0 +1,246 @@
+"""
+Sweep the answer-path knobs (`pipeline` in settings.yaml) on an evaluation set.
+
+    python -m src.bench.autotune --max-trials 40                 # grid from bench.autotune
+    python -m src.bench.autotune --max-latency-ms 1500 --write   # pick within a budget, update settings.yaml
+
+Every trial answers the evaluation set with caches off and records latency
+(p50 / p95 per question) and a quality proxy: the weighted mean of evidence
+recall (gold chunk ids among the retrieved ones, when the set has them) and
+token F1 of the answer against the reference. The Pareto frontier (nothing
+else is both faster and better) is printed and saved to bench/results.
+
+The pick is the best-quality frontier point within --max-latency-ms or, with
+no budget, the fastest one within --tolerance of the best quality. --write puts
+it into the `pipeline` section of settings.yaml, which ChatModel reads.
+"""
+import argparse
+import itertools
+import json
+import random
+import re
+import time
+from src.bench.report import latency_summary, write_results
+from src.core.config import SETTINGS_PATH, get_section
+from src.core.logging import logger
+from src.utils.text import normalize_query
+
+# start of the video source list appended by ChatModel._format_video_sources
+_SOURCES_MARK = "\n\n**📺"
+
+
+# -------------------------
+# QUALITY PROXY
+# -------------------------
+def load_eval_set(path: str) -> list:
+    items = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                items.append({
+                    "question": item["question"],
+                    "reference": item.get("reference") or item.get("answer") or "",
+                    "chunk_ids": item.get("chunk_ids") or [],
+                })
+    return items
+
+
+def _tokens(text: str) -> list:
+    return [t for t in normalize_query(text).split() if any(c.isalnum() for c in t)]
+
+
+def token_f1(answer: str, reference: str) -> float:
+    """SQuAD-style token overlap F1 (script-agnostic, case-folded)."""
+    pred, gold = _tokens(answer), _tokens(reference)
+    if not pred or not gold:
+        return 0.0
+    common = sum(min(pred.count(t), gold.count(t)) for t in set(pred))
+    if not common:
+        return 0.0
+    precision, recall = common / len(pred), common / len(gold)
+    return 2 * precision * recall / (precision + recall)
+
+
+def evidence_recall(retrieved: list, gold: list):
+    if not gold:
+        return None
+    return len(set(retrieved) & set(gold)) / len(set(gold))
+
+
+def quality(evidence, answer_f1: float, weights: dict) -> float:
+    if evidence is None:
+        return answer_f1
+    w_e, w_a = weights.get("evidence", 0.5), weights.get("answer", 0.5)
+    return (w_e * evidence + w_a * answer_f1) / (w_e + w_a)
+
+
+# -------------------------
+# SWEEP
+# -------------------------
+def grid_trials(base: dict, grid: dict, max_trials: int = None, seed: int = 3) -> list:
+    """`base` first, then grid combinations (a random sample of max_trials - 1 if there are more)."""
+    keys = sorted(grid)
+    combos = [dict(base, **dict(zip(keys, values))) for values in itertools.product(*(grid[k] for k in keys))]
+    combos = [c for c in combos if c != base]
+    if max_trials and len(combos) > max_trials - 1:
+        combos = random.Random(seed).sample(combos, max_trials - 1)
+    # group by model so each one is loaded once
+    combos.sort(key=lambda c: (str(c.get("reasoner")), str(c.get("model"))))
+    return [dict(base)] + combos
+
+
+def pareto_front(trials: list, latency_key: str = "latency_ms") -> list:
+    """Trials not dominated by a faster-or-equal and better-or-equal one, fastest first."""
+    front = []
+    for t in sorted(trials, key=lambda t: (t[latency_key], -t["quality"])):
+        if not front or t["quality"] > front[-1]["quality"]:
+            front.append(t)
+    return front
+
+
+def choose(front: list, max_latency_ms: float = None, tolerance: float = 0.02, latency_key: str = "latency_ms"):
+    if max_latency_ms is not None:
+        within = [t for t in front if t[latency_key] <= max_latency_ms]
+        return max(within, key=lambda t: t["quality"]) if within else None
+    best = max(t["quality"] for t in front)
+    return next(t for t in front if t["quality"] >= best - tolerance)
+
+
+def evaluate(chat, settings: dict, eval_set: list, weights: dict) -> dict:
+    chat.settings = dict(settings)
+    seconds, qualities, evidences, f1s = [], [], [], []
+    for item in eval_set:
+        started = time.perf_counter()
+        query_lang = chat.detect(item["question"])
+        data = chat.retrieve(item["question"])
+        result = chat.respond(item["question"], query_lang, data)
+        seconds.append(time.perf_counter() - started)
+
+        answer = result["answer"].split(_SOURCES_MARK)[0]
+        evidence = evidence_recall(data.get("chunk_ids") or [], item["chunk_ids"])
+        f1 = token_f1(answer, item["reference"])
+        qualities.append(quality(evidence, f1, weights))
+        f1s.append(f1)
+        if evidence is not None:
+            evidences.append(evidence)
+
+    latency = latency_summary(seconds)
+    return {
+        "settings": settings,
+        "latency_ms": latency["p50_ms"],
+        "latency_p95_ms": latency["p95_ms"],
+        "quality": round(sum(qualities) / len(qualities), 4),
+        "answer_f1": round(sum(f1s) / len(f1s), 4),
+        "evidence_recall": round(sum(evidences) / len(evidences), 4) if evidences else None,
+    }
+
+
+# -------------------------
+# SETTINGS
+# -------------------------
+def _yaml_value(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, str) and (not value or re.search(r"[:#\[\]{},&*!|>'\"%@`]", value)):
+        return json.dumps(value, ensure_ascii=False)
+    return str(value)
+
+
+def update_section(path: str, section: str, values: dict):
+    """Set flat `key: value` lines of a top-level section in a YAML file, keeping comments and other keys."""
+    with open(path, encoding="utf-8") as f:
+        lines = f.read().splitlines()
+
+    start = next((i for i, line in enumerate(lines) if line.rstrip() == f"{section}:"), None)
+    if start is None:
+        lines += ["", f"{section}:"] + [f"  {k}: {_yaml_value(v)}" for k, v in values.items()]
+    else:
+        end = next((i for i in range(start + 1, len(lines)) if lines[i] and not lines[i][0].isspace()
+                    and not lines[i].startswith("#")), len(lines))
+        # stop before the comments that head the next section
+        while end > start + 1 and (not lines[end - 1].strip() or lines[end - 1].startswith("#")):
+            end -= 1
+        pending = dict(values)
+        for i in range(start + 1, end):
+            match = re.match(r"^  ([A-Za-z_][\w]*):(\s|$)", lines[i])
+            if match and match.group(1) in pending:
+                lines[i] = f"  {match.group(1)}: {_yaml_value(pending.pop(match.group(1)))}"
+        lines[end:end] = [f"  {k}: {_yaml_value(v)}" for k, v in pending.items()]
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def run(args) -> dict:
+    from src.chat.chat_model import ChatModel
+    from src.chat.model_loader import load_reasoner
+    from src.storage.retriever import Retriever
+
+    cfg = get_section("bench").get("autotune") or {}
+    eval_set = load_eval_set(args.eval_set or cfg.get("eval_set"))
+    weights = cfg.get("weights") or {}
+    trials = grid_trials(get_section("pipeline"), cfg.get("grid") or {}, args.max_trials, args.seed)
+    logger.info(f"Autotuning {len(trials)} configurations on {len(eval_set)} questions")
+
+    retriever = Retriever()
+    chat, loaded = None, None
+    results = []
+    for n, settings in enumerate(trials, 1):
+        llm_key = (settings.get("reasoner"), settings.get("model"))
+        if llm_key != loaded:
+            chat = None   # free the previous model first
+            chat = ChatModel(load_reasoner(*llm_key), retriever=retriever, settings=settings)
+            chat.cache, chat.semantic_cache = None, None
+            loaded = llm_key
+        result = evaluate(chat, settings, eval_set, weights)
+        logger.info(f"[{n}/{len(trials)}] {result['latency_ms']} ms, quality {result['quality']}")
+        results.append(result)
+
+    latency_key = "latency_p95_ms" if args.metric == "p95" else "latency_ms"
+    front = pareto_front(results, latency_key)
+    chosen = choose(front, args.max_latency_ms, args.tolerance, latency_key)
+    return {
+        "config": {"eval_set": len(eval_set), "trials": len(trials), "metric": args.metric,
+                   "max_latency_ms": args.max_latency_ms, "weights": weights},
+        "baseline": results[0],
+        "trials": results,
+        "frontier": front,
+        "chosen": chosen,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sweep pipeline settings for the latency / quality frontier")
+    parser.add_argument("--eval-set", help="JSONL evaluation set (default: bench.autotune.eval_set)")
+    parser.add_argument("--max-trials", type=int, default=40, help="sample the grid down to this many runs")
+    parser.add_argument("--metric", choices=["p50", "p95"], default="p50", help="latency used for the frontier")
+    parser.add_argument("--max-latency-ms", type=float, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.02, help="quality given up for speed without a budget")
+    parser.add_argument("--write", action="store_true", help="write the pick into settings.yaml")
+    parser.add_argument("--seed", type=int, default=3)
+    parser.add_argument("--out", default=None, help="results directory (default: bench/results)")
+    args = parser.parse_args()
+
+    results = run(args)
+    print(f"{'latency ms':>11} {'p95 ms':>9} {'quality':>8} {'F1':>6} {'evid':>6}  settings")
+    for t in results["frontier"]:
+        changed = {k: v for k, v in t["settings"].items() if results["baseline"]["settings"].get(k) != v}
+        print(f"{t['latency_ms']:>11} {t['latency_p95_ms']:>9} {t['quality']:>8} {t['answer_f1']:>6} "
+              f"{t['evidence_recall'] if t['evidence_recall'] is not None else '-':>6}  {changed or '(current)'}")
+
+    chosen = results["chosen"]
+    summary = {"chosen": chosen and chosen["settings"], "frontier": len(results["frontier"])}
+    print("\nResults:", write_results("autotune", results, summary, args.out))
+    if chosen is None:
+        print("No configuration within the latency budget")
+    elif args.write:
+        # only what changed, so untouched keys keep their ${ENV} placeholders
+        current = get_section("pipeline")
+        changed = {k: v for k, v in chosen["settings"].items() if current.get(k) != v}
+        update_section(SETTINGS_PATH, "pipeline", changed)
+        print(f"Wrote pipeline settings to {SETTINGS_PATH}: {changed or 'no changes'}")
+    else:
+        print(f"Chosen (not written, use --write): {chosen['settings']}")
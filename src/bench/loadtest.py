@@ -0,0 +1,299 @@
+"""
+Load test for POST /ask.
+
+    # start the API with the stub LLM and drive it with 16 concurrent clients
+    python -m src.bench.loadtest --spawn stub --concurrency 16 --duration 60
+
+    # open-loop Poisson arrivals at 5 req/s against a running server
+    python -m src.bench.loadtest --url http://localhost:8000 --pattern poisson --rate 5
+
+Arrival patterns:
+  closed   N clients, each sends its next request when the last one returns
+  constant requests start every 1/rate seconds, whatever the server does
+  poisson  exponential gaps with mean 1/rate (bursty open loop)
+
+Open-loop latency is measured from the scheduled start, so time spent
+waiting for a free client slot counts (no coordinated omission).
+
+--spawn stub starts uvicorn with STUB_LLM=true (src/reasoning/stub_reasoner.py):
+retrieval, scheduling and serialization are real, generation is a fixed
+per-token delay. --spawn real loads the configured model. Answer caches stay
+on unless the server runs with ANSWER_CACHE=false SEMANTIC_CACHE=false.
+
+Reports throughput, latency p50/p95/p99, errors by status, the per-stage
+timing breakdown returned by /ask, and queue depth / running jobs per
+pipeline stage sampled from /pipeline. Results go to bench/results.
+"""
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from src.bench.report import latency_summary, percentile, write_results
+from src.core.logging import logger
+
+DEFAULT_QUESTIONS = [
+    "What is Imaan?",
+    "Namaz ki kitni rakat hain?",
+    "Roza kis par farz hai?",
+    "What does the Quran say about patience?",
+    "زکوۃ کس پر فرض ہے؟",
+    "Wudu kaise karte hain?",
+    "What is the importance of Tawheed?",
+    "हज किस पर फ़र्ज़ है?",
+]
+
+
+def load_questions(path: str = None) -> list:
+    """One question per line, or JSONL with a "question" / "query" field."""
+    if not path:
+        return list(DEFAULT_QUESTIONS)
+    questions = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            if line.startswith("{"):
+                item = json.loads(line)
+                line = item.get("question") or item.get("query")
+            questions.append(line)
+    return questions
+
+
+def request_json(method: str, url: str, body: dict = None, timeout: float = 120):
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    req = urllib.request.Request(url, data=data, method=method, headers={"Content-Type": "application/json"})
+    with urllib.request.urlopen(req, timeout=timeout) as resp:
+        return resp.status, json.loads(resp.read() or b"null")
+
+
+def arrival_gaps(pattern: str, rate: float, seed: int = 7):
+    """Seconds between request starts for the open-loop patterns."""
+    rng = random.Random(seed)
+    while True:
+        yield rng.expovariate(rate) if pattern == "poisson" else 1.0 / rate
+
+
+class QueueSampler(threading.Thread):
+    """Polls /pipeline and keeps queued / running per stage."""
+
+    def __init__(self, url: str, interval: float = 0.5):
+        super().__init__(daemon=True)
+        self.url = url.rstrip("/") + "/pipeline"
+        self.interval = interval
+        self.samples = {}   # stage -> {"queued": [...], "running": [...]}
+        self._done = threading.Event()
+
+    def run(self):
+        while not self._done.wait(self.interval):
+            try:
+                _, body = request_json("GET", self.url, timeout=5)
+            except (OSError, ValueError):
+                continue
+            for name, stats in (body.get("stages") or {}).items():
+                series = self.samples.setdefault(name, {"queued": [], "running": []})
+                series["queued"].append(stats.get("queued", 0))
+                series["running"].append(stats.get("running", 0))
+
+    def stop(self):
+        self._done.set()
+
+    def summary(self) -> dict:
+        out = {}
+        for name, series in self.samples.items():
+            queued = series["queued"]
+            out[name] = {
+                "samples": len(queued),
+                "queued_mean": round(sum(queued) / len(queued), 2) if queued else 0,
+                "queued_p95": percentile(queued, 0.95),
+                "queued_max": max(queued, default=0),
+                "running_max": max(series["running"], default=0),
+            }
+        return out
+
+
+class LoadTest:
+    def __init__(self, url: str, questions: list, profile: str = None, timeout: float = 120):
+        self.ask_url = url.rstrip("/") + "/ask"
+        self.questions = questions
+        self.profile = profile
+        self.timeout = timeout
+        self._lock = threading.Lock()
+        self._next = 0
+        self.latencies = []
+        self.statuses = Counter()
+        self.stages = {}   # stage -> [ms, ...] from the /ask timings breakdown
+
+    def _question(self) -> str:
+        with self._lock:
+            question = self.questions[self._next % len(self.questions)]
+            self._next += 1
+        return question
+
+    def one(self, scheduled: float = None):
+        started = scheduled if scheduled is not None else time.perf_counter()
+        body = {"question": self._question(), "profile": self.profile, "timings": True}
+        try:
+            status, answer = request_json("POST", self.ask_url, body, self.timeout)
+        except urllib.error.HTTPError as e:
+            status, answer = e.code, None
+        except (OSError, ValueError) as e:
+            status, answer = type(e).__name__, None
+        elapsed = time.perf_counter() - started
+
+        with self._lock:
+            self.statuses[str(status)] += 1
+            if status == 200:
+                self.latencies.append(elapsed)
+                for name, ms in ((answer or {}).get("timings") or {}).get("stages_ms", {}).items():
+                    self.stages.setdefault(name, []).append(ms / 1000)
+
+    def closed(self, concurrency: int, duration: float):
+        stop_at = time.perf_counter() + duration
+
+        def client():
+            while time.perf_counter() < stop_at:
+                self.one()
+
+        threads = [threading.Thread(target=client, daemon=True) for _ in range(concurrency)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    def open(self, pattern: str, rate: float, duration: float, max_inflight: int, seed: int = 7):
+        with ThreadPoolExecutor(max_workers=max_inflight) as pool:
+            started = time.perf_counter()
+            next_at = started
+            for gap in arrival_gaps(pattern, rate, seed):
+                next_at += gap
+                if next_at - started >= duration:
+                    break
+                time.sleep(max(0.0, next_at - time.perf_counter()))
+                pool.submit(self.one, next_at)
+
+    def summary(self, elapsed: float) -> dict:
+        total = sum(self.statuses.values())
+        return {
+            "requests": total,
+            "ok": len(self.latencies),
+            "elapsed_s": round(elapsed, 2),
+            "throughput_rps": round(len(self.latencies) / elapsed, 2) if elapsed else 0,
+            "error_rate": round(1 - len(self.latencies) / total, 4) if total else 0,
+            "statuses": dict(self.statuses),
+            "latency": latency_summary(self.latencies),
+            "stages": {name: latency_summary(s) for name, s in sorted(self.stages.items())},
+        }
+
+
+def wait_ready(url: str, timeout: float = 600):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            status, _ = request_json("GET", url.rstrip("/") + "/readyz", timeout=5)
+            if status == 200:
+                return
+        except (OSError, ValueError):
+            pass
+        time.sleep(1)
+    raise TimeoutError(f"{url} not ready after {timeout:.0f}s")
+
+
+def spawn_server(mode: str, port: int) -> subprocess.Popen:
+    env = dict(os.environ, STUB_LLM="true" if mode == "stub" else "false")
+    cmd = [sys.executable, "-m", "uvicorn", "src.app:app", "--port", str(port), "--log-level", "warning"]
+    logger.info(f"Starting API ({mode} LLM) on port {port}")
+    return subprocess.Popen(cmd, env=env)
+
+
+def run(args) -> dict:
+    test = LoadTest(args.url, load_questions(args.questions), args.profile, args.timeout)
+    sampler = QueueSampler(args.url, args.sample_interval)
+
+    # a few untimed requests first: caches, allocator, thread pools
+    for _ in range(args.warmup):
+        test.one()
+    test.latencies.clear()
+    test.statuses.clear()
+    test.stages.clear()
+
+    sampler.start()
+    started = time.perf_counter()
+    if args.pattern == "closed":
+        test.closed(args.concurrency, args.duration)
+    else:
+        test.open(args.pattern, args.rate, args.duration, args.concurrency, args.seed)
+    elapsed = time.perf_counter() - started
+    sampler.stop()
+
+    return {
+        "config": {
+            "url": args.url,
+            "mode": args.spawn or "external",
+            "pattern": args.pattern,
+            "concurrency": args.concurrency,
+            "rate": args.rate if args.pattern != "closed" else None,
+            "duration_s": args.duration,
+            "profile": args.profile,
+            "questions": len(test.questions),
+        },
+        **test.summary(elapsed),
+        "queues": sampler.summary(),
+    }
+
+
+def print_report(results: dict):
+    lat = results["latency"]
+    print(f"{results['ok']}/{results['requests']} ok in {results['elapsed_s']}s "
+          f"-> {results['throughput_rps']} req/s, error rate {results['error_rate']:.2%} {results['statuses']}")
+    if lat.get("count"):
+        print(f"latency ms: p50 {lat['p50_ms']}  p95 {lat['p95_ms']}  p99 {lat['p99_ms']}  mean {lat['mean_ms']}")
+    print(f"\n{'stage':<22} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+    for name, s in results["stages"].items():
+        print(f"{name:<22} {s['p50_ms']:>9.1f} {s['p95_ms']:>9.1f} {s['p99_ms']:>9.1f}")
+    print(f"\n{'executor':<22} {'queued avg':>10} {'p95':>6} {'max':>6} {'running max':>12}")
+    for name, q in results["queues"].items():
+        print(f"{name:<22} {q['queued_mean']:>10} {q['queued_p95']:>6} {q['queued_max']:>6} {q['running_max']:>12}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load test POST /ask")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--spawn", choices=["stub", "real"], help="start a local API server for the test")
+    parser.add_argument("--port", type=int, default=8011, help="port for --spawn")
+    parser.add_argument("--pattern", choices=["closed", "constant", "poisson"], default="closed")
+    parser.add_argument("--concurrency", type=int, default=8, help="clients (closed) or max in flight (open)")
+    parser.add_argument("--rate", type=float, default=5.0, help="requests/s for constant and poisson")
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--questions", help="question file (text lines or JSONL)")
+    parser.add_argument("--profile", help="decoding profile sent with every request")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--sample-interval", type=float, default=0.5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--out", default=None, help="results directory (default: bench/results)")
+    args = parser.parse_args()
+
+    server = None
+    if args.spawn:
+        args.url = f"http://127.0.0.1:{args.port}"
+        server = spawn_server(args.spawn, args.port)
+    try:
+        wait_ready(args.url)
+        results = run(args)
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    print_report(results)
+    summary = {k: results[k] for k in ("config", "throughput_rps", "error_rate", "latency")}
+    print("\nResults:", write_results("loadtest", results, summary, args.out))
@@ -0,0 +1,169 @@
+"""
+Replay recorded /ask traffic (src/api/recorder.py) against a build.
+
+    python -m src.bench.replay data/traffic --url http://localhost:8000            # original pacing
+    python -m src.bench.replay data/traffic --speed 10 --limit 5000                # 10x faster
+    python -m src.bench.replay traffic-123.jsonl.gz --speed 0 --concurrency 16     # back to back
+
+Requests are sent at their recorded offsets divided by --speed (0 = as soon
+as a slot is free), with the recorded question and profile. The report puts
+the recording and the replay side by side: latency percentiles overall and
+per language, cache hit rate by kind, error rate, and how often the replay
+retrieved the same chunks as production. Start the target with an empty cache
+to see cold-start hit rates. Results go to bench/results.
+"""
+import argparse
+import time
+import urllib.error
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from src.api.recorder import read_records
+from src.bench.loadtest import request_json, wait_ready
+from src.bench.report import latency_summary, write_results
+from src.core.logging import logger
+
+
+def summarize(rows: list) -> dict:
+    """Latency, errors, cache hits and language mix of recorded or replayed requests."""
+    ok = [r for r in rows if r.get("status") == 200]
+    caches = Counter(r.get("cache") or "miss" for r in ok)
+    by_lang = {}
+    for r in ok:
+        by_lang.setdefault(r.get("lang") or "unknown", []).append(r["ms"] / 1000)
+    return {
+        "requests": len(rows),
+        "error_rate": round(1 - len(ok) / len(rows), 4) if rows else 0,
+        "latency": latency_summary([r["ms"] / 1000 for r in ok]),
+        "cache_hit_rate": round(1 - caches["miss"] / len(ok), 4) if ok else 0,
+        "cache": dict(caches),
+        "shared_rate": round(sum(bool(r.get("shared")) for r in ok) / len(ok), 4) if ok else 0,
+        "languages": {lang: latency_summary(s) for lang, s in sorted(by_lang.items())},
+    }
+
+
+def evidence_agreement(pairs: list) -> dict:
+    """How often the replay retrieved what production did: top-1 match and mean overlap."""
+    pairs = [(a, b) for a, b in pairs if a and b]
+    if not pairs:
+        return {"compared": 0}
+    top1 = sum(a[0] == b[0] for a, b in pairs)
+    overlap = sum(len(set(a) & set(b)) / len(set(a) | set(b)) for a, b in pairs)
+    return {"compared": len(pairs), "top1": round(top1 / len(pairs), 4), "jaccard": round(overlap / len(pairs), 4)}
+
+
+class Replayer:
+    def __init__(self, url: str, records: list, speed: float = 1.0, concurrency: int = 64, timeout: float = 120):
+        self.ask_url = url.rstrip("/") + "/ask"
+        self.records = records
+        self.speed = speed
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.results = [None] * len(records)
+        self.max_lag = 0.0
+
+    def _send(self, i: int):
+        record = self.records[i]
+        body = {"question": record["q"], "profile": record.get("profile"), "timings": True}
+        started = time.perf_counter()
+        try:
+            status, answer = request_json("POST", self.ask_url, body, self.timeout)
+        except urllib.error.HTTPError as e:
+            status, answer = e.code, None
+        except (OSError, ValueError) as e:
+            status, answer = type(e).__name__, None
+
+        timings = (answer or {}).get("timings") or {}
+        notes = timings.get("notes") or {}
+        self.results[i] = {
+            "status": status,
+            "ms": 1000 * (time.perf_counter() - started),
+            "lang": notes.get("lang") or record.get("lang"),
+            "cache": notes.get("cache"),
+            "shared": timings.get("shared"),
+            "ids": notes.get("chunk_ids"),
+        }
+
+    def run(self):
+        origin = self.records[0].get("t", 0) if self.records else 0
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            for i, record in enumerate(self.records):
+                if self.speed > 0:
+                    due = started + (record.get("t", origin) - origin) / self.speed
+                    wait = due - time.perf_counter()
+                    if wait > 0:
+                        time.sleep(wait)
+                    else:
+                        self.max_lag = max(self.max_lag, -wait)
+                pool.submit(self._send, i)
+        return time.perf_counter() - started
+
+
+def run(args) -> dict:
+    records = [r for r in read_records(args.traffic) if r.get("q")]
+    if args.status_ok:
+        records = [r for r in records if r.get("status") == 200]
+    if args.limit:
+        records = records[:args.limit]
+    if not records:
+        raise SystemExit(f"No recorded requests in {args.traffic}")
+
+    span = records[-1].get("t", 0) - records[0].get("t", 0)
+    logger.info(f"Replaying {len(records)} requests recorded over {span:.0f}s at speed {args.speed or 'max'}")
+    replayer = Replayer(args.url, records, args.speed, args.concurrency, args.timeout)
+    elapsed = replayer.run()
+
+    replayed = [r for r in replayer.results if r is not None]
+    return {
+        "config": {
+            "traffic": args.traffic,
+            "url": args.url,
+            "speed": args.speed,
+            "concurrency": args.concurrency,
+            "recorded_span_s": round(span, 1),
+        },
+        "elapsed_s": round(elapsed, 2),
+        "throughput_rps": round(len(replayed) / elapsed, 2) if elapsed else 0,
+        # the client fell behind the recorded schedule by this much at worst
+        "max_schedule_lag_s": round(replayer.max_lag, 3),
+        "recorded": summarize(records),
+        "replayed": summarize(replayed),
+        "evidence": evidence_agreement([(rec.get("ids"), rep.get("ids")) for rec, rep in zip(records, replayer.results)
+                                        if rep is not None]),
+    }
+
+
+def print_report(results: dict):
+    rec, rep = results["recorded"], results["replayed"]
+    print(f"{'':<22} {'recorded':>12} {'replayed':>12}")
+    for label, key in (("p50 ms", "p50_ms"), ("p95 ms", "p95_ms"), ("p99 ms", "p99_ms")):
+        print(f"{label:<22} {rec['latency'].get(key, '-'):>12} {rep['latency'].get(key, '-'):>12}")
+    for label, key in (("error rate", "error_rate"), ("cache hit rate", "cache_hit_rate"), ("shared", "shared_rate")):
+        print(f"{label:<22} {rec[key]:>12.2%} {rep[key]:>12.2%}")
+    for lang in sorted(set(rec["languages"]) | set(rep["languages"])):
+        a, b = rec["languages"].get(lang, {}), rep["languages"].get(lang, {})
+        print(f"{'p95 ms ' + lang:<22} {a.get('p95_ms', '-'):>12} {b.get('p95_ms', '-'):>12}")
+    print(f"\ncache: recorded {rec['cache']}  replayed {rep['cache']}")
+    print(f"evidence vs recording: {results['evidence']}")
+    print(f"{results['throughput_rps']} req/s, max schedule lag {results['max_schedule_lag_s']}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded /ask traffic against a build")
+    parser.add_argument("traffic", help="recorder directory or a traffic-*.jsonl[.gz] file")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--speed", type=float, default=1.0, help="time compression (0 = no pacing)")
+    parser.add_argument("--concurrency", type=int, default=64, help="max requests in flight")
+    parser.add_argument("--limit", type=int, default=None)
+    parser.add_argument("--status-ok", action="store_true", help="only replay requests that succeeded")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--out", default=None, help="results directory (default: bench/results)")
+    args = parser.parse_args()
+
+    wait_ready(args.url, timeout=60)
+    results = run(args)
+    print_report(results)
+    summary = {k: results[k] for k in ("config", "throughput_rps", "evidence")}
+    summary["p95_ms"] = {"recorded": results["recorded"]["latency"].get("p95_ms"),
+                         "replayed": results["replayed"]["latency"].get("p95_ms")}
+    print("\nResults:", write_results("replay", results, summary, args.out))
@@ -0,0 +1,73 @@
+"""
+Shared helpers for the benchmark CLIs in src/bench: percentiles and
+machine-readable result files.
+
+Each run is written to bench/results/<kind>-<timestamp>.json and one summary
+line per run is appended to bench/results/<kind>.jsonl, so results can be
+diffed or plotted over time.
+"""
+import json
+import math
+import os
+import platform
+import subprocess
+import time
+
+RESULTS_DIR = "bench/results"
+
+
+def percentile(values, q: float) -> float:
+    """Nearest-rank percentile, q in [0, 1]."""
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    # smallest value with at least q of the values at or below it
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+
+def latency_summary(seconds: list) -> dict:
+    """p50 / p95 / p99 / mean in milliseconds."""
+    if not seconds:
+        return {"count": 0}
+    return {
+        "count": len(seconds),
+        "mean_ms": round(1000 * sum(seconds) / len(seconds), 3),
+        "p50_ms": round(1000 * percentile(seconds, 0.50), 3),
+        "p95_ms": round(1000 * percentile(seconds, 0.95), 3),
+        "p99_ms": round(1000 * percentile(seconds, 0.99), 3),
+    }
+
+
+def run_metadata() -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "host": platform.node(),
+        "python": platform.python_version(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def write_results(kind: str, results: dict, summary: dict = None, out_dir: str = None) -> str:
+    """Write the full results as JSON and append `summary` to the history file. Returns the path."""
+    out_dir = out_dir or RESULTS_DIR
+    os.makedirs(out_dir, exist_ok=True)
+    meta = run_metadata()
+
+    stem = os.path.join(out_dir, f"{kind}-{meta['timestamp'].replace(':', '')}")
+    path, n = stem + ".json", 1
+    while os.path.exists(path):
+        n += 1
+        path = f"{stem}-{n}.json"
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, **results}, f, indent=2, ensure_ascii=False, default=str)
+
+    with open(os.path.join(out_dir, f"{kind}.jsonl"), "a", encoding="utf-8") as f:
+        f.write(json.dumps({"meta": meta, "result_file": path, **(summary or {})}, default=str) + "\n")
+    return path
@@ -0,0 +1,268 @@
+"""
+Offline retrieval benchmark.
+
+    python -m src.bench.retrieval                       # variants from settings.yaml
+    python -m src.bench.retrieval --queries q.jsonl --variants flat-e5-large,hnsw32-e5-large
+
+For every configured variant (encoder + FAISS index spec) it reports:
+  - recall@k against exact (flat) search with the same encoder
+  - source hit@k: the chunk a synthesized query was cut from is in the top k
+    (comparable across encoders)
+  - encode and search latency p50 / p95 / p99 for single queries
+  - encode + search QPS at several batch sizes
+  - index size and process RSS
+
+Queries come from a JSONL file ({"query": ..., "chunk_id": optional}) or are
+synthesized from held-out chunks: a span of their text becomes the query.
+Held-out chunks stay in the index but are not used to train IVF/PQ indexes.
+Results go to bench/results (see src/bench/report.py).
+"""
+import argparse
+import hashlib
+import json
+import os
+import pickle
+import random
+import time
+import faiss
+import numpy as np
+from sentence_transformers import SentenceTransformer
+from src.bench.report import latency_summary, write_results
+from src.core.config import get_section
+from src.core.logging import logger
+from src.core.memory import process_memory
+from src.vectorstore.bundle import CHUNKS_FILE, bundle_dir, current_version
+
+CACHE_DIR = "bench/cache"
+
+
+# -------------------------
+# DATA
+# -------------------------
+def load_chunks(path: str = None) -> list:
+    """Chunk store: `path`, else the active index bundle, else data/processed/chunks.pkl."""
+    if path is None:
+        root = get_section("retrieval").get("bundle_root", "data/vector_store")
+        version = current_version(root)
+        path = os.path.join(bundle_dir(root, version), CHUNKS_FILE) if version else "data/processed/chunks.pkl"
+    with open(path, "rb") as f:
+        return pickle.load(f)
+
+
+def chunk_text(chunk: dict) -> str:
+    return (chunk.get("text") or chunk.get("text_roman") or "").strip()
+
+
+def synthesize_queries(chunks: list, count: int, held_out: float = 0.2, seed: int = 13,
+                       min_words: int = 6, max_words: int = 14):
+    """Queries cut from a held-out sample of chunks. Returns (queries, held-out chunk positions)."""
+    rng = random.Random(seed)
+    positions = [i for i, c in enumerate(chunks) if len(chunk_text(c).split()) >= min_words]
+    held = set(rng.sample(positions, max(1, int(len(positions) * held_out))))
+
+    queries = []
+    for i in sorted(held):
+        words = chunk_text(chunks[i]).split()
+        length = rng.randint(min_words, min(max_words, len(words)))
+        start = rng.randint(0, len(words) - length)
+        queries.append({"query": " ".join(words[start:start + length]), "position": i})
+    rng.shuffle(queries)
+    return queries[:count], held
+
+
+def load_queries(path: str, chunks: list) -> list:
+    """JSONL queries; a chunk_id, when given, is used for source hit@k."""
+    positions = {c.get("chunk_id"): i for i, c in enumerate(chunks)}
+    queries = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                item = json.loads(line)
+                queries.append({"query": item["query"], "position": positions.get(item.get("chunk_id"))})
+    return queries
+
+
+# -------------------------
+# ENCODING + INDEXES
+# -------------------------
+def corpus_embeddings(model, encoder: str, chunks: list, cache_dir: str = CACHE_DIR) -> np.ndarray:
+    """Passage embeddings for the chunk store, cached on disk per encoder and chunk set."""
+    digest = hashlib.sha1("\x1f".join(c.get("chunk_id") or chunk_text(c)[:64] for c in chunks).encode()).hexdigest()
+    path = os.path.join(cache_dir, f"{encoder.replace('/', '__')}-{digest[:12]}.npy")
+    if os.path.exists(path):
+        return np.load(path)
+
+    texts = ["passage: " + chunk_text(c) for c in chunks]
+    vectors = model.encode(texts, batch_size=32, normalize_embeddings=True, show_progress_bar=True).astype("float32")
+    os.makedirs(cache_dir, exist_ok=True)
+    np.save(path, vectors)
+    return vectors
+
+
+def build_index(spec: str, vectors: np.ndarray, train_vectors: np.ndarray, params: str = None):
+    """FAISS index from a factory string (Flat, HNSW32, IVF16,Flat, SQ8, IVF16,PQ32, ...)."""
+    index = faiss.index_factory(vectors.shape[1], spec, faiss.METRIC_INNER_PRODUCT)
+    if not index.is_trained:
+        index.train(train_vectors)
+    index.add(vectors)
+    if params:
+        faiss.ParameterSpace().set_index_parameters(index, params)
+    return index
+
+
+def recall_at_k(found: np.ndarray, exact: np.ndarray, k: int) -> float:
+    hits = sum(len(set(f[:k]) & set(e[:k])) for f, e in zip(found, exact))
+    return hits / (k * len(found))
+
+
+def source_hit_at_k(found: np.ndarray, queries: list, k: int):
+    rows = [(f, q["position"]) for f, q in zip(found, queries) if q["position"] is not None]
+    if not rows:
+        return None
+    return sum(position in f[:k] for f, position in rows) / len(rows)
+
+
+# -------------------------
+# BENCHMARK
+# -------------------------
+def _timed_each(fn, items) -> list:
+    seconds = []
+    for item in items:
+        started = time.perf_counter()
+        fn(item)
+        seconds.append(time.perf_counter() - started)
+    return seconds
+
+
+def _qps(model, index, texts, batch_size, top_k, min_seconds=2.0) -> float:
+    """Encode + search throughput with batches of `batch_size` queries."""
+    done, started = 0, time.perf_counter()
+    while True:
+        for start in range(0, len(texts), batch_size):
+            batch = texts[start:start + batch_size]
+            embs = model.encode(batch, batch_size=batch_size, normalize_embeddings=True).astype("float32")
+            index.search(embs, top_k)
+            done += len(batch)
+        elapsed = time.perf_counter() - started
+        if elapsed >= min_seconds:
+            return round(done / elapsed, 1)
+
+
+def bench_variant(variant: dict, chunks: list, queries: list, held_out: set, ks: list, batch_sizes: list,
+                  encoders: dict) -> dict:
+    encoder = variant.get("encoder", "intfloat/multilingual-e5-large")
+    if encoder not in encoders:
+        encoders[encoder] = SentenceTransformer(encoder)
+    model = encoders[encoder]
+
+    vectors = corpus_embeddings(model, encoder, chunks)
+    train = vectors[[i for i in range(len(chunks)) if i not in held_out]]
+    rss_before = (process_memory() or {}).get("rss")
+
+    started = time.perf_counter()
+    index = build_index(variant.get("index", "Flat"), vectors, train, variant.get("params"))
+    build_s = time.perf_counter() - started
+    exact = build_index("Flat", vectors, train)
+
+    texts = ["query: " + q["query"] for q in queries]
+    q_embs = model.encode(texts, batch_size=32, normalize_embeddings=True).astype("float32")
+    k_max = max(ks)
+    _, found = index.search(q_embs, k_max)
+    _, truth = exact.search(q_embs, k_max)
+
+    encode_s = _timed_each(lambda t: model.encode([t], normalize_embeddings=True), texts)
+    search_s = _timed_each(lambda e: index.search(e.reshape(1, -1), k_max), q_embs)
+
+    return {
+        "name": variant["name"],
+        "encoder": encoder,
+        "index": variant.get("index", "Flat"),
+        "params": variant.get("params"),
+        "dim": int(vectors.shape[1]),
+        "vectors": int(index.ntotal),
+        "build_s": round(build_s, 3),
+        "recall": {f"@{k}": round(recall_at_k(found, truth, k), 4) for k in ks},
+        "source_hit": {f"@{k}": source_hit_at_k(found, queries, k) for k in ks},
+        "encode_latency": latency_summary(encode_s),
+        "search_latency": latency_summary(search_s),
+        "qps": {str(bs): _qps(model, index, texts, bs, k_max) for bs in batch_sizes},
+        "index_bytes": int(faiss.serialize_index(index).size),
+        "rss_mb": (process_memory() or {}).get("rss"),
+        "rss_before_index_mb": rss_before,
+    }
+
+
+def run(variants: list, queries_path: str = None, chunks_path: str = None, num_queries: int = 200,
+        held_out: float = 0.2, ks=(1, 5, 10), batch_sizes=(1, 8, 32, 128), seed: int = 13) -> dict:
+    chunks = load_chunks(chunks_path)
+    if queries_path:
+        queries, held = load_queries(queries_path, chunks), set()
+    else:
+        queries, held = synthesize_queries(chunks, num_queries, held_out, seed)
+    logger.info(f"Benchmarking {len(variants)} variants on {len(chunks)} chunks, {len(queries)} queries")
+
+    encoders = {}
+    rows = []
+    for variant in variants:
+        logger.info(f"Variant {variant['name']}")
+        rows.append(bench_variant(variant, chunks, queries, held, list(ks), list(batch_sizes), encoders))
+
+    return {
+        "config": {
+            "chunks": len(chunks),
+            "queries": len(queries),
+            "query_source": queries_path or f"synthesized (held_out={held_out}, seed={seed})",
+            "k": list(ks),
+            "batch_sizes": list(batch_sizes),
+        },
+        "variants": rows,
+    }
+
+
+def print_table(results: dict):
+    ks = results["config"]["k"]
+    header = f"{'variant':<22} " + " ".join(f"{'R@' + str(k):>6}" for k in ks) + \
+             f" {'hit@' + str(ks[-1]):>7} {'enc p50':>8} {'srch p95':>9} {'srch p99':>9} {'MB':>7}  qps"
+    print(header)
+    for r in results["variants"]:
+        hit = r["source_hit"][f"@{ks[-1]}"]
+        print(
+            f"{r['name']:<22} " + " ".join(f"{r['recall'][f'@{k}']:>6.3f}" for k in ks)
+            + f" {hit if hit is None else round(hit, 3):>7} {r['encode_latency']['p50_ms']:>8.2f}"
+            + f" {r['search_latency']['p95_ms']:>9.3f} {r['search_latency']['p99_ms']:>9.3f}"
+            + f" {r['index_bytes'] / 2 ** 20:>7.1f}  " + " ".join(f"{bs}:{q}" for bs, q in r["qps"].items())
+        )
+
+
+if __name__ == "__main__":
+    cfg = get_section("bench").get("retrieval") or {}
+    parser = argparse.ArgumentParser(description="Benchmark retrieval variants (recall, latency, QPS, memory)")
+    parser.add_argument("--queries", help="JSONL query set (default: synthesize from held-out chunks)")
+    parser.add_argument("--chunks", help="chunk store (default: active bundle)")
+    parser.add_argument("--num-queries", type=int, default=cfg.get("queries", 200))
+    parser.add_argument("--held-out", type=float, default=cfg.get("held_out", 0.2))
+    parser.add_argument("--variants", help="comma-separated variant names (default: all configured)")
+    parser.add_argument("--seed", type=int, default=13)
+    parser.add_argument("--out", default=None, help="results directory (default: bench/results)")
+    args = parser.parse_args()
+
+    variants = cfg.get("variants") or [{"name": "flat", "index": "Flat"}]
+    if args.variants:
+        wanted = set(args.variants.split(","))
+        variants = [v for v in variants if v["name"] in wanted]
+
+    results = run(
+        variants,
+        queries_path=args.queries,
+        chunks_path=args.chunks,
+        num_queries=args.num_queries,
+        held_out=args.held_out,
+        ks=cfg.get("k", [1, 5, 10]),
+        batch_sizes=cfg.get("batch_sizes", [1, 8, 32, 128]),
+        seed=args.seed
+    )
+    print_table(results)
+
+    summary = {r["name"]: {"recall": r["recall"], "search_p99_ms": r["search_latency"]["p99_ms"], "qps": r["qps"]}
+               for r in results["variants"]}
+    print("\nResults:", write_results("retrieval", results, summary, args.out))
@@ -0,0 +1,155 @@
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from src.core.config import get_section
+from src.core.logging import logger
+from src.utils.text import normalize_query
+
+
+class AnswerCache:
+    """LRU + TTL cache of final answers, with an optional on-disk tier.
+
+    Keys combine the normalized query, detected language, decoding profile
+    and the ids of the retrieved chunks, so a cached answer is only reused
+    for the same question over the same evidence. Entries belong to one
+    index version: when `check_version` sees a new one, memory is cleared
+    and the old disk tier is deleted.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl: float = 86400, disk_dir: str = None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disk_root = disk_dir or None
+        self.version = None
+
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()   # key -> (expires_at, value)
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(query: str, lang: str, chunk_ids, profile: str = None) -> str:
+        raw = "\x1f".join([normalize_query(query), lang or "", profile or "", ",".join(map(str, chunk_ids))])
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+    def _disk_dir(self):
+        if not self.disk_root:
+            return None
+        return os.path.join(self.disk_root, self.version or "unversioned")
+
+    def check_version(self, version: str):
+        """Drop everything cached for a previous index version."""
+        if version == self.version:
+            return
+        with self._lock:
+            old = self._disk_dir()
+            stale = self.version is not None
+            self.version = version
+            self._entries.clear()
+        if stale:
+            logger.info(f"Index version changed to {version}, answer cache cleared")
+            if old and os.path.isdir(old):
+                shutil.rmtree(old, ignore_errors=True)
+
+    def get(self, key: str):
+        now = time.time()
+        with self._lock:
+            item = self._entries.get(key)
+            if item is not None:
+                expires_at, value = item
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+        value = self._disk_get(key, now)
+        with self._lock:
+            if value is None:
+                self.misses += 1
+                return None
+            self.disk_hits += 1
+        self._remember(key, value, now)
+        return value
+
+    def put(self, key: str, value):
+        now = time.time()
+        self._remember(key, value, now)
+        self._disk_put(key, value, now)
+
+    def _remember(self, key, value, now):
+        with self._lock:
+            self._entries[key] = (now + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def _disk_get(self, key, now):
+        folder = self._disk_dir()
+        if folder is None:
+            return None
+        path = os.path.join(folder, key + ".pkl")
+        try:
+            with open(path, "rb") as f:
+                expires_at, value = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+        if expires_at <= now:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            return None
+        return value
+
+    def _disk_put(self, key, value, now):
+        folder = self._disk_dir()
+        if folder is None:
+            return
+        try:
+            os.makedirs(folder, exist_ok=True)
+            tmp = os.path.join(folder, f"{key}.{os.getpid()}.tmp")
+            with open(tmp, "wb") as f:
+                pickle.dump((now + self.ttl, value), f)
+            os.replace(tmp, os.path.join(folder, key + ".pkl"))
+        except OSError as e:
+            logger.warning(f"Answer cache disk write failed: {e}")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_rate": round((self.hits + self.disk_hits) / lookups, 3) if lookups else 0.0,
+                "index_version": self.version,
+            }
+
+
+_CACHE = None
+
+
+def get_answer_cache():
+    """Shared AnswerCache built from cache.answers in settings.yaml (None if disabled)."""
+    global _CACHE
+    if _CACHE is None:
+        cfg = get_section("cache").get("answers") or {}
+        if not cfg.get("enabled", True):
+            return None
+        _CACHE = AnswerCache(
+            max_entries=cfg.get("max_entries", 1024),
+            ttl=cfg.get("ttl_seconds", 86400),
+            disk_dir=cfg.get("disk_dir")
+        )
+    return _CACHE
@@ -0,0 +1,186 @@
+import random
+import threading
+import time
+from collections import OrderedDict, deque
+import faiss
+import numpy as np
+from src.core.config import get_section
+from src.core.logging import logger
+
+
+class SemanticCache:
+    """Answer reuse for near-duplicate questions.
+
+    Keeps a small inner-product FAISS index over the (normalized) embeddings
+    of answered queries. Lookup runs after retrieval, with the query
+    embedding the retriever already computed: a query whose nearest cached
+    neighbour is above `threshold`, in the same language and decoding
+    profile, can get that answer back without generation.
+
+    Every hit is checked with `audit` against the chunk ids this query just
+    retrieved; it is false when their overlap with the cached evidence is
+    below `min_overlap`. A false hit is evicted so it is not served again,
+    and the caller generates a fresh answer instead. `rejected` counts all
+    of them; the false-hit metrics (`audits`, `false_hits`, recent samples
+    for review) cover the `audit_rate` share of checks passed `record=True`.
+    """
+
+    def __init__(self, dim: int, threshold: float = 0.95, max_entries: int = 5000, audit_rate: float = 0.05,
+                 min_overlap: float = 0.5, neighbours: int = 8):
+        self.dim = dim
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.audit_rate = audit_rate
+        self.min_overlap = min_overlap
+        self.neighbours = neighbours
+        self.version = None
+
+        self._lock = threading.Lock()
+        self._index = faiss.IndexIDMap(faiss.IndexFlatIP(dim))
+        self._entries = OrderedDict()   # id -> entry dict, oldest first
+        self._next_id = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.audits = 0
+        self.false_hits = 0
+        self.rejected = 0
+        self.false_hit_samples = deque(maxlen=50)
+
+    def check_version(self, version: str):
+        if version == self.version:
+            return
+        with self._lock:
+            stale = self.version is not None
+            self.version = version
+            self._index.reset()
+            self._entries.clear()
+        if stale:
+            logger.info(f"Index version changed to {version}, semantic cache cleared")
+
+    @staticmethod
+    def _as_row(embedding):
+        return np.asarray(embedding, dtype="float32").reshape(1, -1)
+
+    def lookup(self, embedding, lang: str, profile: str = None):
+        """Closest cached entry within the threshold, or None."""
+        with self._lock:
+            if self._index.ntotal == 0:
+                self.misses += 1
+                return None
+
+            k = min(self.neighbours, self._index.ntotal)
+            scores, ids = self._index.search(self._as_row(embedding), k)
+
+            for score, entry_id in zip(scores[0], ids[0]):
+                if entry_id == -1 or score < self.threshold:
+                    break
+                entry = self._entries.get(int(entry_id))
+                if entry is None or entry["lang"] != lang or entry["profile"] != profile:
+                    continue
+                self._entries.move_to_end(int(entry_id))
+                self.hits += 1
+                return dict(entry, score=float(score), id=int(entry_id))
+
+            self.misses += 1
+            return None
+
+    def add(self, embedding, lang: str, query: str, value, chunk_ids, profile: str = None):
+        with self._lock:
+            entry_id = self._next_id
+            self._next_id += 1
+
+            self._index.add_with_ids(self._as_row(embedding), np.array([entry_id], dtype="int64"))
+            self._entries[entry_id] = {
+                "query": query,
+                "lang": lang,
+                "profile": profile,
+                "value": value,
+                "chunk_ids": list(chunk_ids or []),
+                "created": time.time(),
+            }
+
+            if len(self._entries) > self.max_entries:
+                evicted = []
+                while len(self._entries) > self.max_entries:
+                    old_id, _ = self._entries.popitem(last=False)
+                    evicted.append(old_id)
+                self._index.remove_ids(np.array(evicted, dtype="int64"))
+
+    def evict(self, entry_id: int):
+        with self._lock:
+            if self._entries.pop(entry_id, None) is not None:
+                self._index.remove_ids(np.array([entry_id], dtype="int64"))
+
+    def should_audit(self) -> bool:
+        return random.random() < self.audit_rate
+
+    def audit(self, query: str, hit: dict, fresh_chunk_ids, record: bool = True) -> bool:
+        """Compare a hit's cached evidence with fresh retrieval. True if it looks valid.
+
+        A hit that fails the audit is evicted from the cache. `record` adds
+        the result to the false-hit metrics.
+        """
+        cached, fresh = set(hit["chunk_ids"]), set(fresh_chunk_ids or [])
+        union = cached | fresh
+        overlap = len(cached & fresh) / len(union) if union else 1.0
+
+        ok = overlap >= self.min_overlap
+        with self._lock:
+            if not ok:
+                self.rejected += 1
+            if record:
+                self.audits += 1
+            if record and not ok:
+                self.false_hits += 1
+                self.false_hit_samples.append({
+                    "query": query,
+                    "cached_query": hit["query"],
+                    "similarity": round(hit["score"], 4),
+                    "evidence_overlap": round(overlap, 3),
+                })
+        if not ok:
+            if "id" in hit:
+                self.evict(hit["id"])
+            logger.warning(
+                f"Semantic cache false hit: '{query}' matched '{hit['query']}' "
+                f"(sim={hit['score']:.3f}, overlap={overlap:.2f})"
+            )
+        return ok
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+                "rejected": self.rejected,
+                "audits": self.audits,
+                "false_hits": self.false_hits,
+                "false_hit_rate": round(self.false_hits / self.audits, 3) if self.audits else 0.0,
+                "false_hit_samples": list(self.false_hit_samples),
+                "threshold": self.threshold,
+                "index_version": self.version,
+            }
+
+
+_CACHE = None
+
+
+def get_semantic_cache(dim: int):
+    """Shared SemanticCache built from cache.semantic in settings.yaml (None if disabled)."""
+    global _CACHE
+    if _CACHE is None:
+        cfg = get_section("cache").get("semantic") or {}
+        if not cfg.get("enabled", True):
+            return None
+        _CACHE = SemanticCache(
+            dim,
+            threshold=cfg.get("threshold", 0.95),
+            max_entries=cfg.get("max_entries", 5000),
+            audit_rate=cfg.get("audit_rate", 0.05),
+            min_overlap=cfg.get("min_evidence_overlap", 0.5)
+        )
+    return _CACHE
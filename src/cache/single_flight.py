@@ -0,0 +1,37 @@
+import asyncio
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent coroutine calls that share a key, on one event loop.
+
+    The first caller for a key runs the function; callers arriving while it
+    is in flight await it and get the same result (or exception). Nothing
+    is kept once the call finishes, so this only removes duplicate work
+    during bursts; the answer caches handle later repeats.
+    """
+
+    def __init__(self):
+        self._calls = {}
+        self.leaders = 0
+        self.coalesced = 0
+
+    async def do(self, key, fn, *args, **kwargs):
+        """Await fn(*args, **kwargs) once per in-flight key. Returns (result, shared)."""
+        future = self._calls.get(key)
+        if future is not None:
+            self.coalesced += 1
+            # shield: a follower giving up must not cancel the shared call
+            return await asyncio.shield(future), True
+
+        self.leaders += 1
+        future = asyncio.ensure_future(fn(*args, **kwargs))
+        self._calls[key] = future
+        future.add_done_callback(lambda _: self._calls.pop(key, None))
+        return await asyncio.shield(future), False
+
+    def stats(self) -> dict:
+        return {
+            "in_flight": len(self._calls),
+            "leaders": self.leaders,
+            "coalesced": self.coalesced,
+        }
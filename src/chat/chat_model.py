@@ -1,15 +1,26 @@
-from src.chat.language_detect import detect_language
+from src.chat.language_detect import detect_language, detect_languages
 from src.storage.retriever import Retriever
 from src.core.logging import logger
+from src.core.config import get_section
 from src.chat.model_loader import load_model
-from deep_translator import GoogleTranslator
+from src.core.deadline import deadline_after, time_left
+from src.core.tracing import annotate, stage
+from src.cache.answer_cache import get_answer_cache
+from src.cache.semantic_cache import get_semantic_cache
+from src.translation.service import get_translation_service
 
 
 class ChatModel:
-    def __init__(self, llm=None):
+    def __init__(self, llm=None, retriever=None, settings: dict = None):
         # llm: an object with generate(prompt) -> str
         self.llm = llm or load_model()
-        self.retriever = Retriever()
+        self.retriever = retriever or Retriever()
+        # retrieval / prompt / decoding knobs, see `pipeline` in settings.yaml (src.bench.autotune)
+        self.settings = dict(get_section("pipeline") if settings is None else settings)
+        self.cache = get_answer_cache()
+        self.semantic_cache = get_semantic_cache(self.retriever.dim)
+        # question / answer translation for English-only LLMs (`translation` in settings.yaml)
+        self.translation = get_section("translation")
     
     # Multilingual templates for "no result" messages
     NO_RESULT_MESSAGES = {
@@ -19,7 +30,7 @@ class ChatModel:
         "roman": "❌ Maafi chaahta hoon, is topic par video transcripts mein koi information nahi mili."
     }
 
-    def answer(self, query: str, top_k: int = 5):
+    def answer(self, query: str, top_k: int = None, timeout: float = None, profile: str = None):
         """Generate AI answer ONLY from retrieved video segments.
         
         Pipeline:
@@ -28,36 +39,182 @@ class ChatModel:
         3. Extract context from transcripts
         4. Generate answer in SAME language as query
         5. Return answer + real video links with timestamps
+
+        `timeout` (seconds) is the latency budget for the whole request;
+        generation is cut off when it runs out. `profile` picks a decoding
+        speed tier (fast / balanced / quality) instead of the model defaults.
+        `top_k` defaults to pipeline.top_k in settings.yaml.
+
+        The stages are also exposed separately (detect, retrieve, lookup,
+        respond) so the API can run them on different executors.
+        """
+        deadline = deadline_after(timeout)
+        query_lang = self.detect(query)
+        data = self.retrieve(query, top_k=top_k)
+
+        cached = self.lookup(query, query_lang, data, profile)
+        if cached is not None:
+            return cached
+        return self.respond(query, query_lang, data, deadline, profile)
+
+    def detect(self, query: str) -> str:
+        with stage("detect"):
+            query_lang = detect_language(query)
+        annotate("lang", query_lang)
+        logger.debug(f"Detected query language: {query_lang}")
+        return query_lang
+
+    def detect_batch(self, queries: list) -> list:
+        """detect() for many queries in one call."""
+        with stage("detect"):
+            return detect_languages(queries)
+
+    def retrieve(self, query: str, top_k: int = None) -> dict:
+        """Encode the query and retrieve context from ACTUAL video transcripts only."""
+        with stage("encode"):
+            embedding = self.retriever.encode(query)
+        data = self.retriever.get_context(
+            query, top_k=top_k or self.settings.get("top_k", 5), target_lang=None, embedding=embedding,
+            window=self.settings.get("context_window", 0), max_chars=self.settings.get("context_max_chars")
+        )
+        data["embedding"] = embedding
+        annotate("chunk_ids", data.get("chunk_ids"))
+        logger.info(f"Retrieved {len(data.get('sources') or [])} video segments")
+        return data
+
+    def lookup(self, query: str, query_lang: str, data: dict, profile: str = None):
+        """Cached answer for this question, or None.
+
+        1. Exact cache: same question, language and retrieved evidence
+        2. Semantic cache: answer of a near-duplicate question whose cached
+           evidence matches this retrieval
+        """
+        with stage("cache_lookup"):
+            return self._lookup(query, query_lang, data, profile)
+
+    def _lookup(self, query, query_lang, data, profile):
+        if not data.get("sources"):
+            return None
+
+        if self.cache is not None:
+            self.cache.check_version(data.get("index_version"))
+            cached = self.cache.get(self._cache_key(query, query_lang, data, profile))
+            if cached is not None:
+                logger.info("Answer cache hit, skipping generation")
+                annotate("cache", "exact")
+                self._remember_semantic(query_lang, query, cached, data, profile)
+                return cached
+
+        if self.semantic_cache is not None:
+            self.semantic_cache.check_version(data.get("index_version"))
+            hit = self.semantic_cache.lookup(data["embedding"], query_lang, profile)
+            if hit is not None:
+                logger.info(f"Semantic cache hit (sim={hit['score']:.3f}): '{hit['query']}'")
+                # every hit is checked against this retrieval (a mismatch is evicted
+                # and answered afresh); audit_rate only samples the false-hit metrics
+                record = self.semantic_cache.should_audit()
+                if self.semantic_cache.audit(query, hit, data.get("chunk_ids"), record=record):
+                    annotate("cache", "semantic")
+                    return hit["value"]
+
+        return None
+
+    def retrieve_batch(self, queries: list, top_k: int = None) -> list:
+        """retrieve() for many queries with one batched encode + FAISS search."""
+        return self.retriever.get_context_batch(
+            queries, top_k=top_k or self.settings.get("top_k", 5),
+            window=self.settings.get("context_window", 0), max_chars=self.settings.get("context_max_chars")
+        )
+
+    def respond_batch(self, items: list, deadline: float = None, profile: str = None) -> list:
+        """respond() for several (query, query_lang, data) items.
+
+        Prompts with context are generated in one batched LLM call when the
+        model supports generate_batch; each output then goes through the same
+        quality checks and extraction fallback as a single request.
         """
-        query_lang = detect_language(query)
-        logger.info(f"Detected query language: {query_lang}")
+        generate_batch = getattr(self.llm, "generate_batch", None)
+        if generate_batch is None:
+            return [self.respond(q, lang, data, deadline, profile) for q, lang, data in items]
+
+        pending = [
+            i for i, (_, _, data) in enumerate(items)
+            if data.get("sources") and (data.get("context") or "").strip()
+        ]
+        generated = {}
+        if pending and time_left(deadline) > 0:
+            questions = self._prompt_queries([(items[i][0], items[i][1]) for i in pending])
+            prompts = [
+                self._build_prompt(self._clean_context(items[i][2]["context"]), *question)
+                for i, question in zip(pending, questions)
+            ]
+            options = self._llm_options(deadline, profile, [items[i][1] for i in pending])
+            try:
+                with stage("generation"):
+                    outputs = generate_batch(prompts, max_length=self.settings.get("max_new_tokens", 200), **options)
+                generated = dict(zip(pending, outputs))
+            except Exception as e:
+                logger.warning(f"Batched LLM generation failed: {e}, falling back to extraction")
+                generated = {i: "" for i in pending}
+
+        return [
+            self.respond(q, lang, data, deadline, profile, generated=generated.get(i))
+            for i, (q, lang, data) in enumerate(items)
+        ]
+
+    def respond(self, query: str, query_lang: str, data: dict, deadline: float = None, profile: str = None,
+                generated: str = None):
+        """Generate, format and cache the answer for retrieved context.
 
-        # Retrieve context from ACTUAL video transcripts only
-        data = self.retriever.get_context(query, top_k=top_k, target_lang=None)
+        `generated` is raw LLM output already produced for this prompt (see
+        respond_batch); it replaces the LLM call.
+        """
         context = data.get("context", "") or ""
         sources = data.get("sources", []) or []
-        
-        logger.info(f"Retrieved {len(sources)} video segments")
 
         if not sources or not context.strip():
             no_result_msg = self.NO_RESULT_MESSAGES.get(query_lang, self.NO_RESULT_MESSAGES["en"])
-            return {"answer": no_result_msg, "sources": []}
+            return {"answer": no_result_msg, "sources": [], "index_version": data.get("index_version")}
 
         # Clean and prepare context
         clean_context = self._clean_context(context)
         
-        # Generate answer from transcript context
-        answer = self._generate_answer_from_context(clean_context, query, query_lang)
-        
-        # Format answer with styling
-        formatted = self._format_answer(answer, query_lang)
+        # Generate answer from transcript context (batched output is timed in respond_batch)
+        with stage("generation" if generated is None else "answer_check"):
+            answer = self._generate_answer_from_context(
+                clean_context, query, query_lang, deadline, profile, generated
+            )
+        if self.translation.get("answers"):
+            with stage("translation"):
+                answer = self._translate_answer(answer, query_lang)
         
-        # Add real video sources with timestamps
-        top_sources = sources[:5]
-        if top_sources:
-            formatted += self._format_video_sources(top_sources, query_lang)
+        with stage("formatting"):
+            # Format answer with styling
+            formatted = self._format_answer(answer, query_lang)
+
+            # Add real video sources with timestamps
+            top_sources = sources[:5]
+            if top_sources:
+                formatted += self._format_video_sources(top_sources, query_lang)
+
+        result = {"answer": formatted, "sources": top_sources, "index_version": data.get("index_version")}
+        with stage("cache_store"):
+            if self.cache is not None:
+                self.cache.put(self._cache_key(query, query_lang, data, profile), result)
+            self._remember_semantic(query_lang, query, result, data, profile)
+        return result
 
-        return {"answer": formatted, "sources": top_sources}
+    def generate(self, query: str, query_lang: str, data: dict, deadline: float = None, profile: str = None) -> str:
+        """Raw LLM answer for retrieved context: no caching, formatting or fallback."""
+        context = self._clean_context(data.get("context", "") or "")
+        return self._llm_generate(context, query, query_lang, deadline, profile)
+
+    def _cache_key(self, query, lang, data, profile):
+        return self.cache.make_key(query, lang, data.get("chunk_ids") or data.get("sources") or [], profile)
+
+    def _remember_semantic(self, lang, query, result, data, profile):
+        if self.semantic_cache is not None and data.get("embedding") is not None:
+            self.semantic_cache.add(data["embedding"], lang, query, result, data.get("chunk_ids"), profile)
     
     def _clean_context(self, context: str) -> str:
         """Remove timestamp markers from context while preserving content."""
@@ -69,19 +226,26 @@ class ChatModel:
         clean = re.sub(r'\n\n+', '\n', clean)
         return clean.strip()
     
-    def _generate_answer_from_context(self, context: str, query: str, lang: str) -> str:
+    def _generate_answer_from_context(self, context: str, query: str, lang: str, deadline: float = None,
+                                      profile: str = None, generated: str = None) -> str:
         """Generate answer from transcript context in the same language as query.
         
         Strategy:
-        1. Try LLM generation with context
-        2. If LLM fails or answer is weak, extract directly from context
+        1. Try LLM generation with context (stopped at `deadline`)
+        2. If LLM fails, answer is weak or the deadline left only a weak
+           partial answer, extract directly from context
         3. Translate to query language if needed
         """
         answer = ""
         
-        # Try LLM-based generation first
+        # Try LLM-based generation first (skipped if the budget is already spent)
         try:
-            answer = self._llm_generate(context, query, lang)
+            if generated is not None:
+                answer = self._check_llm_answer(generated)
+            elif time_left(deadline) <= 0:
+                raise TimeoutError("deadline passed before generation")
+            else:
+                answer = self._llm_generate(context, query, lang, deadline, profile)
             if answer and len(answer) > 20:
                 logger.info(f"LLM generated answer ({len(answer)} chars)")
                 return answer
@@ -97,37 +261,82 @@ class ChatModel:
         # Last resort: return first meaningful line
         return self._get_first_meaningful_line(context)
     
-    def _llm_generate(self, context: str, query: str, lang: str) -> str:
+    def _llm_generate(self, context: str, query: str, lang: str, deadline: float = None, profile: str = None) -> str:
         """Call LLM with context and query to generate answer."""
         try:
             # Prepare a better prompt
-            prompt = self._build_prompt(context, query, lang)
+            prompt = self._build_prompt(context, *self._prompt_queries([(query, lang)])[0])
             
-            # Call model with reasonable limits (without unsupported parameters)
-            answer = self.llm.generate(prompt, max_length=200)
-            answer = answer.strip()
-            
-            # Validate answer quality
-            if answer and len(answer) > 15:
-                # Remove common prefixes
-                for prefix in ["Answer:", "Jawab:", "Response:", "A:", "Q:"]:
-                    if answer.lower().startswith(prefix.lower()):
-                        answer = answer[len(prefix):].strip()
-                
-                # Check for too much repetition
-                words = answer.split()
-                unique_words = len(set(words))
-                if unique_words > len(words) * 0.25:  # At least 25% unique words
-                    return answer
+            # Call model with reasonable limits (only pass optional parameters when set)
+            options = self._llm_options(deadline, profile, lang)
+            answer = self.llm.generate(prompt, max_length=self.settings.get("max_new_tokens", 200), **options)
+            return self._check_llm_answer(answer)
         except Exception as e:
             logger.warning(f"LLM failed: {e}")
         
         return ""
+
+    def _llm_options(self, deadline, profile, lang=None) -> dict:
+        options = {}
+        if lang is not None and getattr(self.llm, "routes_by_language", False):
+            # ReasonerRouter picks the backend by language (one per prompt for a batch)
+            options["lang"] = lang
+        if deadline is not None:
+            options["deadline"] = deadline
+        if profile:
+            options["profile"] = profile
+        for key in ("num_beams", "max_input_tokens"):
+            if self.settings.get(key):
+                options[key] = self.settings[key]
+        return options
+
+    def _prompt_queries(self, questions: list) -> list:
+        """(query, lang) for each prompt: in English when translation.queries is on."""
+        if not self.translation.get("queries"):
+            return questions
+        service = get_translation_service()
+        out = list(questions)
+        with stage("translation"):
+            for lang in {lang for _, lang in questions if service.model_for(lang, "en")}:
+                indices = [i for i, (_, l) in enumerate(questions) if l == lang]
+                translated = service.translate_batch([questions[i][0] for i in indices], lang, "en")
+                for i, text in zip(indices, translated):
+                    out[i] = (text, "en")
+        return out
+
+    def _translate_answer(self, answer: str, lang: str) -> str:
+        """The answer in the question's language (unchanged if it already is, or cannot be)."""
+        if not answer:
+            return answer
+        service = get_translation_service()
+        answer_lang = detect_language(answer)
+        if service.model_for(answer_lang, lang) is None:
+            return answer
+        return service.translate(answer, answer_lang, lang)
+
+    def _check_llm_answer(self, answer: str) -> str:
+        """Strip answer prefixes; return "" if the output is too short or repetitive."""
+        answer = (answer or "").strip()
+        
+        # Validate answer quality
+        if answer and len(answer) > 15:
+            # Remove common prefixes
+            for prefix in ["Answer:", "Jawab:", "Response:", "A:", "Q:"]:
+                if answer.lower().startswith(prefix.lower()):
+                    answer = answer[len(prefix):].strip()
+            
+            # Check for too much repetition
+            words = answer.split()
+            unique_words = len(set(words))
+            if unique_words > len(words) * 0.25:  # At least 25% unique words
+                return answer
+        
+        return ""
     
     def _build_prompt(self, context: str, query: str, lang: str) -> str:
         """Build an optimized prompt for the LLM."""
         # Limit context length to avoid token overflow
-        context = context[:1500]  # Max 1500 chars of context
+        context = context[:self.settings.get("prompt_context_chars", 1500)]  # Max chars of context
         
         if lang == "ur":
             prompt = f"""یہ معلومات پڑھو:
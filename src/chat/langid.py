@@ -0,0 +1,255 @@
+"""
+Fast language identification: ur / hi / en / roman (language in settings.yaml).
+
+    langid = get_language_identifier()
+    langid.identify("Namaz ki kitni rakat hain?")        # ("roman", 0.97)
+    langid.identify_batch(questions)
+
+One pass over the characters counts Arabic-script, Devanagari and Latin
+letters. Urdu and Hindi are decided by script alone; Latin text goes to a
+naive Bayes model over character 1-3 grams (English vs Roman Urdu) trained
+on our own transcripts and query logs:
+
+    python -m src.chat.langid --traffic data/traffic --chunks data/processed/chunks.pkl
+    python -m src.chat.langid --labelled labelled.jsonl --eval 0.2
+
+Results are deterministic and come with a confidence; detect_language
+(language_detect.py) takes the slow path below `min_confidence`. Without a
+trained model, Latin text scores on the Roman Urdu word list alone.
+"""
+import argparse
+import json
+import math
+import os
+import random
+import re
+import time
+from collections import Counter
+from src.core.config import get_section
+from src.core.logging import logger
+
+LATIN_LANGS = ("en", "roman")
+_NON_LETTERS = re.compile(r"[\W\d_]+")
+ORDERS = (1, 2, 3)
+
+_IDENTIFIER = None
+
+
+# -------------------------
+# SCRIPT
+# -------------------------
+def script_counts(text: str):
+    """(arabic, devanagari, latin) letter counts in one pass."""
+    arabic = devanagari = latin = 0
+    for ch in text:
+        if ch < "\u0080":
+            if ch.isalpha():
+                latin += 1
+            continue
+        code = ord(ch)
+        if 0x0600 <= code <= 0x06FF or 0x0750 <= code <= 0x077F or 0xFB50 <= code <= 0xFEFF:
+            arabic += 1
+        elif 0x0900 <= code <= 0x097F:
+            devanagari += 1
+        elif code <= 0x024F and ch.isalpha():
+            latin += 1
+    return arabic, devanagari, latin
+
+
+def ngrams(text: str, orders=ORDERS):
+    """Character n-grams of each lower-cased word, padded with spaces."""
+    grams = []
+    for word in _NON_LETTERS.sub(" ", text.lower()).split():
+        padded = f" {word} "
+        for n in orders:
+            grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    return grams
+
+
+# -------------------------
+# MODEL
+# -------------------------
+class LanguageIdentifier:
+    def __init__(self, model: dict = None, roman_words=None):
+        # model: {"orders": [...], "priors": {lang: logp}, "logp": {lang: {gram: logp}}, "unseen": {lang: logp}}
+        self.model = model
+        self.roman_words = set(roman_words or ())
+        if model is not None:
+            # one lookup per n-gram: log P(g | roman) - log P(g | en)
+            logp, unseen = model["logp"], model["unseen"]
+            self._ratio = {g: logp["roman"][g] - logp["en"].get(g, unseen["en"]) for g in logp["roman"]}
+            self._unseen = unseen["roman"] - unseen["en"]
+            self._prior = model["priors"]["roman"] - model["priors"]["en"]
+            self._orders = tuple(model["orders"])
+        # word -> summed n-gram ratio; query words repeat a lot
+        self._word_scores = {}
+
+    @classmethod
+    def load(cls, path: str, roman_words=None):
+        model = None
+        if path and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                model = json.load(f)
+        return cls(model, roman_words)
+
+    def save(self, path: str):
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.model, f, ensure_ascii=False, separators=(",", ":"))
+
+    @classmethod
+    def train(cls, samples, max_features: int = 20000, alpha: float = 0.5, orders=ORDERS, roman_words=None):
+        """Multinomial naive Bayes on (text, "en" | "roman") samples."""
+        counts = {lang: Counter() for lang in LATIN_LANGS}
+        docs = Counter()
+        for text, lang in samples:
+            if lang in counts:
+                counts[lang].update(ngrams(text, orders))
+                docs[lang] += 1
+        if not all(docs[lang] for lang in LATIN_LANGS):
+            raise ValueError(f"Need samples of both {LATIN_LANGS}, got {dict(docs)}")
+
+        # keep the most frequent n-grams; the rest share the unseen probability
+        total = counts["en"] + counts["roman"]
+        vocab = [g for g, _ in total.most_common(max_features)]
+        logp, unseen = {}, {}
+        for lang in LATIN_LANGS:
+            denom = sum(counts[lang][g] for g in vocab) + alpha * (len(vocab) + 1)
+            logp[lang] = {g: round(math.log((counts[lang][g] + alpha) / denom), 4) for g in vocab}
+            unseen[lang] = round(math.log(alpha / denom), 4)
+        priors = {lang: round(math.log(docs[lang] / sum(docs.values())), 4) for lang in LATIN_LANGS}
+        return cls({"orders": list(orders), "priors": priors, "logp": logp, "unseen": unseen}, roman_words)
+
+    def _latin(self, text: str):
+        if self.model is None:
+            # no trained model: only the Roman Urdu word list is conclusive
+            words = text.lower().split()
+            hits = sum(1 for w in words if w in self.roman_words)
+            return ("roman", 1.0) if hits >= 2 else ("en", 0.0)
+
+        diff = self._prior
+        scores = self._word_scores
+        for word in _NON_LETTERS.sub(" ", text.lower()).split():
+            score = scores.get(word)
+            if score is None:
+                score = self._word_score(word)
+                if len(scores) >= 50000:
+                    scores.clear()
+                scores[word] = score
+            diff += score
+        # two-class posterior from the log-likelihood ratio
+        p_roman = 1 / (1 + math.exp(-max(-50.0, min(50.0, diff))))
+        return ("roman", p_roman) if p_roman >= 0.5 else ("en", 1 - p_roman)
+
+    def _word_score(self, word: str) -> float:
+        ratio, unseen = self._ratio, self._unseen
+        return sum(ratio.get(gram, unseen) for gram in ngrams(word, self._orders))
+
+    def identify(self, text: str):
+        """(language, confidence in [0, 1])."""
+        if not text or not text.strip():
+            return "en", 1.0
+        arabic, devanagari, latin = script_counts(text)
+        if arabic or devanagari:
+            # script wins over Latin words mixed in; Devanagari on a tie
+            if devanagari >= arabic:
+                return "hi", devanagari / (arabic + devanagari)
+            return "ur", arabic / (arabic + devanagari)
+        if not latin:
+            return "en", 0.0
+        lang, confidence = self._latin(text)
+        return lang, round(confidence, 4)
+
+    def identify_batch(self, texts: list) -> list:
+        return [self.identify(text) for text in texts]
+
+
+def get_language_identifier() -> LanguageIdentifier:
+    """Shared LanguageIdentifier with the model from language.model in settings.yaml."""
+    global _IDENTIFIER
+    if _IDENTIFIER is None:
+        from src.chat.language_detect import ROMAN_URDU_WORDS
+        path = get_section("language").get("model")
+        _IDENTIFIER = LanguageIdentifier.load(path, ROMAN_URDU_WORDS)
+        if _IDENTIFIER.model is None:
+            logger.info(f"No language ID model at {path}, Latin text scored on the Roman Urdu word list")
+    return _IDENTIFIER
+
+
+# -------------------------
+# TRAINING
+# -------------------------
+def _latin_only(text: str) -> bool:
+    arabic, devanagari, latin = script_counts(text)
+    return latin >= 3 and not arabic and not devanagari
+
+
+def collect_samples(traffic: str = None, labelled: str = None, chunks: str = None) -> list:
+    """(text, lang) for Latin-script text: recorded queries, labelled JSONL and transcripts.
+
+    Recorded queries keep the language production detected; transcript
+    chunks and titles are labelled by the slow detector.
+    """
+    from src.chat.language_detect import detect_language_slow
+    samples = []
+    if traffic:
+        from src.api.recorder import read_records
+        for record in read_records(traffic):
+            if record.get("q") and record.get("lang") in LATIN_LANGS:
+                samples.append((record["q"], record["lang"]))
+    if labelled:
+        with open(labelled, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    item = json.loads(line)
+                    samples.append((item["text"], item["lang"]))
+    if chunks:
+        import pickle
+        with open(chunks, "rb") as f:
+            items = pickle.load(f)
+        texts = {c.get("title") or "" for c in items} | {c.get("text") or c.get("text_roman") or "" for c in items}
+        for text in sorted(texts):
+            if _latin_only(text):
+                samples.append((text, detect_language_slow(text)))
+    return [(text, lang) for text, lang in samples if lang in LATIN_LANGS and _latin_only(text)]
+
+
+def evaluate(identifier: LanguageIdentifier, samples: list, min_confidence: float) -> dict:
+    started = time.perf_counter()
+    results = identifier.identify_batch([text for text, _ in samples])
+    elapsed = time.perf_counter() - started
+    confident = [(r, lang) for r, (_, lang) in zip(results, samples) if r[1] >= min_confidence]
+    return {
+        "samples": len(samples),
+        "accuracy": round(sum(r[0] == lang for r, (_, lang) in zip(results, samples)) / len(samples), 4),
+        "confident_share": round(len(confident) / len(samples), 4),
+        "confident_accuracy": round(sum(r[0] == lang for r, lang in confident) / len(confident), 4) if confident else None,
+        "us_per_text": round(1e6 * elapsed / len(samples), 1),
+    }
+
+
+if __name__ == "__main__":
+    cfg = get_section("language")
+    parser = argparse.ArgumentParser(description="Train the English / Roman Urdu character n-gram model")
+    parser.add_argument("--traffic", help="recorder directory or traffic file (src/api/recorder.py)")
+    parser.add_argument("--labelled", help="JSONL with text and lang (en | roman)")
+    parser.add_argument("--chunks", help="chunk store (pickle) whose Latin-script text and titles are used")
+    parser.add_argument("--out", default=cfg.get("model") or "models/langid.json")
+    parser.add_argument("--max-features", type=int, default=20000)
+    parser.add_argument("--eval", type=float, default=0.2, help="held-out share for the report (0 = none)")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    from src.chat.language_detect import ROMAN_URDU_WORDS
+    samples = collect_samples(args.traffic, args.labelled, args.chunks)
+    random.Random(args.seed).shuffle(samples)
+    held = samples[:int(len(samples) * args.eval)]
+    train = samples[len(held):]
+    print(f"{len(train)} training samples {dict(Counter(lang for _, lang in train))}, {len(held)} held out")
+
+    identifier = LanguageIdentifier.train(train, args.max_features, roman_words=ROMAN_URDU_WORDS)
+    if held:
+        print("Held out:", evaluate(identifier, held, float(cfg.get("min_confidence") or 0.8)))
+    identifier.save(args.out)
+    print(f"Model written to {args.out}")
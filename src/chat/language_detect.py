@@ -1,6 +1,11 @@
 import re
-from langdetect import detect, detect_langs
+from langdetect import DetectorFactory, detect, detect_langs
+from src.core.config import get_section
 from src.core.logging import logger
+from src.chat.langid import get_language_identifier
+
+# langdetect is random unless seeded: same text, same answer
+DetectorFactory.seed = 0
 
 
 ROMAN_URDU_WORDS = {
@@ -31,6 +36,31 @@ def _is_roman_urdu(text: str) -> bool:
 
 def detect_language(text: str) -> str:
     """Detect language: 'ur' (Urdu), 'hi' (Hindi), 'en' (English), 'roman' (Roman Urdu).
+
+    Script and character n-gram identification (src/chat/langid.py) first;
+    below language.min_confidence the slow path below decides.
+    """
+    lang, confidence = get_language_identifier().identify(text)
+    if confidence >= _min_confidence():
+        logger.debug(f"Language: {lang} ({confidence:.2f})")
+        return lang
+    return detect_language_slow(text)
+
+
+def detect_languages(texts: list) -> list:
+    """detect_language() for many texts."""
+    threshold = _min_confidence()
+    results = get_language_identifier().identify_batch(texts)
+    return [lang if confidence >= threshold else detect_language_slow(text)
+            for text, (lang, confidence) in zip(texts, results)]
+
+
+def _min_confidence() -> float:
+    return float(get_section("language").get("min_confidence", 0.8))
+
+
+def detect_language_slow(text: str) -> str:
+    """Regex, word list and langdetect detection (the fallback of detect_language).
     
     Priority order:
     1. Script detection (Arabic = Urdu, Devanagari = Hindi)
@@ -39,27 +69,27 @@ def detect_language(text: str) -> str:
     4. Default to English
     """
     if not text or not text.strip():
-        logger.info("Empty text, defaulting to 'en'")
+        logger.debug("Empty text, defaulting to 'en'")
         return "en"
 
     # 1. Script-based detection (fastest)
     if _has_devanagari_script(text):
-        logger.info(f"Language: Hindi (Devanagari script detected)")
+        logger.debug(f"Language: Hindi (Devanagari script detected)")
         return "hi"
     
     if _has_arabic_script(text):
-        logger.info(f"Language: Urdu (Arabic script detected)")
+        logger.debug(f"Language: Urdu (Arabic script detected)")
         return "ur"
 
     # 2. Roman-Urdu heuristics
     if _is_roman_urdu(text):
-        logger.info(f"Language: Roman Urdu (roman words detected)")
+        logger.debug(f"Language: Roman Urdu (roman words detected)")
         return "roman"
 
     # 3. langdetect library
     try:
         detected = detect(text)
-        logger.info(f"langdetect result: {detected}")
+        logger.debug(f"langdetect result: {detected}")
         
         if detected.startswith("en"):
             return "en"
@@ -1,31 +1,65 @@
 import os
 import logging
-from transformers import AutoTokenizer, AutoModelForSeq2SeqLM, pipeline
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
 import torch
+from src.reasoning.precision import load_model as load_hf_model
+from src.reasoning.backends import get_backend
+from src.reasoning.profiles import get_profile
+from src.core.config import get_section
 
 logger = logging.getLogger("allama")
 
 class ModelLoader:
-    def __init__(self, model_name=None):
+    def __init__(self, model_name=None, precision=None):
         self.model_name = model_name or os.getenv("HF_MODEL", "google/flan-t5-small")
-        device = 0 if torch.cuda.is_available() else -1
+        device = "cuda" if torch.cuda.is_available() else "cpu"
         logger.info(f"Loading Seq2Seq model: {self.model_name} on device {device}")
 
-        # Load tokenizer and Seq2Seq model
+        # Load tokenizer and Seq2Seq model (torch or ctranslate2 backend)
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_name)
-
-        # Pipeline for text2text generation
-        self.pipe = pipeline(
-            "text2text-generation",
-            model=self.model,
-            tokenizer=self.tokenizer,
-            device=device
+        self.backend = get_backend(
+            "chat", self.model_name, self.tokenizer, device,
+            lambda: load_hf_model("chat", AutoModelForSeq2SeqLM, self.model_name, device, precision, self.tokenizer)
         )
+        self.model = getattr(self.backend, "model", None)
+        self.precision = self.backend.precision
 
-    def generate(self, prompt: str, max_length=256):
-        output = self.pipe(prompt, max_length=max_length)
-        return output[0]["generated_text"]
+    @staticmethod
+    def _decoding(max_length, profile, num_beams, max_input_tokens) -> dict:
+        # a named profile replaces max_length / num_beams
+        decoding = dict(get_profile(profile)) if profile else dict(max_new_tokens=max_length)
+        if num_beams and not profile:
+            decoding["num_beams"] = num_beams
+        if max_input_tokens:
+            decoding["max_input_tokens"] = max_input_tokens
+        return decoding
+
+    def generate(self, prompt: str, max_length=256, deadline=None, profile=None, num_beams=None,
+                 max_input_tokens=None):
+        decoding = self._decoding(max_length, profile, num_beams, max_input_tokens)
+        return self.backend.generate([prompt], deadline=deadline, **decoding)[0]
+
+    def generate_batch(self, prompts: list, max_length=256, deadline=None, profile=None, num_beams=None,
+                       max_input_tokens=None):
+        decoding = self._decoding(max_length, profile, num_beams, max_input_tokens)
+        return self.backend.generate(prompts, deadline=deadline, **decoding)
 
 def load_model(model_name=None):
     return ModelLoader(model_name)
+
+def load_reasoner(name: str = None, model_name: str = None):
+    """Chat LLM picked by pipeline.reasoner / pipeline.model (reasoning.stub.enabled forces the stub).
+
+    `router` returns a ReasonerRouter that picks a backend per request (reasoning.router).
+    """
+    cfg = get_section("pipeline")
+    name = name or cfg.get("reasoner") or "seq2seq"
+    if (get_section("reasoning").get("stub") or {}).get("enabled") or name == "stub":
+        from src.reasoning.stub_reasoner import StubReasoner
+        return StubReasoner.from_config()
+    if name == "router":
+        from src.reasoning.router import ReasonerRouter
+        return ReasonerRouter.from_config()
+    if name != "seq2seq":
+        raise ValueError(f"Unknown reasoner '{name}'. Available: seq2seq, router, stub")
+    return ModelLoader(model_name or cfg.get("model"))
@@ -0,0 +1,61 @@
+# src/core/config.py
+import os
+import re
+import yaml
+
+SETTINGS_PATH = os.getenv("ALLAMA_SETTINGS", "config/settings.yaml")
+
+# ${VAR} or ${VAR:-default}
+_ENV_PATTERN = re.compile(r"\$\{([A-Za-z_][A-Za-z0-9_]*)(?::-([^}]*))?\}")
+
+_SETTINGS = None
+
+
+def _expand(value):
+    """Substitute ${VAR} / ${VAR:-default} placeholders from the environment.
+
+    A value that is a single placeholder is re-parsed as YAML so that
+    `${FLAG:-false}` becomes a bool and `${N:-4}` an int.
+    """
+    if isinstance(value, dict):
+        return {k: _expand(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [_expand(v) for v in value]
+    if not isinstance(value, str) or "${" not in value:
+        return value
+
+    whole = _ENV_PATTERN.fullmatch(value.strip())
+    if whole:
+        raw = os.getenv(whole.group(1), whole.group(2))
+        if raw is None:
+            return None
+        return yaml.safe_load(raw) if raw.strip() else raw
+
+    return _ENV_PATTERN.sub(lambda m: os.getenv(m.group(1), m.group(2) or ""), value)
+
+
+def load_settings(path: str = None) -> dict:
+    path = path or SETTINGS_PATH
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        data = yaml.safe_load(f) or {}
+    return _expand(data)
+
+
+def get_settings() -> dict:
+    global _SETTINGS
+    if _SETTINGS is None:
+        _SETTINGS = load_settings()
+    return _SETTINGS
+
+
+def reload_settings() -> dict:
+    global _SETTINGS
+    _SETTINGS = load_settings()
+    return _SETTINGS
+
+
+def get_section(name: str) -> dict:
+    """Return a top-level settings section, or an empty dict if missing."""
+    return get_settings().get(name) or {}
@@ -0,0 +1,14 @@
+import time
+
+
+def deadline_after(seconds):
+    """Absolute monotonic deadline `seconds` from now (None = no deadline)."""
+    if seconds is None:
+        return None
+    return time.monotonic() + float(seconds)
+
+
+def time_left(deadline) -> float:
+    if deadline is None:
+        return float("inf")
+    return deadline - time.monotonic()
@@ -0,0 +1,75 @@
+"""
+Per-process memory from /proc (Linux only).
+
+Used to check what forked API workers actually share with the master:
+`unique` (USS) is what a worker costs on its own, `shared` is pages it
+still shares copy-on-write (model weights, the mmap'd FAISS index), and
+`pss` splits shared pages fairly between the processes using them.
+"""
+import os
+
+# smaps_rollup field -> report key (values are kB)
+_FIELDS = {
+    "Rss": "rss",
+    "Pss": "pss",
+    "Shared_Clean": "shared_clean",
+    "Shared_Dirty": "shared_dirty",
+    "Private_Clean": "private_clean",
+    "Private_Dirty": "private_dirty",
+    "Swap": "swap",
+}
+
+
+def parse_smaps_rollup(text: str) -> dict:
+    """smaps_rollup content -> {rss, pss, unique, shared, ...} in MB."""
+    kb = {}
+    for line in text.splitlines():
+        name, _, rest = line.partition(":")
+        if name in _FIELDS:
+            kb[_FIELDS[name]] = int(rest.split()[0])
+
+    mb = {key: round(value / 1024, 1) for key, value in kb.items()}
+    mb["unique"] = round((kb.get("private_clean", 0) + kb.get("private_dirty", 0)) / 1024, 1)
+    mb["shared"] = round((kb.get("shared_clean", 0) + kb.get("shared_dirty", 0)) / 1024, 1)
+    return mb
+
+
+def process_memory(pid: int = None) -> dict:
+    """Memory of one process in MB, or None where /proc is not available."""
+    pid = pid or os.getpid()
+    try:
+        with open(f"/proc/{pid}/smaps_rollup") as f:
+            report = parse_smaps_rollup(f.read())
+    except OSError:
+        return None
+    report["pid"] = pid
+    return report
+
+
+def child_pids(pid: int) -> list:
+    try:
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            return [int(p) for p in f.read().split()]
+    except OSError:
+        return []
+
+
+def worker_memory_report(master_pid: int = None) -> dict:
+    """Master + forked workers, with totals.
+
+    `total_pss` is the real RAM cost of the whole group; compare it with
+    `workers * master rss` to see how much copy-on-write saves.
+    """
+    master_pid = master_pid or os.getppid()
+    master = process_memory(master_pid)
+    workers = [m for m in (process_memory(p) for p in child_pids(master_pid)) if m]
+
+    processes = ([master] if master else []) + workers
+    return {
+        "master": master,
+        "workers": workers,
+        "total_rss_mb": round(sum(p["rss"] for p in processes), 1),
+        "total_pss_mb": round(sum(p.get("pss", 0) for p in processes), 1),
+        "worker_unique_mb": round(sum(w["unique"] for w in workers), 1),
+        "worker_shared_mb": round(sum(w["shared"] for w in workers), 1),
+    }
@@ -0,0 +1,342 @@
+"""
+Models kept loaded under a RAM budget (reasoning.pool in settings.yaml).
+
+    pool = get_model_pool()
+    reasoner = pool.get("gpt2", GPT2Reasoner)          # loads, or reuses the loaded one
+    with pool.use("mbart", MBartTranslator) as mbart:  # not evicted while in use
+        mbart.translate([text], "ur", "en")
+
+Each model's resident size is measured when it loads (torch weights and
+buffers, or the process RSS growth for CTranslate2 and other objects). When
+a load would go over `budget_mb`, the least recently used models are evicted
+first; pinned and in-use models never are.
+
+With `offload` on, an evicted torch model keeps its Python object (tokenizer,
+config, wrappers) and only its weights go: they are written once to a
+safetensors file under `offload_dir` and the modules are moved to the meta
+device. The next `get` reads the weights back from that (memory-mapped)
+file, which skips from_pretrained, dtype conversion and quantization setup.
+CTranslate2 translators are unloaded and reloaded in place. Models whose
+weights cannot be offloaded (dynamic int8) are dropped and rebuilt.
+"""
+import gc
+import os
+import shutil
+import threading
+import time
+from contextlib import contextmanager
+from src.core.config import get_section
+from src.core.logging import logger
+from src.core.memory import process_memory
+
+_POOL = None
+
+
+class _Entry:
+    def __init__(self, key, obj, size, pinned):
+        self.key = key
+        self.obj = obj
+        self.size = size
+        self.pinned = pinned
+        self.state = "loaded"   # or "offloaded"
+        self.last_used = time.monotonic()
+        self.in_use = 0
+        self.hits = 0
+        self.restores = 0
+        self.offloaded = []     # (module, file, device) / translators
+
+
+def _is_module(value) -> bool:
+    return hasattr(value, "state_dict") and hasattr(value, "to_empty") and hasattr(value, "parameters")
+
+
+def _find(obj, predicate, depth: int = 2) -> list:
+    """(attribute path, value) for values matching `predicate` in obj and its attributes."""
+    found, seen = [], set()
+
+    def walk(value, path, level):
+        if id(value) in seen:
+            return
+        seen.add(id(value))
+        if predicate(value):
+            found.append((path or "self", value))
+            return
+        if level < depth and hasattr(value, "__dict__") and not isinstance(value, type):
+            for name, child in vars(value).items():
+                if not name.startswith("__"):
+                    walk(child, f"{path}.{name}" if path else name, level + 1)
+
+    walk(obj, "", 0)
+    return found
+
+
+def _rss_bytes() -> int:
+    report = process_memory() or {}
+    return int((report.get("rss") or 0) * 2 ** 20)
+
+
+def resident_bytes(obj) -> int:
+    """Weights and buffers of every torch module reachable from obj (0 if none)."""
+    modules = _find(obj, _is_module)
+    if not modules:
+        return 0
+    from src.reasoning.precision import footprint_bytes
+    return sum(footprint_bytes(module) for _, module in modules)
+
+
+class ModelPool:
+    def __init__(self, budget_mb: float = 8192, offload: bool = False, offload_dir: str = "models/offload"):
+        self.budget = int(budget_mb * 2 ** 20)
+        self.offload = offload
+        self.offload_root = offload_dir
+        self._written = set()   # offload files this process wrote completely
+        self._entries = {}
+        self._sizes = {}   # last known size per key, to make room before a reload
+        self._lock = threading.RLock()
+        self._load_lock = threading.Lock()
+        self.loads = 0
+        self.hits = 0
+        self.evictions = 0
+        self.offloads = 0
+        self.restores = 0
+
+    # -------------------------
+    # PUBLIC
+    # -------------------------
+    def get(self, key: str, loader, pinned: bool = False, hold: bool = False):
+        """The model for `key`, calling loader() (no arguments) if it is not loaded.
+
+        `pinned` models are never evicted; `hold` marks the model in use
+        until release(key) (see use()).
+        """
+        entry = self._hit(key, hold)
+        if entry is not None:
+            return entry.obj
+
+        with self._load_lock:
+            entry = self._hit(key, hold)
+            if entry is not None:
+                return entry.obj
+
+            with self._lock:
+                entry = self._entries.get(key)
+            self._make_room(self._sizes.get(key, 0), exclude=key)
+
+            if entry is not None and entry.state == "offloaded" and not self._restore(entry):
+                with self._lock:
+                    self._entries.pop(key, None)
+                entry = None
+
+            if entry is None:
+                entry = self._load(key, loader, pinned)
+            if hold:
+                with self._lock:
+                    entry.in_use += 1
+
+            # the measured size may be larger than the estimate
+            self._make_room(0, exclude=key)
+            return entry.obj
+
+    def release(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.in_use:
+                entry.in_use -= 1
+
+    @contextmanager
+    def use(self, key: str, loader):
+        """get(), with the model protected from eviction until the block ends."""
+        obj = self.get(key, loader, hold=True)
+        try:
+            yield obj
+        finally:
+            self.release(key)
+
+    def evict(self, key: str) -> bool:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.state != "loaded" or entry.in_use:
+                return False
+            self._evict(entry)
+            return True
+
+    @property
+    def used(self) -> int:
+        with self._lock:
+            return sum(e.size for e in self._entries.values() if e.state == "loaded")
+
+    def stats(self) -> dict:
+        with self._lock:
+            models = [
+                {
+                    "key": e.key,
+                    "state": e.state,
+                    "size_mb": round(e.size / 2 ** 20, 1),
+                    "pinned": e.pinned,
+                    "in_use": e.in_use,
+                    "hits": e.hits,
+                    "restores": e.restores,
+                    "idle_s": round(time.monotonic() - e.last_used, 1),
+                }
+                for e in sorted(self._entries.values(), key=lambda e: -e.last_used)
+            ]
+        return {
+            "budget_mb": round(self.budget / 2 ** 20, 1),
+            "used_mb": round(self.used / 2 ** 20, 1),
+            "loaded": sum(m["state"] == "loaded" for m in models),
+            "loads": self.loads,
+            "hits": self.hits,
+            "evictions": self.evictions,
+            "offloads": self.offloads,
+            "restores": self.restores,
+            "models": models,
+        }
+
+    # -------------------------
+    # LOAD / EVICT
+    # -------------------------
+    def _hit(self, key, hold=False):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.state != "loaded":
+                return None
+            entry.last_used = time.monotonic()
+            entry.hits += 1
+            self.hits += 1
+            if hold:
+                entry.in_use += 1
+            return entry
+
+    def _load(self, key, loader, pinned):
+        rss_before = _rss_bytes()
+        started = time.perf_counter()
+        obj = loader()
+        size = resident_bytes(obj) or max(0, _rss_bytes() - rss_before)
+
+        entry = _Entry(key, obj, size, pinned)
+        with self._lock:
+            self._entries[key] = entry
+            self._sizes[key] = size
+            self.loads += 1
+        logger.info(
+            f"Model pool: loaded {key} ({size / 2 ** 20:.0f} MB) in {time.perf_counter() - started:.1f}s, "
+            f"{self.used / 2 ** 20:.0f}/{self.budget / 2 ** 20:.0f} MB used"
+        )
+        return entry
+
+    def _make_room(self, needed: int, exclude: str = None):
+        with self._lock:
+            while self.used + needed > self.budget:
+                candidates = [
+                    e for e in self._entries.values()
+                    if e.state == "loaded" and not e.pinned and not e.in_use and e.key != exclude
+                ]
+                if not candidates:
+                    logger.warning(
+                        f"Model pool over budget ({(self.used + needed) / 2 ** 20:.0f} MB > "
+                        f"{self.budget / 2 ** 20:.0f} MB) and nothing can be evicted"
+                    )
+                    return
+                self._evict(min(candidates, key=lambda e: e.last_used))
+
+    def _evict(self, entry):
+        if self.offload and self._offload(entry):
+            entry.state = "offloaded"
+            self.offloads += 1
+            action = "offloaded"
+        else:
+            self._entries.pop(entry.key, None)
+            action = "evicted"
+        self.evictions += 1
+        gc.collect()
+        logger.info(f"Model pool: {action} {entry.key} ({entry.size / 2 ** 20:.0f} MB, least recently used)")
+
+    # -------------------------
+    # OFFLOAD
+    # -------------------------
+    @property
+    def offload_dir(self) -> str:
+        # per process, looked up at offload time: the pool is built in the
+        # preload master, and forked workers must not share (or delete) its files
+        return os.path.join(self.offload_root, str(os.getpid()))
+
+    def _file(self, entry, path) -> str:
+        return os.path.join(self.offload_dir, f"{entry.key}-{path}.safetensors".replace("/", "_"))
+
+    def _offload(self, entry) -> bool:
+        """Weights to disk, modules to the meta device. False if the model cannot be offloaded."""
+        translators = [t for _, t in _find(entry.obj, lambda v: hasattr(v, "unload_model") and hasattr(v, "load_model"))]
+        modules = _find(entry.obj, _is_module)
+        if not modules and not translators:
+            return False
+        try:
+            import torch
+            # packed int8 weights (dynamic quantization) are not plain tensors
+            if any(not isinstance(v, torch.Tensor) for _, m in modules for v in m.state_dict().values()):
+                return False
+
+            from safetensors.torch import save_model
+            os.makedirs(self.offload_dir, exist_ok=True)
+            offloaded = []
+            for path, module in modules:
+                file = self._file(entry, path)
+                if file not in self._written:
+                    # weights never change after loading, so one copy per model is enough;
+                    # written aside and renamed, so a restore never reads a partial file
+                    tmp = f"{file}.tmp"
+                    save_model(module, tmp)
+                    os.replace(tmp, file)
+                    self._written.add(file)
+                device = next(module.parameters()).device
+                module.to("meta")
+                offloaded.append((module, file, device))
+            for translator in translators:
+                translator.unload_model()
+                offloaded.append(translator)
+        except Exception as e:
+            logger.warning(f"Model pool: could not offload {entry.key}: {e}")
+            return False
+        entry.offloaded = offloaded
+        return True
+
+    def _restore(self, entry) -> bool:
+        started = time.perf_counter()
+        try:
+            from safetensors.torch import load_model
+            for item in entry.offloaded:
+                if isinstance(item, tuple):
+                    module, file, device = item
+                    module.to_empty(device=device)
+                    load_model(module, file, device=str(device))
+                    module.eval()
+                else:
+                    item.load_model()
+        except Exception as e:
+            logger.warning(f"Model pool: could not restore {entry.key}, reloading it: {e}")
+            return False
+
+        with self._lock:
+            entry.state = "loaded"
+            entry.offloaded = []
+            entry.last_used = time.monotonic()
+            entry.restores += 1
+            self.restores += 1
+        logger.info(f"Model pool: restored {entry.key} from offload in {time.perf_counter() - started:.2f}s")
+        return True
+
+    def clear_offload(self):
+        shutil.rmtree(self.offload_dir, ignore_errors=True)
+        self._written.clear()
+
+
+def get_model_pool() -> ModelPool:
+    """Shared ModelPool built from reasoning.pool in settings.yaml."""
+    global _POOL
+    if _POOL is None:
+        cfg = get_section("reasoning").get("pool") or {}
+        _POOL = ModelPool(
+            budget_mb=float(cfg.get("budget_mb") or 8192),
+            offload=bool(cfg.get("offload")),
+            offload_dir=cfg.get("offload_dir") or "models/offload"
+        )
+    return _POOL
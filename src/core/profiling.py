@@ -0,0 +1,193 @@
+"""
+On-demand request profiling (serving.profiling in settings.yaml).
+
+A profiled /ask request (header `X-Debug-Profile: 1`, query `?debug_profile=1`
+or picked by `sample_rate`) runs ChatModel.answer under cProfile in one
+thread, and every torch generate call inside it (LLM, translation, query
+normalization) under torch.profiler:
+
+    profiler = get_profiler()
+    result, profile_id = profiler.run(chat.answer, question, meta={...})
+
+Each profile is a directory under `dir`:
+    python.prof         cProfile stats (snakeviz / pstats)
+    python.txt          top functions by cumulative time
+    torch_trace-<n>.json  chrome://tracing / Perfetto trace of the n-th generate()
+    meta.json           question, latency, stage timings, which model each trace is
+The directory is pruned to `max_files` profiles and `max_mb` in total.
+
+When no profile is active, `torch_trace` is a single ContextVar lookup.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import random
+import re
+import shutil
+import threading
+import time
+import uuid
+from contextlib import contextmanager, nullcontext
+from contextvars import ContextVar
+from itertools import count
+from src.core.config import get_section
+from src.core.logging import logger
+from src.core.tracing import current_trace
+
+_ACTIVE = ContextVar("rag_profile", default=None)
+_PROFILER = None
+
+PROFILE_FILES = ("python.prof", "python.txt", "meta.json")
+# one per profiled generate() call, numbered in call order
+TRACE_FILE = re.compile(r"torch_trace-\d+\.json")
+
+
+class _ActiveProfile:
+    def __init__(self, path: str):
+        self.path = path
+        self.numbers = count(1)
+        self.traces = []   # {"file", "model", "ms"} per torch trace
+
+
+class RequestProfiler:
+    def __init__(self, directory: str = "data/profiles", sample_rate: float = 0.0, max_files: int = 50,
+                 max_mb: float = 200, torch: bool = True):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.max_files = max_files
+        self.max_bytes = int(max_mb * 2 ** 20)
+        self.torch = torch
+        self._lock = threading.Lock()
+
+    def wanted(self, requested: bool = False) -> bool:
+        """Profile this request? Explicit request or sampling."""
+        return requested or (self.sample_rate > 0 and random.random() < self.sample_rate)
+
+    def run(self, fn, *args, meta: dict = None, **kwargs):
+        """Call fn under cProfile (this thread only). Returns (result, profile id)."""
+        profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+        path = os.path.join(self.directory, profile_id)
+        os.makedirs(path, exist_ok=True)
+
+        active = _ActiveProfile(path) if self.torch else None
+        token = _ACTIVE.set(active)
+        profile = cProfile.Profile()
+        started = time.perf_counter()
+        try:
+            result = profile.runcall(fn, *args, **kwargs)
+        finally:
+            _ACTIVE.reset(token)
+            elapsed = time.perf_counter() - started
+            meta = dict(meta or {}, id=profile_id, latency_ms=round(1000 * elapsed, 1))
+            if active is not None:
+                meta["torch_traces"] = list(active.traces)
+            trace = current_trace()
+            if trace is not None:
+                meta["stages_ms"] = trace.breakdown()["stages_ms"]
+            self._write(path, profile, meta)
+        return result, profile_id
+
+    def _write(self, path, profile, meta):
+        profile.dump_stats(os.path.join(path, "python.prof"))
+        text = io.StringIO()
+        pstats.Stats(profile, stream=text).sort_stats("cumulative").print_stats(60)
+        with open(os.path.join(path, "python.txt"), "w", encoding="utf-8") as f:
+            f.write(text.getvalue())
+        with open(os.path.join(path, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False, default=str)
+        logger.info(f"Request profile written to {path} ({meta['latency_ms']} ms)")
+        self._prune()
+
+    def _prune(self):
+        """Drop the oldest profiles beyond max_files / max_mb."""
+        with self._lock:
+            entries = self.list()
+            total = sum(e["bytes"] for e in entries)
+            while entries and (len(entries) > self.max_files or total > self.max_bytes):
+                oldest = entries.pop()
+                total -= oldest["bytes"]
+                shutil.rmtree(os.path.join(self.directory, oldest["id"]), ignore_errors=True)
+
+    def list(self) -> list:
+        """Stored profiles, newest first."""
+        if not os.path.isdir(self.directory):
+            return []
+        entries = []
+        for name in os.listdir(self.directory):
+            path = os.path.join(self.directory, name)
+            if not os.path.isdir(path):
+                continue
+            files = {f: os.path.getsize(os.path.join(path, f)) for f in os.listdir(path) if _profile_file(f)}
+            meta = {}
+            if "meta.json" in files:
+                try:
+                    with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+                        meta = json.load(f)
+                except ValueError:
+                    pass
+            entries.append({
+                "id": name,
+                "created": os.path.getmtime(path),
+                "question": meta.get("question"),
+                "latency_ms": meta.get("latency_ms"),
+                "files": sorted(files),
+                "bytes": sum(files.values()),
+            })
+        entries.sort(key=lambda e: e["created"], reverse=True)
+        return entries
+
+    def file_path(self, profile_id: str, name: str):
+        """Path of a stored profile file, or None (also for anything outside the profile dir)."""
+        if not _profile_file(name) or os.path.basename(profile_id) != profile_id:
+            return None
+        path = os.path.join(self.directory, profile_id, name)
+        return path if os.path.isfile(path) else None
+
+
+def _profile_file(name: str) -> bool:
+    return name in PROFILE_FILES or bool(TRACE_FILE.fullmatch(name))
+
+
+@contextmanager
+def _torch_profile(active: _ActiveProfile, model: str):
+    import torch
+    from torch.profiler import ProfilerActivity, profile
+
+    activities = [ProfilerActivity.CPU]
+    if torch.cuda.is_available():
+        activities.append(ProfilerActivity.CUDA)
+    name = f"torch_trace-{next(active.numbers)}.json"
+    started = time.perf_counter()
+    with profile(activities=activities, record_shapes=True) as prof:
+        yield
+    elapsed = time.perf_counter() - started
+    prof.export_chrome_trace(os.path.join(active.path, name))
+    active.traces.append({"file": name, "model": model, "ms": round(1000 * elapsed, 1)})
+
+
+def torch_trace(model: str = None):
+    """torch.profiler around the enclosed block when the current request is profiled.
+
+    Each call writes its own trace file; `model` names it in meta.json.
+    """
+    active = _ACTIVE.get()
+    return _torch_profile(active, model) if active is not None else nullcontext()
+
+
+def get_profiler():
+    """Shared RequestProfiler from serving.profiling in settings.yaml (None if disabled)."""
+    global _PROFILER
+    if _PROFILER is None:
+        cfg = get_section("serving").get("profiling") or {}
+        if not cfg.get("enabled"):
+            return None
+        _PROFILER = RequestProfiler(
+            cfg.get("dir") or "data/profiles",
+            sample_rate=float(cfg.get("sample_rate") or 0),
+            max_files=int(cfg.get("max_files") or 50),
+            max_mb=float(cfg.get("max_mb") or 200),
+            torch=cfg.get("torch", True)
+        )
+    return _PROFILER
@@ -0,0 +1,62 @@
+import threading
+import time
+from contextlib import contextmanager
+from src.core.logging import logger
+
+
+class Startup:
+    """Load / warm-up progress of the API process, for /healthz and /readyz.
+
+    Components are loaded inside `timed(name)` blocks so the cold start
+    can be broken down by component. `run_in_background` runs the loader
+    on a thread, letting the server bind and answer health checks while
+    models load.
+    """
+
+    def __init__(self):
+        self.created = time.time()
+        self.state = "starting"   # starting | loading | warming | ready | failed
+        self.error = None
+        self.components = {}      # name -> seconds
+        self._ready = threading.Event()
+        self._thread = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready.is_set()
+
+    @contextmanager
+    def timed(self, name: str):
+        started = time.perf_counter()
+        yield
+        self.components[name] = round(time.perf_counter() - started, 3)
+        logger.info(f"Startup: {name} took {self.components[name]:.2f}s")
+
+    def run_in_background(self, fn):
+        """Run fn(self) on a thread; ready when it returns, failed if it raises."""
+        def run():
+            try:
+                fn(self)
+                self.state = "ready"
+                self._ready.set()
+                logger.info(f"Ready after {time.time() - self.created:.1f}s: {self.components}")
+            except Exception as e:
+                self.state = "failed"
+                self.error = f"{type(e).__name__}: {e}"
+                logger.exception("Startup failed")
+
+        if self._thread is None:
+            self._thread = threading.Thread(target=run, name="startup", daemon=True)
+            self._thread.start()
+
+    def wait(self, timeout: float = None) -> bool:
+        return self._ready.wait(timeout)
+
+    def report(self) -> dict:
+        return {
+            "state": self.state,
+            "error": self.error,
+            "uptime_s": round(time.time() - self.created, 1),
+            "components_s": dict(self.components),
+            "total_s": round(sum(self.components.values()), 3),
+        }
@@ -0,0 +1,248 @@
+"""
+CPU thread budget for torch, FAISS (OpenMP) and HF tokenizers.
+
+Every library defaults to "all cores", which oversubscribes the machine as
+soon as several workers or stages run at once. `configure_threads(role)` is
+called first thing by the API, the Streamlit app and the build scripts and
+applies the `threads` section of settings.yaml (with `threads.roles.<role>`
+overrides). It does not import torch or FAISS: processes that load them later
+call `apply_library_threads()` once they have (see load_components in
+src/app.py).
+
+    python -m src.core.threads               # show effective settings
+    python -m src.core.threads --benchmark   # sweep torch thread counts
+
+torch.set_num_threads and the FAISS OpenMP setting are process-wide, not
+per thread: the budget is set once per process and shared by every stage.
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from src.core.config import get_section
+from src.core.logging import logger
+
+_APPLIED = None
+_ROLE = None
+
+
+def parse_cores(spec) -> set:
+    """"0-3,8" / [0, 1, 2] -> {0, 1, 2, 3, 8}"""
+    if spec is None or spec == "":
+        return set()
+    if isinstance(spec, int):
+        return {spec}
+    if isinstance(spec, (list, tuple)):
+        return {int(c) for c in spec}
+
+    cores = set()
+    for part in str(spec).split(","):
+        part = part.strip()
+        if "-" in part:
+            lo, hi = part.split("-")
+            cores.update(range(int(lo), int(hi) + 1))
+        elif part:
+            cores.add(int(part))
+    return cores
+
+
+def thread_budget(role: str = None) -> dict:
+    cfg = dict(get_section("threads"))
+    roles = cfg.pop("roles", None) or {}
+    if role and roles.get(role):
+        cfg.update(roles[role])
+    return cfg
+
+
+def _set_env(name, value):
+    if value:
+        os.environ[name] = str(value)
+
+
+def configure_threads(role: str = None, worker_index: int = None) -> dict:
+    """Apply the thread budget for `role` to this process and report it.
+
+    Sets the environment and core pinning, then the torch / FAISS thread
+    counts if those are already imported; it never imports them itself, so
+    it is cheap at module import time. Code that loads them later calls
+    apply_library_threads() afterwards.
+
+    `cpu_affinity` may be one core set for the process or a list of sets,
+    one per worker (picked by `worker_index`).
+    """
+    global _ROLE
+    _ROLE = role
+    cfg = thread_budget(role)
+    torch_threads = int(cfg.get("torch") or 0)
+    tokenizer_threads = int(cfg.get("tokenizers") or 0)
+
+    # 1. Environment (read by OpenMP / MKL / tokenizers at first use)
+    _set_env("OMP_NUM_THREADS", torch_threads)
+    _set_env("MKL_NUM_THREADS", torch_threads)
+    _set_env("RAYON_RS_NUM_CPUS", tokenizer_threads)
+    os.environ["TOKENIZERS_PARALLELISM"] = "true" if tokenizer_threads > 1 else "false"
+
+    # 2. Core pinning
+    affinity = cfg.get("cpu_affinity")
+    if isinstance(affinity, (list, tuple)) and affinity and not isinstance(affinity[0], int):
+        affinity = affinity[(worker_index or 0) % len(affinity)]
+    cores = parse_cores(affinity)
+    if cores and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cores)
+
+    # 3. Libraries already imported in this process
+    return apply_library_threads(role)
+
+
+def apply_library_threads(role: str = None) -> dict:
+    """Set torch and FAISS thread counts, for whichever of them is imported.
+
+    `role` defaults to the one last passed to configure_threads.
+    """
+    global _APPLIED
+    role = role if role is not None else _ROLE
+    cfg = thread_budget(role)
+    torch_threads = int(cfg.get("torch") or 0)
+    interop_threads = int(cfg.get("torch_interop") or 0)
+    faiss_threads = int(cfg.get("faiss") or 0)
+
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        if torch_threads:
+            torch.set_num_threads(torch_threads)
+        if interop_threads:
+            try:
+                torch.set_num_interop_threads(interop_threads)
+            except RuntimeError:
+                # only allowed once, before any inter-op work has started
+                pass
+
+    faiss = sys.modules.get("faiss")
+    if faiss is not None and faiss_threads:
+        faiss.omp_set_num_threads(faiss_threads)
+
+    _APPLIED = effective_settings(role)
+    logger.info(f"Thread budget ({role or 'default'}): {_APPLIED}")
+    return _APPLIED
+
+
+def effective_settings(role: str = None) -> dict:
+    """What the libraries report right now (not just what was requested).
+
+    torch and FAISS are only reported once something has imported them.
+    """
+    report = {
+        "role": role,
+        "cpu_count": os.cpu_count(),
+        "affinity": sorted(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else None,
+        "tokenizers_parallelism": os.environ.get("TOKENIZERS_PARALLELISM"),
+        "rayon_threads": os.environ.get("RAYON_RS_NUM_CPUS"),
+    }
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        report["torch_threads"] = torch.get_num_threads()
+        report["torch_interop_threads"] = torch.get_num_interop_threads()
+    faiss = sys.modules.get("faiss")
+    if faiss is not None:
+        report["faiss_threads"] = faiss.omp_get_max_threads()
+    return report
+
+
+def applied_settings() -> dict:
+    return _APPLIED or effective_settings()
+
+
+# -------------------------
+# BENCHMARK
+# -------------------------
+BENCH_QUERIES = [
+    "What is Imaan?",
+    "نماز کیا ہے؟",
+    "Quran kaun sa kitaab hai?",
+    "Allah ke 99 naam kya hain?",
+    "What are Huruf-e-Muqatta'at?",
+    "Bani Israel ko fazilat kyun di gayi?",
+]
+
+
+def _run_for(duration, fn):
+    """Call fn in a loop on its own thread for `duration` seconds."""
+    count = [0]
+
+    def loop():
+        end = time.perf_counter() + duration
+        while time.perf_counter() < end:
+            fn()
+            count[0] += 1
+
+    worker = threading.Thread(target=loop)
+    worker.start()
+    return worker, count
+
+
+def benchmark(total_threads: int = None, duration: float = 20.0, encoder_model: str = None) -> list:
+    """Run encoder and generator side by side for each torch thread count.
+
+    The count is process-wide, so both share it as they do when serving.
+    Returns rows sorted by score: the geometric mean of encoder and
+    generator throughput, each relative to its best value in the sweep.
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from src.chat.model_loader import ModelLoader
+
+    total = total_threads
+    if not total:
+        total = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    total = max(1, total or 1)
+    encoder = SentenceTransformer(encoder_model or "intfloat/multilingual-e5-large")
+    generator = ModelLoader()
+    prompt = "Read this information:\nIman is belief.\n\nQuestion: What is Imaan?\n\nAnswer based on the information above:"
+
+    def encode():
+        encoder.encode(["query: " + q for q in BENCH_QUERIES], normalize_embeddings=True)
+
+    def generate():
+        generator.generate(prompt, max_length=32)
+
+    rows = []
+    for threads in range(1, total + 1):
+        torch.set_num_threads(threads)
+        enc_worker, enc_count = _run_for(duration, encode)
+        gen_worker, gen_count = _run_for(duration, generate)
+        enc_worker.join()
+        gen_worker.join()
+
+        rows.append({
+            "torch_threads": threads,
+            "encoder_qps": enc_count[0] * len(BENCH_QUERIES) / duration,
+            "generator_rps": gen_count[0] / duration,
+        })
+        logger.info(f"torch threads {threads}: {rows[-1]}")
+
+    best_enc = max(r["encoder_qps"] for r in rows) or 1.0
+    best_gen = max(r["generator_rps"] for r in rows) or 1.0
+    for r in rows:
+        r["score"] = round(((r["encoder_qps"] / best_enc) * (r["generator_rps"] / best_gen)) ** 0.5, 3)
+    return sorted(rows, key=lambda r: r["score"], reverse=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Show or benchmark the CPU thread budget")
+    parser.add_argument("--role", default=None, help="threads.roles entry to apply")
+    parser.add_argument("--benchmark", action="store_true", help="sweep torch thread counts")
+    parser.add_argument("--threads", type=int, default=None, help="highest thread count to try (default: usable cores)")
+    parser.add_argument("--duration", type=float, default=20.0, help="seconds per thread count")
+    args = parser.parse_args()
+
+    print(configure_threads(args.role))
+
+    if args.benchmark:
+        results = benchmark(args.threads, args.duration)
+        print(f"\n{'threads':>7} {'enc q/s':>9} {'gen req/s':>10} {'score':>6}")
+        for r in results:
+            print(f"{r['torch_threads']:>7} {r['encoder_qps']:>9.1f} {r['generator_rps']:>10.2f} {r['score']:>6.3f}")
+
+        print("\nRecommended (config/settings.yaml):")
+        print(f"  threads.torch: {results[0]['torch_threads']}")
@@ -0,0 +1,107 @@
+"""
+Per-request stage timing.
+
+    trace = start_trace()          # once per request (API handler)
+    with stage("search"):          # anywhere below it, any thread
+        ...
+    trace.breakdown()
+
+`annotate(key, value)` attaches request facts found along the way (detected
+language, retrieved chunk ids, cache hits) for the traffic recorder. A
+request coalesced onto another one's work `adopt`s that request's trace.
+Every stage also feeds the `rag_stage_seconds` histogram, with or without a
+trace. The trace lives in a context variable; StageExecutor copies the
+context into its worker threads, so stages run there land in the same trace.
+"""
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from src.core.metrics import REGISTRY
+
+_CURRENT = ContextVar("rag_trace", default=None)
+
+STAGE_SECONDS = REGISTRY.histogram("rag_stage_seconds", "Time spent per answer stage", ["stage"])
+PROMPT_TOKENS = REGISTRY.counter("rag_prompt_tokens_total", "Prompt tokens sent to a model", ["model"])
+OUTPUT_TOKENS = REGISTRY.counter("rag_output_tokens_total", "Tokens generated by a model", ["model"])
+
+
+class Trace:
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stages = {}   # name -> seconds (summed when a stage runs more than once)
+        self.tokens = {}   # model -> {"prompt": n, "output": n}
+        self.notes = {}    # annotate(): lang, chunk_ids, cache, ...
+        self._lock = threading.Lock()
+
+    def add_stage(self, name: str, seconds: float):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_tokens(self, model: str, prompt: int, output: int):
+        with self._lock:
+            counts = self.tokens.setdefault(model, {"prompt": 0, "output": 0})
+            counts["prompt"] += prompt
+            counts["output"] += output
+
+    def annotate(self, key: str, value):
+        with self._lock:
+            self.notes[key] = value
+
+    def adopt(self, other: "Trace"):
+        """Take the notes and stage times of the request whose work this one shared."""
+        with other._lock:
+            notes, stages = dict(other.notes), dict(other.stages)
+        with self._lock:
+            self.notes.update(notes)
+            for name, seconds in stages.items():
+                self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def breakdown(self) -> dict:
+        with self._lock:
+            return {
+                "total_ms": round(1000 * (time.perf_counter() - self.started), 1),
+                "stages_ms": {name: round(1000 * s, 1) for name, s in self.stages.items()},
+                "tokens": {model: dict(counts) for model, counts in self.tokens.items()},
+                "notes": dict(self.notes),
+            }
+
+
+def start_trace() -> Trace:
+    trace = Trace()
+    _CURRENT.set(trace)
+    return trace
+
+
+def current_trace():
+    return _CURRENT.get()
+
+
+def record_stage(name: str, seconds: float):
+    STAGE_SECONDS.observe(seconds, stage=name)
+    trace = _CURRENT.get()
+    if trace is not None:
+        trace.add_stage(name, seconds)
+
+
+@contextmanager
+def stage(name: str):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - started)
+
+
+def annotate(key: str, value):
+    trace = _CURRENT.get()
+    if trace is not None:
+        trace.annotate(key, value)
+
+
+def record_tokens(model: str, prompt: int, output: int):
+    PROMPT_TOKENS.inc(prompt, model=model)
+    OUTPUT_TOKENS.inc(output, model=model)
+    trace = _CURRENT.get()
+    if trace is not None:
+        trace.add_tokens(model, prompt, output)
@@ -0,0 +1,120 @@
+import threading
+from collections import deque
+from src.core.logging import logger
+
+
+class ForwardCounter:
+    """Counts forward passes of a model while active (context manager)."""
+
+    def __init__(self, model):
+        self.model = model
+        self.calls = 0
+        self._handle = None
+
+    def _hook(self, module, args, output):
+        self.calls += 1
+
+    def __enter__(self):
+        self._handle = self.model.register_forward_hook(self._hook)
+        return self
+
+    def __exit__(self, *exc):
+        self._handle.remove()
+        return False
+
+
+class AssistedDecodingStats:
+    """Acceptance tracking and on/off control for assisted generation.
+
+    Each target-model forward pass in assisted mode verifies
+    `num_assistant_tokens` draft tokens and always yields one token of its
+    own, so `new_tokens / forwards - 1` is the number of accepted draft
+    tokens per step. If the rolling acceptance rate or the speedup over
+    plain decoding drops below the configured minimum, assisted mode is
+    switched off for `cooldown` requests and then probed again.
+
+    The speedup needs a plain-decoding baseline, so every `baseline_every`-th
+    request runs without the draft model (0 = never: speedup is then only
+    known from requests in cooldown, after an acceptance-rate fallback).
+    """
+
+    def __init__(self, num_assistant_tokens=5, min_acceptance_rate=0.3, min_speedup=1.1, window=20, cooldown=50,
+                 baseline_every=10):
+        self.num_assistant_tokens = num_assistant_tokens
+        self.min_acceptance_rate = min_acceptance_rate
+        self.min_speedup = min_speedup
+        self.window = window
+        self.cooldown = cooldown
+        self.baseline_every = baseline_every
+
+        self._lock = threading.Lock()
+        self._assisted = deque(maxlen=window)   # (new_tokens, forwards, seconds)
+        self._plain = deque(maxlen=window)      # (new_tokens, seconds)
+        self._cooldown_left = 0
+        self._requests = 0
+        self.assisted_calls = 0
+        self.plain_calls = 0
+        self.fallbacks = 0
+
+    def active(self) -> bool:
+        """Use the draft model for this request? False in cooldown and for baseline requests."""
+        with self._lock:
+            if self._cooldown_left > 0:
+                self._cooldown_left -= 1
+                return False
+            self._requests += 1
+            # a plain request now and then keeps the speedup baseline current
+            return not (self.baseline_every and self._requests % self.baseline_every == 0)
+
+    def disable(self, reason: str):
+        with self._lock:
+            self._cooldown_left = self.cooldown
+            self._assisted.clear()
+            self.fallbacks += 1
+        logger.warning(f"Assisted decoding off for {self.cooldown} requests: {reason}")
+
+    def record(self, assisted: bool, new_tokens: int, forwards: int, seconds: float):
+        with self._lock:
+            if assisted:
+                self.assisted_calls += 1
+                self._assisted.append((new_tokens, max(forwards, 1), seconds))
+            else:
+                self.plain_calls += 1
+                self._plain.append((new_tokens, seconds))
+            full = len(self._assisted) >= self.window
+
+        if assisted and full:
+            snap = self.snapshot()
+            if snap["acceptance_rate"] < self.min_acceptance_rate:
+                self.disable(f"acceptance rate {snap['acceptance_rate']:.2f} < {self.min_acceptance_rate}")
+            elif snap["speedup"] is not None and snap["speedup"] < self.min_speedup:
+                self.disable(f"speedup {snap['speedup']:.2f}x < {self.min_speedup}x")
+
+    @staticmethod
+    def _tokens_per_second(samples) -> float:
+        tokens = sum(s[0] for s in samples)
+        seconds = sum(s[-1] for s in samples)
+        return tokens / seconds if seconds else 0.0
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            assisted, plain = list(self._assisted), list(self._plain)
+
+        tokens = sum(s[0] for s in assisted)
+        forwards = sum(s[1] for s in assisted)
+        per_forward = tokens / forwards if forwards else 0.0
+        acceptance = max(0.0, min(1.0, (per_forward - 1) / self.num_assistant_tokens)) if forwards else 0.0
+
+        assisted_tps = self._tokens_per_second(assisted)
+        plain_tps = self._tokens_per_second(plain)
+
+        return {
+            "acceptance_rate": round(acceptance, 3),
+            "tokens_per_forward": round(per_forward, 2),
+            "assisted_tok_s": round(assisted_tps, 1),
+            "plain_tok_s": round(plain_tps, 1),
+            "speedup": round(assisted_tps / plain_tps, 2) if plain_tps and assisted_tps else None,
+            "assisted_calls": self.assisted_calls,
+            "plain_calls": self.plain_calls,
+            "fallbacks": self.fallbacks,
+        }
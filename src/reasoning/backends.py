@@ -0,0 +1,219 @@
+import os
+import time
+import torch
+from src.core.config import get_section
+from src.core.logging import logger
+from src.core.profiling import torch_trace
+from src.core.tracing import record_tokens
+from src.reasoning.stopping import deadline_criteria, time_left
+
+BACKENDS = ("torch", "ctranslate2")
+
+
+class InferenceBackend:
+    """Seq2seq generation behind a model class.
+
+    `generate` takes a batch of source texts and returns one decoded string
+    per text. `target_prefix` is a target-side language token (MBart).
+    `deadline` is a time.monotonic() value; decoding stops there and returns
+    whatever has been generated so far.
+    """
+
+    name = "base"
+    precision = None
+    # model key from get_backend (chat, mt5, ...), used to label token metrics
+    model_name = None
+
+    def generate(
+        self,
+        texts: list,
+        max_new_tokens: int = 256,
+        min_length: int = 0,
+        num_beams: int = None,
+        repetition_penalty: float = 1.0,
+        no_repeat_ngram_size: int = 0,
+        max_input_tokens: int = 512,
+        target_prefix: str = None,
+        deadline: float = None,
+        min_new_tokens: int = 0,
+        do_sample: bool = False,
+        temperature: float = 1.0,
+        top_p: float = 1.0,
+    ) -> list:
+        raise NotImplementedError
+
+
+class TorchBackend(InferenceBackend):
+    name = "torch"
+
+    def __init__(self, model, tokenizer, device, precision="fp32"):
+        self.model = model
+        self.tokenizer = tokenizer
+        self.device = device
+        self.precision = precision
+
+    def generate(self, texts, max_new_tokens=256, min_length=0, num_beams=None, repetition_penalty=1.0,
+                 no_repeat_ngram_size=0, max_input_tokens=512, target_prefix=None, deadline=None,
+                 min_new_tokens=0, do_sample=False, temperature=1.0, top_p=1.0):
+        inputs = self.tokenizer(
+            texts,
+            return_tensors="pt",
+            padding=True,
+            truncation=True,
+            max_length=max_input_tokens
+        ).to(self.device)
+
+        kwargs = dict(max_new_tokens=max_new_tokens, repetition_penalty=repetition_penalty)
+        if min_length:
+            kwargs["min_length"] = min_length
+        if min_new_tokens:
+            kwargs["min_new_tokens"] = min_new_tokens
+        if do_sample:
+            kwargs.update(do_sample=True, temperature=temperature, top_p=top_p)
+        if num_beams:
+            kwargs.update(num_beams=num_beams, early_stopping=num_beams > 1)
+        if no_repeat_ngram_size:
+            kwargs["no_repeat_ngram_size"] = no_repeat_ngram_size
+        if target_prefix:
+            kwargs["forced_bos_token_id"] = self.tokenizer.convert_tokens_to_ids(target_prefix)
+
+        criteria, stopping = deadline_criteria(deadline)
+        if stopping is not None:
+            kwargs["stopping_criteria"] = stopping
+
+        # torch.profiler trace when this request is being profiled (src.core.profiling)
+        with torch.no_grad(), torch_trace(self.model_name):
+            output = self.model.generate(**inputs, **kwargs)
+
+        if criteria is not None and criteria.hit:
+            logger.info("Generation stopped at deadline, returning partial output")
+
+        # seq2seq: `output` holds only decoder tokens, padded to the longest
+        record_tokens(
+            self.model_name or "unknown",
+            int(inputs["attention_mask"].sum()),
+            int((output != self.tokenizer.pad_token_id).sum())
+        )
+
+        return [text.strip() for text in self.tokenizer.batch_decode(output, skip_special_tokens=True)]
+
+
+class CTranslate2Backend(InferenceBackend):
+    """Runs a model converted with `python -m src.reasoning.convert_ct2`.
+
+    Tokenization stays with the HF tokenizer; CTranslate2 does the (batched)
+    beam search with int8 weights on CPU.
+    """
+
+    name = "ctranslate2"
+
+    def __init__(self, model_dir, tokenizer, device="cpu", compute_type="int8", intra_threads=0, max_batch_size=16):
+        import ctranslate2
+
+        self.tokenizer = tokenizer
+        self.precision = compute_type
+        self.max_batch_size = max_batch_size
+        self.translator = ctranslate2.Translator(
+            model_dir,
+            device=device,
+            compute_type=compute_type,
+            intra_threads=intra_threads
+        )
+
+    def _source_tokens(self, text, max_input_tokens):
+        ids = self.tokenizer.encode(text, truncation=True, max_length=max_input_tokens)
+        return self.tokenizer.convert_ids_to_tokens(ids)
+
+    def generate(self, texts, max_new_tokens=256, min_length=0, num_beams=None, repetition_penalty=1.0,
+                 no_repeat_ngram_size=0, max_input_tokens=512, target_prefix=None, deadline=None,
+                 min_new_tokens=0, do_sample=False, temperature=1.0, top_p=1.0):
+        sources = [self._source_tokens(t, max_input_tokens) for t in texts]
+
+        # CTranslate2 can only be interrupted token by token in greedy mode;
+        # with beams the deadline is checked before decoding starts.
+        beam_size = num_beams or 1
+        extra = {}
+        if deadline is not None:
+            if time_left(deadline) <= 0:
+                return [""] * len(texts)
+            if beam_size == 1:
+                extra["callback"] = lambda step: time.monotonic() >= deadline
+        if do_sample:
+            extra.update(sampling_topk=0, sampling_topp=top_p, sampling_temperature=temperature)
+
+        results = self.translator.translate_batch(
+            sources,
+            target_prefix=[[target_prefix]] * len(sources) if target_prefix else None,
+            beam_size=beam_size,
+            max_batch_size=self.max_batch_size,
+            max_decoding_length=max_new_tokens,
+            min_decoding_length=max(min_length, min_new_tokens),
+            repetition_penalty=repetition_penalty,
+            no_repeat_ngram_size=no_repeat_ngram_size,
+            **extra
+        )
+
+        record_tokens(
+            self.model_name or "unknown",
+            sum(len(src) for src in sources),
+            sum(len(result.hypotheses[0]) for result in results)
+        )
+
+        outputs = []
+        for result in results:
+            tokens = result.hypotheses[0]
+            if target_prefix and tokens[:1] == [target_prefix]:
+                tokens = tokens[1:]
+            ids = self.tokenizer.convert_tokens_to_ids(tokens)
+            outputs.append(self.tokenizer.decode(ids, skip_special_tokens=True).strip())
+        return outputs
+
+
+def ct2_model_dir(model_id: str) -> str:
+    """Where the converted copy of `model_id` lives."""
+    cfg = get_section("reasoning").get("backend") or {}
+    root = cfg.get("ct2_dir") or "models/ct2"
+    return os.path.join(root, model_id.replace("/", "__"))
+
+
+def resolve_backend(name: str) -> str:
+    cfg = get_section("reasoning").get("backend") or {}
+    backend = (cfg.get(name) or cfg.get("default") or "torch").lower()
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown backend '{backend}' for {name}, using torch")
+        return "torch"
+    return backend
+
+
+def get_backend(name: str, model_id: str, tokenizer, device: str, load_torch, backend: str = None):
+    """Build the configured backend for a seq2seq model.
+
+    `load_torch` is only called for the torch backend (or as a fallback), so
+    a CTranslate2 deployment never loads the PyTorch weights.
+    """
+    backend = backend or resolve_backend(name)
+
+    if backend == "ctranslate2":
+        model_dir = ct2_model_dir(model_id)
+        if os.path.isdir(model_dir):
+            cfg = get_section("reasoning").get("backend") or {}
+            logger.info(f"{name}: using CTranslate2 model at {model_dir}")
+            ct2 = CTranslate2Backend(
+                model_dir,
+                tokenizer,
+                device=device,
+                compute_type=cfg.get("compute_type") or "int8",
+                intra_threads=cfg.get("intra_threads") or 0,
+                max_batch_size=cfg.get("max_batch_size") or 16
+            )
+            ct2.model_name = name
+            return ct2
+        logger.warning(
+            f"{name}: no CTranslate2 model at {model_dir}, falling back to torch. "
+            f"Run: python -m src.reasoning.convert_ct2 --model {model_id}"
+        )
+
+    model, precision = load_torch()
+    torch_backend = TorchBackend(model, tokenizer, device, precision)
+    torch_backend.model_name = name
+    return torch_backend
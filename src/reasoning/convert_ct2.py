@@ -0,0 +1,50 @@
+"""
+Offline conversion of the seq2seq models to CTranslate2.
+
+    python -m src.reasoning.convert_ct2 --all
+    python -m src.reasoning.convert_ct2 --model google/mt5-base --quantization int8
+
+Converted models are written under reasoning.backend.ct2_dir and picked up
+when the model's backend is set to `ctranslate2` in config/settings.yaml.
+"""
+import argparse
+from src.reasoning.backends import ct2_model_dir
+
+SEQ2SEQ_MODELS = [
+    "google/mt5-base",
+    "google/flan-t5-large",
+    "google/flan-t5-small",
+    "facebook/mbart-large-50-many-to-many-mmt",
+    "Helsinki-NLP/opus-mt-en-ur",
+    "Helsinki-NLP/opus-mt-ur-en",
+    "Helsinki-NLP/opus-mt-hi-en",
+    "Helsinki-NLP/opus-mt-en-hi",
+]
+
+
+def convert(model_id: str, quantization: str = "int8", output_dir: str = None, force: bool = False) -> str:
+    from ctranslate2.converters import TransformersConverter
+
+    output_dir = output_dir or ct2_model_dir(model_id)
+    print(f"Converting {model_id} -> {output_dir} ({quantization})")
+
+    converter = TransformersConverter(model_id)
+    return converter.convert(output_dir, quantization=quantization, force=force)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert seq2seq models to CTranslate2")
+    parser.add_argument("--model", action="append", help="HF model id (repeatable)")
+    parser.add_argument("--all", action="store_true", help="convert every seq2seq model used by the project")
+    parser.add_argument("--quantization", default="int8", help="int8, int8_float32, float16, ...")
+    parser.add_argument("--output", help="output dir (single model only)")
+    parser.add_argument("--force", action="store_true", help="overwrite an existing conversion")
+    args = parser.parse_args()
+
+    models = SEQ2SEQ_MODELS if args.all else (args.model or [])
+    if not models:
+        parser.error("pass --model or --all")
+
+    for model_id in models:
+        out = convert(model_id, args.quantization, args.output if len(models) == 1 else None, args.force)
+        print(f"Saved {out}")
@@ -1,7 +1,12 @@
 # src/reasoning/evidence_builder.py
 
-from src.retrieval.search import VectorSearcher
+from contextlib import ExitStack
+from src.retrieval.search import load_searcher
 from src.reasoning.gpt2_reasoner import GPT2Reasoner
+from src.chat.language_detect import detect_language
+from src.cache.answer_cache import get_answer_cache
+from src.core.tracing import stage, start_trace
+from src.core.model_pool import get_model_pool
 
 SCORE_THRESHOLD = 0.4
 
@@ -16,8 +21,11 @@ def build_evidence_answer(question: str, top_k: int = 5):
     print(query)
 
     # 2. Vector Search
-    searcher = VectorSearcher()
-    results = searcher.search(query, top_k=top_k)
+    searcher = load_searcher()
+    with stage("encode"):
+        embedding = searcher.encode(query)
+    with stage("search"):
+        results = searcher.search(query, top_k=top_k, embedding=embedding)
 
     if not results:
         return "No evidence found.", []
@@ -27,35 +35,56 @@ def build_evidence_answer(question: str, top_k: int = 5):
     scores = []
 
     # 3. Collect evidence (DIRECT STRUCTURE)
-    for res in results:
-        text = res.get("text", "")
-        score = float(res.get("score", 0.0))
+    with stage("context"):
+        for res in results:
+            text = res.get("text") or res.get("text_roman") or ""
+            score = float(res.get("score", 0.0))
 
-        if not text.strip():
-            continue
+            if not text.strip():
+                continue
 
-        evidence_blocks.append(text)
-        scores.append(score)
+            evidence_blocks.append(text)
+            scores.append(score)
 
-        references.append({
-            "title": res.get("title", "Unknown"),
-            "time": f"{res.get('start_hhmmss', '')}–{res.get('end_hhmmss', '')}",
-            "url": res.get("play_url", "")
-        })
+            references.append({
+                "title": res.get("title", "Unknown"),
+                "time": f"{res.get('start_hhmmss', '')}–{res.get('end_hhmmss', '')}",
+                "url": res.get("play_url", "")
+            })
 
     if not evidence_blocks:
         return "No usable evidence found.", []
 
     max_score = max(scores) if scores else 0.0
 
-    # 4. Reasoning (GPT-2, CPU SAFE)
-    reasoner = GPT2Reasoner()
-    answer = reasoner.build_answer(
-        question=question,
-        evidence=evidence_blocks,
-        score=max_score
-    )
+    # Exact answer cache: skip reasoning for a question seen on the same evidence
+    cache = get_answer_cache()
+    cache_key = None
+    if cache is not None:
+        with stage("cache_lookup"):
+            cache.check_version(getattr(searcher, "version", None))
+            chunk_ids = [res.get("chunk_id") or res.get("index") for res in results]
+            cache_key = cache.make_key(question, detect_language(question), chunk_ids, "evidence")
+            cached = cache.get(cache_key)
+        if cached is not None:
+            return cached
 
+    # 4. Reasoning (GPT-2, CPU SAFE)
+    with ExitStack() as held:
+        with stage("reasoner_load"):
+            # loaded once, then kept while the model pool's RAM budget allows;
+            # held until generation ends so it cannot be evicted mid-answer
+            reasoner = held.enter_context(get_model_pool().use("gpt2", GPT2Reasoner))
+        with stage("generation"):
+            answer = reasoner.build_answer(
+                question=question,
+                evidence=evidence_blocks,
+                score=max_score,
+                min_score=SCORE_THRESHOLD
+            )
+
+    if cache_key is not None:
+        cache.put(cache_key, (answer, references))
     return answer, references
 
 
@@ -63,6 +92,7 @@ def build_evidence_answer(question: str, top_k: int = 5):
 # CLI TEST
 # -------------------------
 if __name__ == "__main__":
+    trace = start_trace()
     q = (
         "What are Huruf-e-Muqatta'at "
         "(the disconnected letters like Alif Lam Meem) "
@@ -78,3 +108,6 @@ if __name__ == "__main__":
     for r in refs:
         print(f"- {r['title']} [{r['time']}]")
         print(f"  {r['url']}")
+
+    print("\n=== TIMINGS ===\n")
+    print(trace.breakdown())
@@ -1,6 +1,10 @@
 import torch
 import warnings
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from src.reasoning.precision import load_model
+from src.reasoning.backends import get_backend
+from src.reasoning.profiles import get_profile
+from src.core.logging import logger
 
 warnings.filterwarnings("ignore")
 
@@ -69,14 +73,18 @@ warnings.filterwarnings("ignore")
 
 
 class FlanT5Reasoner:
-    def __init__(self):
+    def __init__(self, precision: str = None):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
         self.tokenizer = AutoTokenizer.from_pretrained("google/flan-t5-large")  
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(
-            "google/flan-t5-large",
-            torch_dtype=torch.float16 if self.device == "cuda" else torch.float32
-        ).to(self.device)
-        self.model.eval()
+        self.backend = get_backend(
+            "flan_t5", "google/flan-t5-large", self.tokenizer, self.device,
+            lambda: load_model(
+                "flan_t5", AutoModelForSeq2SeqLM, "google/flan-t5-large", self.device, precision, self.tokenizer,
+                cuda_mode="fp16"
+            )
+        )
+        self.model = getattr(self.backend, "model", None)
+        self.precision = self.backend.precision
 
         self.max_input_tokens = 512
         self.max_new_tokens = 200
@@ -87,21 +95,21 @@ class FlanT5Reasoner:
             return text
         return self.tokenizer.decode(tokens[:self.max_input_tokens], skip_special_tokens=True)
 
-    def generate(self, prompt: str) -> str:
+    def generate(self, prompt: str, profile: str = None) -> str:
         prompt = self._safe_trim(prompt)
-        inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=self.max_input_tokens).to(self.device)
-
-        with torch.no_grad():
-            output = self.model.generate(
-                **inputs,
-                max_new_tokens=self.max_new_tokens,
-                min_length=50,
-                num_beams=2,
-                repetition_penalty=1.2,
-                no_repeat_ngram_size=2,
-                early_stopping=True
-            )
-        print("Raw IDs:", output)
-        print("Decoded:", self.tokenizer.decode(output[0]))
 
-        return self.tokenizer.decode(output[0], skip_special_tokens=True).strip()
+        if profile:
+            decoding = get_profile(profile)
+        else:
+            decoding = dict(max_new_tokens=self.max_new_tokens, min_length=50, num_beams=2)
+
+        text = self.backend.generate(
+            [prompt],
+            repetition_penalty=1.2,
+            no_repeat_ngram_size=2,
+            max_input_tokens=self.max_input_tokens,
+            **decoding
+        )[0]
+        logger.debug(f"Decoded: {text}")
+
+        return text
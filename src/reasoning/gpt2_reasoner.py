@@ -1,21 +1,25 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
+from src.reasoning.precision import load_model
+from src.reasoning.profiles import get_profile
+from src.reasoning.stopping import deadline_criteria
+from src.core.logging import logger
+from src.core.profiling import torch_trace
+from src.core.tracing import record_tokens
 
 
 class GPT2Reasoner:
-    def __init__(self):
+    def __init__(self, precision: str = None):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
         self.tokenizer = AutoTokenizer.from_pretrained("gpt2")
-        self.model = AutoModelForCausalLM.from_pretrained(
-            "gpt2",
-            torch_dtype=torch.float32
-        ).to(self.device)
-
         if self.tokenizer.pad_token_id is None:
             self.tokenizer.pad_token = self.tokenizer.eos_token
 
-        self.model.eval()
+        # fp32 / bf16 / int8, see reasoning.precision in settings.yaml
+        self.model, self.precision = load_model(
+            "gpt2", AutoModelForCausalLM, "gpt2", self.device, precision, self.tokenizer
+        )
 
         # 🔴 HARD GPT-2 LIMIT
         self.max_positions = self.model.config.n_positions  # = 1024
@@ -35,7 +39,15 @@ class GPT2Reasoner:
 
         return self.tokenizer.decode(tokens, skip_special_tokens=True)
 
-    def generate(self, prompt: str, max_new_tokens: int = 200) -> str:
+    def generate(self, prompt: str, max_new_tokens: int = 200, profile: str = None, deadline: float = None) -> str:
+        decoding = dict(do_sample=False)
+        if profile:
+            decoding = dict(get_profile(profile))
+            max_new_tokens = decoding.pop("max_new_tokens", max_new_tokens)
+        criteria, stopping = deadline_criteria(deadline)
+        if stopping is not None:
+            decoding["stopping_criteria"] = stopping
+
         # 🔴 ABSOLUTE SAFETY TRIM
         prompt = self._hard_trim(prompt, max_new_tokens)
 
@@ -44,14 +56,37 @@ class GPT2Reasoner:
             return_tensors="pt"
         ).to(self.device)
 
-        with torch.no_grad():
+        with torch.no_grad(), torch_trace("gpt2"):
             output = self.model.generate(
                 **inputs,
+                **decoding,
                 max_new_tokens=max_new_tokens,
-                do_sample=False,
                 pad_token_id=self.tokenizer.eos_token_id,
                 eos_token_id=self.tokenizer.eos_token_id
             )
 
+        if criteria is not None and criteria.hit:
+            logger.info("Generation stopped at deadline, returning partial output")
+
+        prompt_tokens = inputs["input_ids"].shape[1]
+        record_tokens("gpt2", prompt_tokens, output.shape[1] - prompt_tokens)
+
         text = self.tokenizer.decode(output[0], skip_special_tokens=True)
         return text.strip()
+
+    def build_answer(self, question: str, evidence: list, score: float = None, max_new_tokens: int = 200,
+                     min_score: float = 0.4) -> str:
+        """Answer `question` from retrieved evidence passages (see evidence_builder).
+
+        Only the continuation is returned, not the prompt. When the best
+        retrieval `score` is below `min_score` the answer is marked as weak.
+        """
+        passages = "\n".join(f"- {text.strip()}" for text in evidence)
+        prompt = f"Evidence:\n{passages}\n\nQuestion: {question}\nAnswer:"
+
+        text = self.generate(prompt, max_new_tokens=max_new_tokens)
+        answer = text.rsplit("Answer:", 1)[-1].strip()
+
+        if score is not None and score < min_score:
+            answer = f"(Weak evidence, score {score:.2f}) {answer}"
+        return answer
@@ -1,5 +1,10 @@
+import threading
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from src.reasoning.backends import get_backend
+
+# app language -> mBART-50 language code
+MBART_LANGS = {"en": "en_XX", "ur": "ur_PK", "hi": "hi_IN"}
 
 class MBartTranslator:
     def __init__(self):
@@ -7,14 +12,24 @@ class MBartTranslator:
         self.model_id = "facebook/mbart-large-50-many-to-many-mmt"
 
         self.tokenizer = AutoTokenizer.from_pretrained(self.model_id)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(self.model_id).to(self.device)
-        self.model.eval()
+        self.backend = get_backend("mbart", self.model_id, self.tokenizer, self.device, self._load_torch)
+        self.model = getattr(self.backend, "model", None)
+        # the tokenizer's src_lang is shared state: one batch at a time
+        self._lock = threading.Lock()
+
+    def _load_torch(self):
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_id).to(self.device)
+        model.eval()
+        return model, "fp32"
 
-    def translate_to_english(self, text: str) -> str:
-        inputs = self.tokenizer(text, return_tensors="pt", truncation=True).to(self.device)
-        translated_tokens = self.model.generate(
-            **inputs,
-            forced_bos_token_id=self.tokenizer.lang_code_to_id["en_XX"],
-            max_length=512
-        )
-        return self.tokenizer.decode(translated_tokens[0], skip_special_tokens=True)
+    def translate(self, texts: list, src: str, tgt: str, max_new_tokens: int = 256, num_beams: int = 1) -> list:
+        """Translate a batch (padded to its longest text) between en / ur / hi."""
+        with self._lock:
+            self.tokenizer.src_lang = MBART_LANGS[src]
+            return self.backend.generate(
+                texts,
+                max_new_tokens=max_new_tokens,
+                num_beams=num_beams,
+                max_input_tokens=512,
+                target_prefix=MBART_LANGS[tgt]
+            )
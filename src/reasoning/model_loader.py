@@ -1,22 +1,36 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForCausalLM
+from src.reasoning.precision import load_model
 
 _MODEL = None
 _TOKENIZER = None
 
 
-def load_phi2(model_name="microsoft/phi-2"):
+def load_phi2(model_name="microsoft/phi-2", precision=None):
     global _MODEL, _TOKENIZER
 
     if _MODEL is None:
         device = "cuda" if torch.cuda.is_available() else "cpu"
 
         _TOKENIZER = AutoTokenizer.from_pretrained(model_name)
-        _MODEL = AutoModelForCausalLM.from_pretrained(
-            model_name,
-            torch_dtype=torch.float16 if device == "cuda" else torch.float32
-        ).to(device)
-
-        _MODEL.eval()
+        _MODEL, _ = load_model(
+            "phi2", AutoModelForCausalLM, model_name, device, precision, _TOKENIZER, cuda_mode="fp16"
+        )
 
     return _MODEL, _TOKENIZER
+
+
+_DRAFT = None
+
+
+def load_draft(model_name="microsoft/phi-1_5", precision=None):
+    """Small draft model for Phi-2 assisted generation (same tokenizer)."""
+    global _DRAFT
+
+    if _DRAFT is None:
+        device = "cuda" if torch.cuda.is_available() else "cpu"
+        _DRAFT, _ = load_model(
+            "phi2_draft", AutoModelForCausalLM, model_name, device, precision, cuda_mode="fp16"
+        )
+
+    return _DRAFT
@@ -1,14 +1,22 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from src.reasoning.precision import load_model
+from src.reasoning.backends import get_backend
+from src.reasoning.profiles import get_profile
 
 class MT5Reasoner:
-    def __init__(self, model_name: str = "google/mt5-base"):
+    def __init__(self, model_name: str = "google/mt5-base", precision: str = None):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
 
         # Multilingual model (handles Urdu/Hindi/English/Roman Urdu)
         self.tokenizer = AutoTokenizer.from_pretrained(model_name, legacy=False)
-        self.model = AutoModelForSeq2SeqLM.from_pretrained(model_name).to(self.device)
-        self.model.eval()
+        # torch or ctranslate2, see reasoning.backend in settings.yaml
+        self.backend = get_backend(
+            "mt5", model_name, self.tokenizer, self.device,
+            lambda: load_model("mt5", AutoModelForSeq2SeqLM, model_name, self.device, precision, self.tokenizer)
+        )
+        self.model = getattr(self.backend, "model", None)
+        self.precision = self.backend.precision
 
         self.max_input_tokens = 512
         self.max_new_tokens = 250
@@ -19,19 +27,29 @@ class MT5Reasoner:
             return text
         return self.tokenizer.decode(tokens[:self.max_input_tokens], skip_special_tokens=True)
 
-    def generate(self, prompt: str, min_length: int = 60) -> str:
+    def generate(self, prompt: str, min_length: int = 60, profile: str = None, max_new_tokens: int = None,
+                 deadline: float = None) -> str:
         prompt = self._safe_trim(prompt)
-        inputs = self.tokenizer(prompt, return_tensors="pt", truncation=True, max_length=self.max_input_tokens).to(self.device)
 
-        with torch.no_grad():
-            output = self.model.generate(
-                **inputs,
-                max_new_tokens=self.max_new_tokens,
-                min_length=min_length,
-                num_beams=4,
+        # A named speed tier replaces the default beam search settings (and max_new_tokens)
+        if profile:
+            return self.backend.generate(
+                [prompt],
                 repetition_penalty=1.2,
                 no_repeat_ngram_size=2,
-                early_stopping=True
-            )
+                max_input_tokens=self.max_input_tokens,
+                deadline=deadline,
+                **get_profile(profile)
+            )[0]
 
-        return self.tokenizer.decode(output[0], skip_special_tokens=True).strip()
+        max_new_tokens = max_new_tokens or self.max_new_tokens
+        return self.backend.generate(
+            [prompt],
+            max_new_tokens=max_new_tokens,
+            min_length=min(min_length, max_new_tokens),
+            num_beams=4,
+            repetition_penalty=1.2,
+            no_repeat_ngram_size=2,
+            max_input_tokens=self.max_input_tokens,
+            deadline=deadline
+        )[0]
@@ -0,0 +1,26 @@
+import torch
+from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from src.reasoning.backends import get_backend
+
+
+class OpusMTTranslator:
+    """One Helsinki-NLP/opus-mt language pair (a few hundred MB, fast on CPU)."""
+
+    def __init__(self, model_id: str = "Helsinki-NLP/opus-mt-en-ur"):
+        self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model_id = model_id
+
+        self.tokenizer = AutoTokenizer.from_pretrained(self.model_id)
+        # torch or ctranslate2, see reasoning.backend.opus_mt in settings.yaml
+        self.backend = get_backend("opus_mt", self.model_id, self.tokenizer, self.device, self._load_torch)
+        self.model = getattr(self.backend, "model", None)
+
+    def _load_torch(self):
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_id).to(self.device)
+        model.eval()
+        return model, "fp32"
+
+    def translate(self, texts: list, src: str = None, tgt: str = None, max_new_tokens: int = 256,
+                  num_beams: int = 1) -> list:
+        """Translate a batch (padded to its longest text); the pair is fixed by the model."""
+        return self.backend.generate(texts, max_new_tokens=max_new_tokens, num_beams=num_beams, max_input_tokens=512)
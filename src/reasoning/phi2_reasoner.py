@@ -1,12 +1,47 @@
+import time
 import torch
-from src.reasoning.model_loader import load_phi2
+from src.core.config import get_section
+from src.core.logging import logger
+from src.core.profiling import torch_trace
+from src.reasoning.model_loader import load_phi2, load_draft
+from src.reasoning.assisted import AssistedDecodingStats, ForwardCounter
+from src.reasoning.profiles import get_profile
+from src.reasoning.stopping import deadline_criteria
 
 
 class Phi2Reasoner:
-    def __init__(self):
-        self.model, self.tokenizer = load_phi2()
+    def __init__(self, precision: str = None):
+        self.model, self.tokenizer = load_phi2(precision=precision)
         self.device = next(self.model.parameters()).device
 
+        # Assisted (speculative) decoding with a small draft model
+        self.draft = None
+        self.assisted = None
+        cfg = get_section("reasoning").get("assisted") or {}
+        if cfg.get("enabled"):
+            self._setup_assisted(cfg)
+
+    def _setup_assisted(self, cfg):
+        try:
+            self.draft = load_draft(cfg.get("draft_model") or "microsoft/phi-1_5")
+        except Exception as e:
+            logger.warning(f"Draft model failed to load, assisted decoding disabled: {e}")
+            return
+
+        # constant schedule so acceptance can be derived from forward counts
+        num_tokens = cfg.get("num_assistant_tokens", 5)
+        self.draft.generation_config.num_assistant_tokens = num_tokens
+        self.draft.generation_config.num_assistant_tokens_schedule = "constant"
+
+        self.assisted = AssistedDecodingStats(
+            num_assistant_tokens=num_tokens,
+            min_acceptance_rate=cfg.get("min_acceptance_rate", 0.3),
+            min_speedup=cfg.get("min_speedup", 1.1),
+            window=cfg.get("window", 20),
+            cooldown=cfg.get("cooldown", 50),
+            baseline_every=cfg.get("baseline_every", 10)
+        )
+
     def build_prompt(self, question, evidence, score):
         if score >= 0.6:
             mode = "LECTURE_FOUND"
@@ -32,16 +67,45 @@ EVIDENCE:
 {evidence}
 """
 
-    def generate(self, prompt):
+    def _generate(self, inputs, assisted: bool, profile: str = None, max_new_tokens: int = None,
+                  deadline: float = None):
+        if profile:
+            kwargs = dict(get_profile(profile))
+        else:
+            kwargs = dict(max_new_tokens=max_new_tokens or 350, temperature=0.6, top_p=0.9, do_sample=True)
+        criteria, stopping = deadline_criteria(deadline)
+        if stopping is not None:
+            kwargs["stopping_criteria"] = stopping
+        # assisted generation only supports greedy/sampling, not beam search
+        assisted = assisted and kwargs.get("num_beams", 1) == 1
+        if assisted:
+            kwargs["assistant_model"] = self.draft
+
+        start = time.perf_counter()
+        with torch.no_grad(), ForwardCounter(self.model) as counter, torch_trace("phi2"):
+            output = self.model.generate(**inputs, **kwargs)
+        elapsed = time.perf_counter() - start
+
+        if criteria is not None and criteria.hit:
+            logger.info("Generation stopped at deadline, returning partial output")
+        if self.assisted is not None:
+            new_tokens = output.shape[1] - inputs["input_ids"].shape[1]
+            self.assisted.record(assisted, new_tokens, counter.calls, elapsed)
+        return output
+
+    def generate(self, prompt, profile=None, max_new_tokens=None, deadline=None):
         inputs = self.tokenizer(prompt, return_tensors="pt").to(self.device)
 
-        with torch.no_grad():
-            output = self.model.generate(
-                **inputs,
-                max_new_tokens=350,
-                temperature=0.6,
-                top_p=0.9,
-                do_sample=True
-            )
+        assisted = self.assisted is not None and self.assisted.active()
+        try:
+            output = self._generate(inputs, assisted, profile, max_new_tokens, deadline)
+        except Exception as e:
+            if not assisted:
+                raise
+            self.assisted.disable(f"assisted generate failed: {e}")
+            output = self._generate(inputs, False, profile, max_new_tokens, deadline)
 
         return self.tokenizer.decode(output[0], skip_special_tokens=True)
+
+    def assisted_stats(self) -> dict:
+        return self.assisted.snapshot() if self.assisted is not None else {}
@@ -0,0 +1,182 @@
+import time
+import torch
+from src.core.config import get_section
+from src.core.logging import logger
+
+PRECISION_MODES = ("fp32", "bf16", "int8")
+
+# Fixed prompts for the startup agreement check (one per query language)
+SELF_CHECK_PROMPTS = [
+    "Question: What is Imaan?\nAnswer:",
+    "Question: What are Huruf-e-Muqatta'at in the Quran?\nAnswer:",
+    "سوال: نماز کیا ہے؟\nجواب:",
+    "Sawal: Quran kaun si kitaab hai?\nJawab:",
+]
+
+
+def bf16_supported() -> bool:
+    """True if the CPU has native bf16 kernels (AVX512-BF16 / AMX)."""
+    try:
+        return bool(torch.ops.mkldnn._is_mkldnn_bf16_supported())
+    except Exception:
+        return False
+
+
+def resolve_precision(name: str, device: str, precision: str = None, cuda_mode: str = "fp32") -> str:
+    """Pick the precision mode for a reasoner.
+
+    Order: explicit argument, `reasoning.precision.<name>`, then
+    `reasoning.precision.default`. Modes only apply on CPU; on CUDA the
+    model keeps its usual `cuda_mode`.
+    """
+    if device != "cpu":
+        return cuda_mode
+
+    cfg = get_section("reasoning").get("precision") or {}
+    mode = (precision or cfg.get(name) or cfg.get("default") or "fp32").lower()
+
+    if mode not in PRECISION_MODES:
+        logger.warning(f"Unknown precision '{mode}' for {name}, using fp32")
+        return "fp32"
+    if mode == "bf16" and not bf16_supported():
+        logger.warning(f"bf16 not supported on this CPU, {name} falls back to fp32")
+        return "fp32"
+    return mode
+
+
+def load_dtype(mode: str):
+    """dtype to pass to from_pretrained for a precision mode."""
+    if mode == "fp16":
+        return torch.float16
+    if mode == "bf16":
+        return torch.bfloat16
+    return torch.float32
+
+
+def _conv1d_to_linear(model):
+    """GPT-2 style models use transformers' Conv1D instead of nn.Linear,
+    which dynamic quantization skips. Swap them for equivalent Linears."""
+    from transformers.pytorch_utils import Conv1D
+
+    for parent in model.modules():
+        for child_name, child in list(parent.named_children()):
+            if not isinstance(child, Conv1D):
+                continue
+            nx, nf = child.weight.shape
+            linear = torch.nn.Linear(nx, nf)
+            linear.weight.data = child.weight.data.t().contiguous()
+            linear.bias.data = child.bias.data
+            setattr(parent, child_name, linear)
+    return model
+
+
+def quantize_int8(model):
+    """Dynamic int8 quantization of all Linear layers (weights int8,
+    activations quantized on the fly)."""
+    model = _conv1d_to_linear(model.float())
+    return torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+
+
+def footprint_bytes(model) -> int:
+    """Resident size of weights and buffers, including packed int8 weights."""
+    total = 0
+
+    def add(value):
+        nonlocal total
+        if isinstance(value, torch.Tensor):
+            total += value.numel() * value.element_size()
+        elif isinstance(value, (tuple, list)):
+            for v in value:
+                add(v)
+
+    for value in model.state_dict().values():
+        add(value)
+    return total
+
+
+def load_model(name: str, model_cls, model_id: str, device: str, precision: str = None, tokenizer=None,
+               cuda_mode: str = "fp32"):
+    """Load a HF model in the configured precision.
+
+    Returns (model, mode). When `reasoning.self_check` is on and the mode is
+    not fp32, the model is compared against a float32 copy on
+    SELF_CHECK_PROMPTS before being returned.
+    """
+    mode = resolve_precision(name, device, precision, cuda_mode)
+
+    model = model_cls.from_pretrained(model_id, torch_dtype=load_dtype(mode)).to(device)
+    model.eval()
+    if mode == "int8":
+        model = quantize_int8(model)
+
+    logger.info(f"{name}: loaded {model_id} as {mode} ({footprint_bytes(model) / 2**20:.0f} MB)")
+
+    if tokenizer is not None and mode in ("bf16", "int8") and get_section("reasoning").get("self_check"):
+        reference = model_cls.from_pretrained(model_id, torch_dtype=torch.float32).to(device)
+        reference.eval()
+        self_check(name, reference, model, tokenizer, mode)
+        del reference
+
+    return model, mode
+
+
+def _measure(model, tokenizer, prompts, max_new_tokens):
+    outputs, new_tokens, elapsed = [], 0, 0.0
+    for prompt in prompts:
+        inputs = tokenizer(prompt, return_tensors="pt").to(next(model.parameters()).device)
+        start = time.perf_counter()
+        with torch.no_grad():
+            out = model.generate(
+                **inputs,
+                max_new_tokens=max_new_tokens,
+                do_sample=False,
+                pad_token_id=tokenizer.pad_token_id or tokenizer.eos_token_id
+            )
+        elapsed += time.perf_counter() - start
+
+        ids = out[0].tolist()
+        if not model.config.is_encoder_decoder:
+            ids = ids[inputs["input_ids"].shape[1]:]
+        outputs.append(ids)
+        new_tokens += len(ids)
+    return outputs, new_tokens / elapsed if elapsed else 0.0
+
+
+def _agreement(a: list, b: list) -> float:
+    """Fraction of positions where two greedy outputs pick the same token."""
+    length = max(len(a), len(b))
+    if length == 0:
+        return 1.0
+    return sum(1 for x, y in zip(a, b) if x == y) / length
+
+
+def self_check(name, reference, candidate, tokenizer, mode, prompts=None, max_new_tokens=32) -> dict:
+    """Compare a reduced-precision model with its float32 reference.
+
+    Logs token agreement, memory footprint and tokens/sec of both modes.
+    """
+    prompts = prompts or SELF_CHECK_PROMPTS
+
+    ref_out, ref_tps = _measure(reference, tokenizer, prompts, max_new_tokens)
+    cand_out, cand_tps = _measure(candidate, tokenizer, prompts, max_new_tokens)
+
+    agreement = sum(_agreement(a, b) for a, b in zip(ref_out, cand_out)) / len(prompts)
+    report = {
+        "mode": mode,
+        "agreement": round(agreement, 3),
+        "fp32_mb": round(footprint_bytes(reference) / 2**20, 1),
+        "mode_mb": round(footprint_bytes(candidate) / 2**20, 1),
+        "fp32_tok_s": round(ref_tps, 1),
+        "mode_tok_s": round(cand_tps, 1),
+    }
+
+    logger.info(
+        f"{name} self-check: {mode} agreement={report['agreement']:.2f} | "
+        f"fp32 {report['fp32_mb']} MB {report['fp32_tok_s']} tok/s | "
+        f"{mode} {report['mode_mb']} MB {report['mode_tok_s']} tok/s"
+    )
+    threshold = get_section("reasoning").get("self_check_min_agreement", 0.8)
+    if agreement < threshold:
+        logger.warning(f"{name}: {mode} agrees with fp32 on only {agreement:.0%} of tokens")
+
+    return report
@@ -0,0 +1,84 @@
+import math
+import threading
+from collections import deque
+from src.core.config import get_section
+
+# Decoding settings per speed tier. Keys are HF generate() argument names;
+# override or add tiers under decoding.profiles in settings.yaml.
+DEFAULT_PROFILES = {
+    "fast": {
+        "num_beams": 1,
+        "min_new_tokens": 0,
+        "max_new_tokens": 96,
+        "do_sample": False,
+    },
+    "balanced": {
+        "num_beams": 2,
+        "min_new_tokens": 0,
+        "max_new_tokens": 160,
+        "do_sample": False,
+    },
+    "quality": {
+        "num_beams": 4,
+        "min_new_tokens": 40,
+        "max_new_tokens": 250,
+        "do_sample": False,
+    },
+}
+
+DEFAULT_PROFILE = "default"
+
+
+def get_profiles() -> dict:
+    profiles = {name: dict(p) for name, p in DEFAULT_PROFILES.items()}
+    for name, overrides in (get_section("decoding").get("profiles") or {}).items():
+        profiles.setdefault(name, {}).update(overrides or {})
+    return profiles
+
+
+def get_profile(name: str) -> dict:
+    """Decoding kwargs for a named profile. Raises ValueError if unknown."""
+    profiles = get_profiles()
+    if name not in profiles:
+        raise ValueError(f"Unknown decoding profile '{name}'. Available: {', '.join(profiles)}")
+    return profiles[name]
+
+
+class ProfileLatency:
+    """Rolling end-to-end latency per profile (last `window` requests)."""
+
+    def __init__(self, window: int = 500):
+        self.window = window
+        self._lock = threading.Lock()
+        self._samples = {}
+        self._counts = {}
+
+    def record(self, name: str, seconds: float):
+        name = name or DEFAULT_PROFILE
+        with self._lock:
+            self._samples.setdefault(name, deque(maxlen=self.window)).append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+
+    @staticmethod
+    def _percentile(values, q):
+        ordered = sorted(values)
+        # nearest rank
+        return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+    def summary(self) -> dict:
+        with self._lock:
+            samples = {k: list(v) for k, v in self._samples.items()}
+            counts = dict(self._counts)
+
+        return {
+            name: {
+                "count": counts[name],
+                "mean_ms": round(1000 * sum(values) / len(values), 1),
+                "p50_ms": round(1000 * self._percentile(values, 0.50), 1),
+                "p95_ms": round(1000 * self._percentile(values, 0.95), 1),
+            }
+            for name, values in samples.items() if values
+        }
+
+
+profile_latency = ProfileLatency()
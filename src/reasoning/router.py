@@ -0,0 +1,301 @@
+"""
+Per-request choice of the reasoner that answers (reasoning.router in settings.yaml).
+
+With `pipeline.reasoner: router` the chat LLM is a ReasonerRouter: it has the
+same generate / generate_batch interface as ModelLoader and hands each
+prompt to one of the configured backends (seq2seq, mt5, gpt2, phi2, stub).
+
+A backend is eligible when it serves the detected language, the speed tier
+(decoding profile) and the prompt size, and has fewer than `max_in_flight`
+calls running. Among those:
+
+    fast      the lowest expected latency
+    quality   the best `quality` whose expected latency fits the deadline
+    other     the best `quality` within `slack` x the fastest expected latency
+
+Expected latency is a moving average (EWMA) of each backend's measured
+generate time (not the model load), scaled by the calls already running on
+it, so traffic moves away from a backend that slows down or queues up. Until
+a backend has been measured its `prior_ms` is used, and while it is not
+called its average decays back toward `prior_ms` (half-life `decay_s`), so a
+backend that one slow spike pushed out of favour is tried again. A failed
+call counts as a slow one and the prompt is retried on the next choice
+while the deadline allows.
+
+Backends are loaded on first use through the model pool (src/core/model_pool.py),
+so rarely chosen ones can be evicted.
+"""
+import math
+import threading
+import time
+from src.core.config import get_section
+from src.core.deadline import time_left
+from src.core.logging import logger
+from src.core.model_pool import get_model_pool
+from src.core.tracing import annotate
+
+DEFAULT_TIER = "default"
+
+
+# -------------------------
+# BACKEND ADAPTERS
+# -------------------------
+def _load_seq2seq(cfg):
+    from src.chat.model_loader import ModelLoader
+    return ModelLoader(cfg.get("model"))
+
+
+def _load_stub(cfg):
+    from src.reasoning.stub_reasoner import StubReasoner
+    return StubReasoner.from_config()
+
+
+def _load_mt5(cfg):
+    from src.reasoning.mt5_reasoner import MT5Reasoner
+    return MT5Reasoner(cfg.get("model") or "google/mt5-base")
+
+
+def _load_gpt2(cfg):
+    from src.reasoning.gpt2_reasoner import GPT2Reasoner
+    return GPT2Reasoner()
+
+
+def _load_phi2(cfg):
+    from src.reasoning.phi2_reasoner import Phi2Reasoner
+    return Phi2Reasoner()
+
+
+LOADERS = {
+    "seq2seq": _load_seq2seq,
+    "stub": _load_stub,
+    "mt5": _load_mt5,
+    "gpt2": _load_gpt2,
+    "phi2": _load_phi2,
+}
+
+
+def _continuation(prompt: str, text: str) -> str:
+    """Causal LMs return prompt + answer; keep the answer."""
+    text = (text or "").strip()
+    if text.startswith(prompt.strip()):
+        return text[len(prompt.strip()):].strip()
+    last_line = prompt.strip().splitlines()[-1] if prompt.strip() else ""
+    return text.rsplit(last_line, 1)[-1].strip() if last_line else text
+
+
+def _call(kind, model, prompt, max_length, deadline, profile, decoding) -> str:
+    # ModelLoader / StubReasoner take the full ChatModel options; the others the
+    # deadline, profile and max_length (as max_new_tokens) but not the rest
+    if kind in ("seq2seq", "stub"):
+        return model.generate(prompt, max_length=max_length, deadline=deadline, profile=profile, **decoding)
+    text = model.generate(prompt, profile=profile, max_new_tokens=max_length, deadline=deadline)
+    return text if kind == "mt5" else _continuation(prompt, text)
+
+
+def _call_batch(kind, model, prompts, max_length, deadline, profile, decoding) -> list:
+    generate_batch = getattr(model, "generate_batch", None)
+    if kind in ("seq2seq", "stub") and generate_batch is not None:
+        return generate_batch(prompts, max_length=max_length, deadline=deadline, profile=profile, **decoding)
+    return [_call(kind, model, p, max_length, deadline, profile, decoding) for p in prompts]
+
+
+# -------------------------
+# LATENCY ESTIMATE
+# -------------------------
+class Backend:
+    def __init__(self, name: str, cfg: dict, alpha: float = 0.2, decay_s: float = 300.0):
+        self.name = name
+        self.kind = cfg.get("kind") or name
+        if self.kind not in LOADERS:
+            raise ValueError(f"Unknown reasoner '{self.kind}'. Available: {', '.join(LOADERS)}")
+        self.cfg = cfg
+        self.languages = set(cfg.get("languages") or [])     # empty = all
+        self.tiers = set(cfg.get("tiers") or [])             # empty = all
+        self.max_prompt_chars = cfg.get("max_prompt_chars")
+        self.quality = float(cfg.get("quality") or 0)
+        self.concurrency = max(1, int(cfg.get("concurrency") or 1))
+        self.max_in_flight = int(cfg.get("max_in_flight") or 0)   # 0 = no limit
+        self.alpha = alpha
+        self.decay_s = decay_s
+        self.prior = float(cfg.get("prior_ms") or 1000) / 1000
+        self.ewma = self.prior
+        self.measured = False
+        self.last_observed = None
+        self.in_flight = 0
+        self.calls = 0
+        self.errors = 0
+
+    def speaks(self, lang) -> bool:
+        return not self.languages or lang is None or lang in self.languages
+
+    def serves(self, lang, tier, prompt_chars) -> bool:
+        return (
+            self.speaks(lang)
+            and (not self.tiers or tier in self.tiers)
+            and (not self.max_prompt_chars or prompt_chars <= self.max_prompt_chars)
+        )
+
+    @property
+    def overloaded(self) -> bool:
+        return bool(self.max_in_flight) and self.in_flight >= self.max_in_flight
+
+    def average(self) -> float:
+        """The moving average, relaxed toward the prior by the time since the last sample."""
+        if not self.measured or not self.decay_s:
+            return self.ewma
+        idle = time.monotonic() - self.last_observed
+        return self.prior + (self.ewma - self.prior) * math.pow(0.5, idle / self.decay_s)
+
+    def expected(self) -> float:
+        """Seconds a new call would take: the moving average, queued behind the running calls."""
+        return self.average() * (1 + self.in_flight / self.concurrency)
+
+    def observe(self, seconds: float):
+        self.ewma = seconds if not self.measured else self.alpha * seconds + (1 - self.alpha) * self.average()
+        self.measured = True
+        self.last_observed = time.monotonic()
+
+    def stats(self) -> dict:
+        return {
+            "kind": self.kind,
+            "ewma_ms": round(1000 * self.average(), 1),
+            "measured": self.measured,
+            "expected_ms": round(1000 * self.expected(), 1),
+            "in_flight": self.in_flight,
+            "calls": self.calls,
+            "errors": self.errors,
+            "quality": self.quality,
+        }
+
+
+# -------------------------
+# ROUTER
+# -------------------------
+class ReasonerRouter:
+    model_name = "router"
+    precision = None
+    # ChatModel passes the detected language (`lang=`) to models that set this
+    routes_by_language = True
+
+    def __init__(self, backends: dict, alpha: float = 0.2, slack: float = 1.5, error_penalty: float = 2.0,
+                 pool=None, loaders: dict = None, decay_s: float = 300.0):
+        if not backends:
+            raise ValueError("reasoning.router.backends is empty")
+        self.backends = {name: Backend(name, cfg or {}, alpha, decay_s) for name, cfg in backends.items()}
+        self.slack = slack
+        self.error_penalty = error_penalty
+        self.pool = pool or get_model_pool()
+        self.loaders = dict(LOADERS, **(loaders or {}))
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls):
+        cfg = get_section("reasoning").get("router") or {}
+        return cls(
+            cfg.get("backends") or {},
+            alpha=float(cfg.get("alpha") or 0.2),
+            slack=float(cfg.get("slack") or 1.5),
+            error_penalty=float(cfg.get("error_penalty") or 2.0),
+            decay_s=float(cfg.get("decay_s", 300))
+        )
+
+    def rank(self, lang: str = None, profile: str = None, prompt_chars: int = 0, deadline: float = None) -> list:
+        """Backends to try for a prompt, best first."""
+        tier = profile or DEFAULT_TIER
+        with self._lock:
+            capable = [b for b in self.backends.values() if b.serves(lang, tier, prompt_chars)]
+            if not capable:
+                # nothing configured for this tier / size: keep the language, then any backend beats no answer
+                capable = [b for b in self.backends.values() if b.speaks(lang)] or list(self.backends.values())
+            expected = {b.name: b.expected() for b in capable}
+
+        fastest = sorted(capable, key=lambda b: (b.overloaded, expected[b.name]))
+        if tier == "fast":
+            return fastest
+
+        if tier == "quality":
+            budget = time_left(deadline)
+            fits = [b for b in capable if not b.overloaded and expected[b.name] <= budget]
+        else:
+            open_ = [b for b in capable if not b.overloaded]
+            limit = self.slack * min(expected[b.name] for b in open_) if open_ else 0
+            fits = [b for b in open_ if expected[b.name] <= limit]
+        best = sorted(fits, key=lambda b: (-b.quality, expected[b.name]))
+        return best + [b for b in fastest if b not in best]
+
+    def _run(self, backend, call):
+        model_loader = lambda: self.loaders[backend.kind](backend.cfg)
+        with self._lock:
+            backend.in_flight += 1
+            backend.calls += 1
+        started = None
+        try:
+            with self.pool.use(f"router:{backend.name}", model_loader) as model:
+                # timed from here: a (re)load is not a latency sample
+                started = time.perf_counter()
+                result = call(backend.kind, model)
+        except Exception:
+            elapsed = time.perf_counter() - started if started is not None else 0.0
+            with self._lock:
+                backend.errors += 1
+                backend.observe(self.error_penalty * max(backend.average(), elapsed))
+            raise
+        else:
+            with self._lock:
+                backend.observe(time.perf_counter() - started)
+            return result
+        finally:
+            with self._lock:
+                backend.in_flight -= 1
+
+    def _route(self, call, lang, profile, prompt_chars, deadline):
+        error = None
+        for backend in self.rank(lang, profile, prompt_chars, deadline):
+            if error is not None and time_left(deadline) <= 0:
+                break
+            try:
+                result = self._run(backend, call)
+                annotate("reasoner", backend.name)
+                return result
+            except Exception as e:
+                logger.warning(f"Reasoner '{backend.name}' failed: {e}")
+                error = e
+        raise error
+
+    def generate(self, prompt: str, max_length=256, deadline=None, profile=None, lang: str = None,
+                 **decoding) -> str:
+        return self._route(
+            lambda kind, model: _call(kind, model, prompt, max_length, deadline, profile, decoding),
+            lang, profile, len(prompt), deadline
+        )
+
+    def generate_batch(self, prompts: list, max_length=256, deadline=None, profile=None, lang=None,
+                       **decoding) -> list:
+        """generate() for many prompts; `lang` is one language or one per prompt.
+
+        Prompts routed to the same backend go to it in one batched call.
+        """
+        langs = lang if isinstance(lang, (list, tuple)) else [lang] * len(prompts)
+        groups = {}
+        for i, (prompt, prompt_lang) in enumerate(zip(prompts, langs)):
+            groups.setdefault((prompt_lang, len(prompt) > self._batch_chars()), []).append(i)
+
+        outputs = [""] * len(prompts)
+        for (group_lang, _), indices in groups.items():
+            group = [prompts[i] for i in indices]
+            results = self._route(
+                lambda kind, model: _call_batch(kind, model, group, max_length, deadline, profile, decoding),
+                group_lang, profile, max(len(p) for p in group), deadline
+            )
+            for i, text in zip(indices, results):
+                outputs[i] = text
+        return outputs
+
+    def _batch_chars(self) -> int:
+        # prompts longer than the smallest backend limit are routed apart from the short ones
+        limits = [b.max_prompt_chars for b in self.backends.values() if b.max_prompt_chars]
+        return min(limits) if limits else float("inf")
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {name: b.stats() for name, b in self.backends.items()}
@@ -0,0 +1,30 @@
+import time
+import torch
+from transformers import StoppingCriteria, StoppingCriteriaList
+# torch-free helpers live in src.core.deadline (imported by the API without torch)
+from src.core.deadline import deadline_after, time_left
+
+
+class DeadlineCriteria(StoppingCriteria):
+    """Stop generation once a monotonic deadline has passed.
+
+    `hit` is set when the deadline (not max_new_tokens / EOS) ended
+    generation, so callers can tell a partial answer from a complete one.
+    """
+
+    def __init__(self, deadline: float):
+        self.deadline = deadline
+        self.hit = False
+
+    def __call__(self, input_ids, scores, **kwargs):
+        if time.monotonic() >= self.deadline:
+            self.hit = True
+        return torch.full((input_ids.shape[0],), self.hit, dtype=torch.bool, device=input_ids.device)
+
+
+def deadline_criteria(deadline):
+    """StoppingCriteriaList for `deadline`, or (None, None) without one."""
+    if deadline is None:
+        return None, None
+    criteria = DeadlineCriteria(deadline)
+    return criteria, StoppingCriteriaList([criteria])
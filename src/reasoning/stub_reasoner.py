@@ -0,0 +1,66 @@
+import hashlib
+import time
+from src.core.config import get_section
+from src.core.tracing import record_tokens
+from src.reasoning.profiles import get_profile
+from src.core.deadline import time_left
+
+
+class StubReasoner:
+    """Deterministic stand-in for the chat LLM, for load tests.
+
+    Loads no model. The answer is a run of words cut from the prompt's
+    context (same prompt -> same answer) and takes `first_token_ms` plus
+    `token_delay_ms` per generated word, so retrieval, scheduling and
+    serialization overheads can be measured without paying for generation.
+    Honors the deadline like the real backends: decoding stops early and
+    returns what it has.
+    """
+
+    model_name = "stub"
+    precision = None
+
+    def __init__(self, token_delay_ms: float = 20.0, first_token_ms: float = 50.0, max_new_tokens: int = 64):
+        self.token_delay = token_delay_ms / 1000
+        self.first_token = first_token_ms / 1000
+        self.max_new_tokens = max_new_tokens
+
+    @classmethod
+    def from_config(cls):
+        cfg = get_section("reasoning").get("stub") or {}
+        return cls(
+            token_delay_ms=float(cfg.get("token_delay_ms") or 0),
+            first_token_ms=float(cfg.get("first_token_ms") or 0),
+            max_new_tokens=int(cfg.get("max_new_tokens") or 64)
+        )
+
+    def _limit(self, max_length, profile) -> int:
+        if profile:
+            max_length = get_profile(profile).get("max_new_tokens", max_length)
+        return max(1, min(max_length, self.max_new_tokens))
+
+    def _words(self, prompt: str, count: int) -> list:
+        # context sits between the instruction line and the question (see ChatModel._build_prompt)
+        lines = prompt.splitlines()
+        words = " ".join(lines[1:-3]).split() or prompt.split() or ["stub"]
+        start = int(hashlib.sha1(prompt.encode("utf-8")).hexdigest(), 16) % len(words)
+        return [words[(start + i) % len(words)] for i in range(count)]
+
+    def _decode(self, prompts: list, count: int, deadline) -> list:
+        # one decode step per token for the whole batch, like batched generation
+        budget = time_left(deadline) - self.first_token
+        if self.token_delay > 0 and budget < count * self.token_delay:
+            count = max(1, int(budget / self.token_delay)) if budget > 0 else 1
+        time.sleep(self.first_token + count * self.token_delay)
+
+        outputs = [" ".join(self._words(p, count)) for p in prompts]
+        for p in prompts:
+            record_tokens(self.model_name, len(p.split()), count)
+        return outputs
+
+    # **decoding (num_beams, max_input_tokens) is accepted and ignored
+    def generate(self, prompt: str, max_length=256, deadline=None, profile=None, **decoding) -> str:
+        return self._decode([prompt], self._limit(max_length, profile), deadline)[0]
+
+    def generate_batch(self, prompts: list, max_length=256, deadline=None, profile=None, **decoding) -> list:
+        return self._decode(prompts, self._limit(max_length, profile), deadline)
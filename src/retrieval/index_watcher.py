@@ -0,0 +1,99 @@
+import threading
+import time
+from src.core.config import get_section
+from src.core.logging import logger
+from src.retrieval.search import FaissSearcher
+from src.vectorstore.bundle import BundleError, bundle_dir, current_version
+
+
+class IndexWatcher:
+    """Polls the CURRENT bundle pointer and hot-swaps new index versions.
+
+    A new version is loaded and validated on this background thread; only
+    a bundle that passes is swapped into the retriever, so requests never
+    see a half-loaded index. A bundle built with another embedding model
+    is refused (the query encoder and the semantic cache depend on it) and
+    needs a restart.
+
+    A bundle that is broken (BundleError: missing files, checksum or model
+    mismatch) is not retried until CURRENT changes. A load that fails on I/O
+    or memory (OSError, RuntimeError) may succeed later, so that version is
+    retried after `retry_s`, doubling up to `retry_max_s`.
+    """
+
+    def __init__(self, retriever, root: str = None, interval: float = 30.0, retry_s: float = 60.0,
+                 retry_max_s: float = 900.0):
+        self.retriever = retriever
+        self.root = root or get_section("retrieval").get("bundle_root", "data/vector_store")
+        self.interval = interval
+        self.retry_s = retry_s
+        self.retry_max_s = retry_max_s
+
+        self._stop = threading.Event()
+        self._thread = None
+        self.last_checked = None
+        self.last_swap = None
+        self.failed = {}     # version -> error, never retried
+        self.retrying = {}   # version -> {"error", "attempts", "retry_at"}
+
+    def check(self) -> bool:
+        """Load and swap in the CURRENT bundle if it is new. True if swapped."""
+        self.last_checked = time.time()
+        version = current_version(self.root)
+        active = self.retriever.searcher
+        if version is None or version == active.version or version in self.failed:
+            return False
+        retry = self.retrying.get(version)
+        if retry is not None and time.time() < retry["retry_at"]:
+            return False
+
+        started = time.perf_counter()
+        try:
+            searcher = FaissSearcher.from_bundle(bundle_dir(self.root, version), reuse=active)
+            if searcher.model_name != active.model_name:
+                raise BundleError(
+                    f"built with {searcher.model_name}, running {active.model_name}; restart to switch models"
+                )
+        except BundleError as e:
+            self.retrying.pop(version, None)
+            self.failed[version] = str(e)
+            logger.error(f"Index bundle {version} rejected: {e}")
+            return False
+        except (OSError, RuntimeError) as e:
+            attempts = (retry or {}).get("attempts", 0) + 1
+            delay = min(self.retry_max_s, self.retry_s * 2 ** (attempts - 1))
+            self.retrying[version] = {"error": str(e), "attempts": attempts, "retry_at": time.time() + delay}
+            logger.error(f"Index bundle {version} failed to load ({e}), retrying in {delay:.0f}s")
+            return False
+        self.retrying.pop(version, None)
+
+        old = self.retriever.swap(searcher)
+        self.last_swap = {"from": old.version, "to": version, "at": time.time(),
+                          "load_s": round(time.perf_counter() - started, 2)}
+        logger.info(f"Index swapped {old.version} -> {version} in {self.last_swap['load_s']}s")
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception:
+                logger.exception("Index watcher check failed")
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="index-watcher", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def status(self) -> dict:
+        return {
+            "active_version": self.retriever.version,
+            "current_pointer": current_version(self.root),
+            "last_checked": self.last_checked,
+            "last_swap": self.last_swap,
+            "failed": dict(self.failed),
+            "retrying": {version: dict(retry) for version, retry in self.retrying.items()},
+        }
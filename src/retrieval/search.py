@@ -53,38 +53,143 @@
 
 
 
+import hashlib
+import os
 import pickle
 import faiss
 import numpy as np
 from sentence_transformers import SentenceTransformer
+from src.core.config import get_section
+from src.core.logging import logger
+from src.vectorstore.bundle import (
+    BundleError, CHUNKS_FILE, INDEX_FILE, bundle_dir, current_version, read_index, read_manifest, verify_files
+)
+
+
+def load_searcher():
+    """Searcher for the API: shard servers when retrieval.shards.endpoints is set,
+    otherwise the local index (active bundle or flat files)."""
+    shards = get_section("retrieval").get("shards") or {}
+    if shards.get("endpoints"):
+        from src.retrieval.shards import ShardedSearcher
+
+        return ShardedSearcher(
+            shards["endpoints"],
+            timeout=shards.get("timeout_ms", 500) / 1000,
+            min_shards=shards.get("min_shards", 1)
+        )
+    return FaissSearcher.load_current()
+
+
+def index_version(index_path: str, chunks_path: str) -> str:
+    """Short id for the files on disk; changes whenever either is rebuilt."""
+    parts = []
+    for path in (index_path, chunks_path):
+        st = os.stat(path)
+        parts.append(f"{st.st_size}:{st.st_mtime_ns}")
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()[:12]
+
 
 class FaissSearcher:
     def __init__(
         self,
         index_path="data/vector_store/faiss.index",
         chunks_path="data/vector_store/chunks.pkl",
-        model_name="intfloat/multilingual-e5-large"
+        model_name="intfloat/multilingual-e5-large",
+        mmap=None,
+        model=None,
+        manifest=None
     ):
-        self.index = faiss.read_index(index_path)
+        if mmap is None:
+            mmap = get_section("retrieval").get("mmap", True)
+        self.index = read_index(index_path, mmap=mmap)
         with open(chunks_path, "rb") as f:
             self.chunks = pickle.load(f)
-
-        self.model = SentenceTransformer(model_name)
+        self.manifest = manifest
+        self.version = manifest["version"] if manifest else index_version(index_path, chunks_path)
+
+        # `model`: an already loaded encoder for `model_name` (kept across index reloads)
+        self.model_name = model_name
+        self.model = model or SentenceTransformer(model_name)
+        if manifest:
+            self._validate(manifest)
         assert self.index.d == self.model.get_sentence_embedding_dimension()
 
-    def search(self, query: str, top_k: int = 15):
-        query = "query: " + query
-        q_emb = self.model.encode(query, normalize_embeddings=True).astype("float32")
-
-        scores, indices = self.index.search(np.expand_dims(q_emb, axis=0), top_k)
-
+    @classmethod
+    def from_bundle(cls, path: str, reuse=None, mmap=None):
+        """Load a versioned bundle (src/vectorstore/bundle.py) and check it against its manifest.
+
+        The encoder of `reuse` (a running FaissSearcher) is shared when the
+        bundle was built with the same embedding model. Raises BundleError.
+        """
+        manifest = read_manifest(path)
+        verify_files(path, manifest)
+        model_name = manifest["embedding_model"]
+        model = reuse.model if reuse is not None and reuse.model_name == model_name else None
+
+        return cls(
+            os.path.join(path, INDEX_FILE),
+            os.path.join(path, CHUNKS_FILE),
+            model_name=model_name,
+            mmap=mmap,
+            model=model,
+            manifest=manifest
+        )
+
+    @classmethod
+    def load_current(cls, root: str = None, reuse=None):
+        """Searcher for the active bundle under `root`, or the flat legacy files if there is none."""
+        root = root or get_section("retrieval").get("bundle_root", "data/vector_store")
+        version = current_version(root)
+        if version is None:
+            return cls()
+        return cls.from_bundle(bundle_dir(root, version), reuse=reuse)
+
+    def _validate(self, manifest: dict):
+        if not manifest.get("normalized", False):
+            raise BundleError("Bundle embeddings are not normalized; queries are scored by inner product")
+        encoder_dim = self.model.get_sentence_embedding_dimension()
+        if not self.index.d == encoder_dim == manifest["dim"]:
+            raise BundleError(
+                f"Dimension mismatch: manifest {manifest['dim']}, index {self.index.d}, encoder {encoder_dim}"
+            )
+        if not self.index.ntotal == len(self.chunks) == manifest["chunk_count"]:
+            raise BundleError(
+                f"Chunk count mismatch: manifest {manifest['chunk_count']}, index {self.index.ntotal}, "
+                f"chunks {len(self.chunks)}"
+            )
+
+    @property
+    def dim(self) -> int:
+        return self.index.d
+
+    def encode(self, query: str) -> np.ndarray:
+        return self.model.encode("query: " + query, normalize_embeddings=True).astype("float32")
+
+    def encode_batch(self, queries: list, batch_size: int = 32) -> np.ndarray:
+        texts = ["query: " + q for q in queries]
+        return self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True).astype("float32")
+
+    def _results(self, scores, indices):
         results = []
-        for rank, idx in enumerate(indices[0]):
+        for rank, idx in enumerate(indices):
             if idx == -1:
                 continue
             chunk = dict(self.chunks[idx])
-            chunk["score"] = float(scores[0][rank])
+            chunk["score"] = float(scores[rank])
             chunk["index"] = idx
             results.append(chunk)
-
         return results
+
+    def search(self, query: str, top_k: int = 15, embedding=None):
+        q_emb = embedding if embedding is not None else self.encode(query)
+
+        scores, indices = self.index.search(np.expand_dims(q_emb, axis=0), top_k)
+        return self._results(scores[0], indices[0])
+
+    def search_batch(self, queries: list, top_k: int = 15, embeddings=None):
+        """One batched encode and one FAISS search for many queries."""
+        q_embs = embeddings if embeddings is not None else self.encode_batch(queries)
+
+        scores, indices = self.index.search(q_embs, top_k)
+        return [self._results(scores[i], indices[i]) for i in range(len(queries))]
@@ -0,0 +1,406 @@
+"""
+Sharded scatter-gather search.
+
+The index is split into N shard bundles (by playlist or by chunk-id hash),
+each served by its own shard server. The API keeps only the query encoder:
+`ShardedSearcher` sends the query embeddings to every shard in parallel,
+merges the per-shard top-k by score and answers with whatever arrived
+before the deadline, so one slow or dead shard costs recall, not latency.
+
+    python -m src.retrieval.shards split --shards 4 --by playlist
+    python -m src.retrieval.shards serve --shard 0 --port 8101
+    python -m src.retrieval.shards local --shards 4     # all shards as local processes
+
+Each shard is a normal bundle (src/vectorstore/bundle.py) under
+<root>/shards/<i>, and shard servers hot-reload it when its CURRENT
+pointer moves. Then set retrieval.shards.endpoints in settings.yaml.
+"""
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, wait
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.core.logging import logger
+from src.vectorstore.bundle import (
+    CHUNKS_FILE, INDEX_FILE, bundle_dir, current_version, new_version, publish, read_index, read_manifest,
+    write_manifest
+)
+
+SHARDS_DIR = "shards"
+
+
+class ShardsUnavailable(RuntimeError):
+    """Fewer shards than `min_shards` answered within the deadline."""
+
+
+def shard_root(root: str, shard: int) -> str:
+    return os.path.join(root, SHARDS_DIR, str(shard))
+
+
+# -------------------------
+# PARTITIONING
+# -------------------------
+def hash_shard(key: str, num_shards: int) -> int:
+    return int(hashlib.sha1(key.encode("utf-8")).hexdigest()[:8], 16) % num_shards
+
+
+def assign_shards(chunks: list, num_shards: int, by: str = "hash") -> list:
+    """Shard number for every chunk.
+
+    "hash": by chunk id, evenly spread. "playlist": whole playlists (videos
+    without one count as their own group) go to the lightest shard,
+    largest first, so a lecture series stays on one shard.
+    """
+    if by == "hash":
+        return [hash_shard(str(c.get("chunk_id") or i), num_shards) for i, c in enumerate(chunks)]
+    if by != "playlist":
+        raise ValueError(f"Unknown partition '{by}' (hash | playlist)")
+
+    groups = {}
+    for i, chunk in enumerate(chunks):
+        groups.setdefault(chunk.get("playlist_id") or chunk.get("video_id") or "", []).append(i)
+
+    sizes = [0] * num_shards
+    assignment = [0] * len(chunks)
+    for key in sorted(groups, key=lambda k: (-len(groups[k]), k)):
+        shard = sizes.index(min(sizes))
+        sizes[shard] += len(groups[key])
+        for i in groups[key]:
+            assignment[i] = shard
+    return assignment
+
+
+def split_bundle(root: str, num_shards: int, by: str = "hash") -> str:
+    """Split the active bundle under `root` into `num_shards` shard bundles and publish them."""
+    import pickle
+    import faiss
+    import numpy as np
+
+    source = bundle_dir(root, current_version(root))
+    manifest = read_manifest(source)
+    index = faiss.read_index(os.path.join(source, INDEX_FILE))
+    with open(os.path.join(source, CHUNKS_FILE), "rb") as f:
+        chunks = pickle.load(f)
+
+    vectors = index.reconstruct_n(0, index.ntotal)
+    assignment = np.array(assign_shards(chunks, num_shards, by))
+    version = new_version()
+
+    for shard in range(num_shards):
+        rows = np.where(assignment == shard)[0]
+        shard_index = faiss.IndexFlatIP(index.d)
+        if len(rows):
+            shard_index.add(vectors[rows])
+
+        path = bundle_dir(shard_root(root, shard), version)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.makedirs(path, exist_ok=False)
+        faiss.write_index(shard_index, os.path.join(path, INDEX_FILE))
+        with open(os.path.join(path, CHUNKS_FILE), "wb") as f:
+            pickle.dump([chunks[i] for i in rows], f)
+
+        write_manifest(
+            path, manifest["embedding_model"], index.d, len(rows), normalized=manifest["normalized"],
+            extra={"shard": shard, "num_shards": num_shards, "partition": by, "source": manifest["version"]}
+        )
+        publish(shard_root(root, shard), version)
+        logger.info(f"Shard {shard}: {len(rows)} chunks")
+    return version
+
+
+# -------------------------
+# SHARD SERVER
+# -------------------------
+class ShardIndex:
+    """One shard bundle: FAISS index + chunks, no encoder."""
+
+    def __init__(self, path: str):
+        import pickle
+
+        self.manifest = read_manifest(path)
+        self.version = self.manifest["version"]
+        self.shard = self.manifest.get("shard")
+        self.index = read_index(os.path.join(path, INDEX_FILE), mmap=True)
+        with open(os.path.join(path, CHUNKS_FILE), "rb") as f:
+            self.chunks = pickle.load(f)
+
+    def search(self, embeddings: list, top_k: int) -> list:
+        import numpy as np
+
+        if self.index.ntotal == 0:
+            return [[] for _ in embeddings]
+        scores, indices = self.index.search(np.asarray(embeddings, dtype="float32"), top_k)
+        results = []
+        for row_scores, row_indices in zip(scores, indices):
+            rows = []
+            for score, idx in zip(row_scores, row_indices):
+                if idx == -1:
+                    continue
+                chunk = dict(self.chunks[idx])
+                chunk["score"] = float(score)
+                chunk["index"] = int(idx)
+                chunk["shard"] = self.shard
+                rows.append(chunk)
+            results.append(rows)
+        return results
+
+
+class _ShardHandler(BaseHTTPRequestHandler):
+    def _send(self, status, body):
+        data = json.dumps(body, ensure_ascii=False, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        shard = self.server.shard
+        if self.path == "/health":
+            self._send(200, {"shard": shard.shard, "version": shard.version, "chunks": len(shard.chunks)})
+        else:
+            self._send(404, {"error": "not found"})
+
+    def do_POST(self):
+        if self.path != "/search":
+            self._send(404, {"error": "not found"})
+            return
+        try:
+            body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            shard = self.server.shard   # one index for the whole request, even during a reload
+            results = shard.search(body["embeddings"], int(body.get("top_k", 15)))
+        except (KeyError, ValueError) as e:
+            self._send(400, {"error": str(e)})
+            return
+        self._send(200, {"version": shard.version, "shard": shard.shard, "results": results})
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ShardServer(ThreadingHTTPServer):
+    """HTTP server for one shard; reloads the shard bundle when its CURRENT pointer moves."""
+
+    daemon_threads = True
+
+    def __init__(self, root: str, host: str = "127.0.0.1", port: int = 8101, watch_interval: float = 30.0,
+                 shard=None):
+        self.root = root
+        self.shard = shard or ShardIndex(bundle_dir(root, current_version(root)))
+        self.watch_interval = watch_interval
+        super().__init__((host, port), _ShardHandler)
+
+    def _watch(self):
+        while True:
+            time.sleep(self.watch_interval)
+            version = current_version(self.root)
+            if version and version != self.shard.version:
+                try:
+                    self.shard = ShardIndex(bundle_dir(self.root, version))
+                    logger.info(f"Shard reloaded: {version}")
+                except Exception as e:
+                    logger.error(f"Shard bundle {version} failed to load: {e}")
+
+    def serve(self):
+        if self.watch_interval:
+            threading.Thread(target=self._watch, name="shard-watcher", daemon=True).start()
+        self.serve_forever()
+
+
+# -------------------------
+# SCATTER-GATHER CLIENT
+# -------------------------
+def merge_topk(per_shard: list, top_k: int) -> list:
+    """[shard][query][hits] -> [query][top_k hits], best score first."""
+    if not per_shard:
+        return []
+    merged = []
+    for q in range(len(per_shard[0])):
+        hits = (hit for shard in per_shard for hit in shard[q])
+        merged.append(heapq.nlargest(top_k, hits, key=lambda h: h["score"]))
+    return merged
+
+
+class ShardedSearcher:
+    """FaissSearcher interface over shard servers.
+
+    Queries are encoded here, sent to all shards in parallel and the
+    per-shard top-k merged by score. Shards that have not answered after
+    `timeout` seconds are skipped for that request; fewer than `min_shards`
+    answers raises ShardsUnavailable.
+    """
+
+    def __init__(self, endpoints, model_name="intfloat/multilingual-e5-large", timeout: float = 0.5,
+                 min_shards: int = 1, model=None):
+        if isinstance(endpoints, str):
+            endpoints = [e.strip() for e in endpoints.split(",") if e.strip()]
+        self.endpoints = [e.rstrip("/") for e in endpoints]
+        self.timeout = timeout
+        self.min_shards = min_shards
+        self.model_name = model_name
+        if model is None:
+            from sentence_transformers import SentenceTransformer
+            model = SentenceTransformer(model_name)
+        self.model = model
+
+        self._pool = ThreadPoolExecutor(max_workers=max(4, 2 * len(self.endpoints)), thread_name_prefix="shard")
+        self._lock = threading.Lock()
+        self._versions = {}
+        self._stats = {e: {"ok": 0, "timeouts": 0, "errors": 0, "last_ms": None} for e in self.endpoints}
+
+    @property
+    def dim(self) -> int:
+        return self.model.get_sentence_embedding_dimension()
+
+    @property
+    def version(self) -> str:
+        """Combined shard versions; changes when any shard reloads."""
+        with self._lock:
+            versions = [self._versions.get(e, "") for e in self.endpoints]
+        return "shards-" + hashlib.sha1("|".join(versions).encode()).hexdigest()[:12]
+
+    def encode(self, query: str):
+        return self.model.encode("query: " + query, normalize_embeddings=True).astype("float32")
+
+    def encode_batch(self, queries: list, batch_size: int = 32):
+        texts = ["query: " + q for q in queries]
+        return self.model.encode(texts, batch_size=batch_size, normalize_embeddings=True).astype("float32")
+
+    def _post(self, endpoint, payload):
+        started = time.perf_counter()
+        request = urllib.request.Request(
+            endpoint + "/search", data=payload, headers={"Content-Type": "application/json"}
+        )
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            body = json.loads(response.read())
+        with self._lock:
+            self._versions[endpoint] = body.get("version")
+            self._stats[endpoint]["last_ms"] = round(1000 * (time.perf_counter() - started), 1)
+        return body["results"]
+
+    def search(self, query: str, top_k: int = 15, embedding=None):
+        embeddings = None if embedding is None else [embedding]
+        return self.search_batch([query], top_k=top_k, embeddings=embeddings)[0]
+
+    def search_batch(self, queries: list, top_k: int = 15, embeddings=None):
+        q_embs = embeddings if embeddings is not None else self.encode_batch(queries)
+        payload = json.dumps({"embeddings": [list(map(float, e)) for e in q_embs], "top_k": top_k}).encode()
+
+        futures = {self._pool.submit(self._post, e, payload): e for e in self.endpoints}
+        done, _ = wait(futures, timeout=self.timeout)
+
+        per_shard = []
+        with self._lock:
+            for future, endpoint in futures.items():
+                error = future.exception() if future in done else TimeoutError()
+                if isinstance(error, TimeoutError) or isinstance(getattr(error, "reason", None), TimeoutError):
+                    self._stats[endpoint]["timeouts"] += 1
+                elif error is not None:
+                    self._stats[endpoint]["errors"] += 1
+                else:
+                    self._stats[endpoint]["ok"] += 1
+                    per_shard.append(future.result())
+
+        if len(per_shard) < len(self.endpoints):
+            logger.warning(f"{len(self.endpoints) - len(per_shard)} of {len(self.endpoints)} shards missing")
+        if len(per_shard) < self.min_shards:
+            raise ShardsUnavailable(f"{len(per_shard)} of {len(self.endpoints)} shards answered")
+        return merge_topk(per_shard, top_k) if per_shard else [[] for _ in q_embs]
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {e: dict(s, version=self._versions.get(e)) for e, s in self._stats.items()}
+
+
+# -------------------------
+# LOCAL HARNESS
+# -------------------------
+class LocalShardCluster:
+    """All shards of `root` as local server processes (for tests and single-box setups).
+
+        with LocalShardCluster("data/vector_store", 4) as cluster:
+            searcher = ShardedSearcher(cluster.endpoints)
+            cluster.kill(2)   # simulate a lost shard
+    """
+
+    def __init__(self, root: str, num_shards: int, base_port: int = 8101, host: str = "127.0.0.1"):
+        self.root = root
+        self.host = host
+        self.ports = [base_port + i for i in range(num_shards)]
+        self.processes = []
+
+    @property
+    def endpoints(self) -> list:
+        return [f"http://{self.host}:{port}" for port in self.ports]
+
+    def start(self, ready_timeout: float = 60.0):
+        for shard, port in enumerate(self.ports):
+            self.processes.append(subprocess.Popen([
+                sys.executable, "-m", "src.retrieval.shards", "serve",
+                "--root", self.root, "--shard", str(shard), "--host", self.host, "--port", str(port)
+            ]))
+
+        deadline = time.monotonic() + ready_timeout
+        for endpoint in self.endpoints:
+            while True:
+                try:
+                    urllib.request.urlopen(endpoint + "/health", timeout=1).read()
+                    break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        self.stop()
+                        raise RuntimeError(f"Shard {endpoint} did not start")
+                    time.sleep(0.2)
+        return self
+
+    def kill(self, shard: int):
+        self.processes[shard].kill()
+        self.processes[shard].wait()
+
+    def stop(self):
+        for process in self.processes:
+            if process.poll() is None:
+                process.terminate()
+        for process in self.processes:
+            process.wait()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Split, serve or run index shards")
+    parser.add_argument("command", choices=["split", "serve", "local"])
+    parser.add_argument("--root", default="data/vector_store")
+    parser.add_argument("--shards", type=int, default=2, help="number of shards (split / local)")
+    parser.add_argument("--by", default="hash", choices=["hash", "playlist"], help="partitioning (split)")
+    parser.add_argument("--shard", type=int, default=0, help="shard to serve (serve)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8101, help="port (serve) or first port (local)")
+    parser.add_argument("--watch-interval", type=float, default=30.0)
+    args = parser.parse_args()
+
+    if args.command == "split":
+        print(f"Published shard bundles {split_bundle(args.root, args.shards, args.by)}")
+    elif args.command == "serve":
+        server = ShardServer(shard_root(args.root, args.shard), args.host, args.port, args.watch_interval)
+        logger.info(f"Shard {args.shard} ({server.shard.version}) on http://{args.host}:{args.port}")
+        server.serve()
+    else:
+        with LocalShardCluster(args.root, args.shards, args.port, args.host) as cluster:
+            print("Shards up:", ",".join(cluster.endpoints))
+            try:
+                for process in cluster.processes:
+                    process.wait()
+            except KeyboardInterrupt:
+                pass
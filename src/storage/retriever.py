@@ -0,0 +1,108 @@
+from src.core.tracing import stage
+from src.retrieval.search import load_searcher
+
+
+class Retriever:
+    """Context + video sources for ChatModel, on top of FaissSearcher (or ShardedSearcher).
+
+    `swap` replaces the searcher (a new index version) while requests are
+    running: each call reads `self.searcher` once, so in-flight requests
+    finish on the version they started with.
+    """
+
+    def __init__(self, searcher=None):
+        self.searcher = searcher or load_searcher()
+
+    def swap(self, searcher):
+        """Make `searcher` the active index; returns the previous one."""
+        old, self.searcher = self.searcher, searcher
+        return old
+
+    @property
+    def version(self) -> str:
+        return self.searcher.version
+
+    @property
+    def dim(self) -> int:
+        return self.searcher.dim
+
+    def encode(self, query: str):
+        return self.searcher.encode(query)
+
+    def get_context(self, query: str, top_k: int = 5, target_lang=None, embedding=None, window: int = 0,
+                    max_chars: int = None) -> dict:
+        """Retrieve the top_k chunks for a query.
+
+        Returns the chunk texts joined with 📌 [start – end] markers, the
+        unique play URLs, and the chunk ids / index version the answer was
+        built from (used as cache keys). `target_lang` is accepted for API
+        compatibility; transcripts are searched in their original script.
+        A precomputed query `embedding` skips encoding. `window` adds that
+        many neighbouring chunks of the same video around each hit;
+        `max_chars` stops adding hits once the context is that long.
+        """
+        searcher = self.searcher
+        with stage("search"):
+            results = searcher.search(query, top_k=top_k, embedding=embedding)
+        with stage("context"):
+            return self._build_context(results, searcher, window, max_chars)
+
+    def get_context_batch(self, queries: list, top_k: int = 5, window: int = 0, max_chars: int = None) -> list:
+        """get_context for many queries with one batched encode + search.
+
+        Each result also carries its query `embedding`.
+        """
+        searcher = self.searcher
+        with stage("encode"):
+            embeddings = searcher.encode_batch(queries)
+        with stage("search"):
+            batches = searcher.search_batch(queries, top_k=top_k, embeddings=embeddings)
+
+        contexts = []
+        with stage("context"):
+            for embedding, results in zip(embeddings, batches):
+                data = self._build_context(results, searcher, window, max_chars)
+                data["embedding"] = embedding
+                contexts.append(data)
+        return contexts
+
+    @staticmethod
+    def _neighbours(res, chunks, window, used) -> list:
+        """The hit plus up to `window` chunks on each side from the same video (not yet used)."""
+        idx = res.get("index")
+        if not window or chunks is None or idx is None:
+            return [res]
+        if idx in used:
+            return []   # already in the context as a neighbour of an earlier hit
+        span = []
+        for i in range(idx - window, idx + window + 1):
+            if 0 <= i < len(chunks) and i not in used and chunks[i].get("video_id") == res.get("video_id"):
+                used.add(i)
+                span.append(res if i == idx else chunks[i])
+        return span
+
+    def _build_context(self, results, searcher, window: int = 0, max_chars: int = None) -> dict:
+        # neighbours need the chunk list; a sharded searcher only returns hits
+        chunks = getattr(searcher, "chunks", None) if window else None
+        blocks, sources, chunk_ids, used, total = [], [], [], set(), 0
+        for res in results:
+            if max_chars and total >= max_chars:
+                break
+            span = self._neighbours(res, chunks, window, used)
+            text = " ".join((c.get("text") or c.get("text_roman") or "").strip() for c in span).strip()
+            if not text:
+                continue
+            blocks.append(f"📌 [{span[0].get('start_hhmmss', '')} – {span[-1].get('end_hhmmss', '')}] {text}")
+            chunk_ids.append(res.get("chunk_id") or str(res.get("index")))
+            total += len(text)
+
+            url = res.get("play_url")
+            if url and url not in sources:
+                sources.append(url)
+
+        return {
+            "context": "\n\n".join(blocks),
+            "sources": sources,
+            "chunk_ids": chunk_ids,
+            "index_version": searcher.version,
+        }
@@ -0,0 +1,250 @@
+"""
+Local translation between en / ur / hi (translation in settings.yaml), no network.
+
+    service = get_translation_service()
+    service.translate("Namaz ke baare mein ...", "en", "ur")
+    service.translate_batch(answers, "en", "hi")
+
+Texts are split into sentences; sentences already in the persistent cache
+(sqlite, keyed on text, source and target language) are not translated
+again, the rest are sorted by length and translated in padded batches of
+`batch_size` so similar lengths share a batch. Each language pair uses its
+opus-mt model when one is configured, otherwise the many-to-many mBART-50
+model. Models load on first use through the model pool and are shared by
+everything in the process that translates. Unsupported pairs (roman Urdu)
+come back unchanged.
+"""
+import os
+import re
+import sqlite3
+import threading
+import time
+from src.core.config import get_section
+from src.core.logging import logger
+from src.core.model_pool import get_model_pool
+
+LANGUAGES = ("en", "ur", "hi")
+MBART = "facebook/mbart-large-50-many-to-many-mmt"
+
+# sentence ends (Latin, Urdu full stop and question mark, Devanagari danda) or line breaks
+_SPLIT = re.compile(r"(\n+|(?<=[.!?۔؟।])[ \t]+)")
+_WORD = re.compile(r"[^\W\d_]", re.UNICODE)
+
+_SERVICE = None
+
+
+def split_sentences(text: str) -> list:
+    """Sentences and the separators between them: "".join(parts) == text."""
+    return [part for part in _SPLIT.split(text) if part]
+
+
+def _translatable(part: str) -> bool:
+    return bool(_WORD.search(part))
+
+
+# -------------------------
+# CACHE
+# -------------------------
+class TranslationCache:
+    """Persistent (text, src, tgt) -> translation store in one sqlite file.
+
+    Safe across threads and forked workers (a connection per process, WAL
+    journal). Past `max_entries` the oldest entries are deleted.
+    """
+
+    def __init__(self, path: str, max_entries: int = 200000):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = None
+        self._pid = None
+        self._writes = 0
+
+    def _connect(self):
+        # reopen after fork: sqlite connections must not cross processes
+        if self._conn is None or self._pid != os.getpid():
+            if os.path.dirname(self.path):
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "src TEXT, tgt TEXT, text TEXT, translation TEXT, created REAL, "
+                "PRIMARY KEY (src, tgt, text))"
+            )
+            self._pid = os.getpid()
+        return self._conn
+
+    def get_many(self, texts: list, src: str, tgt: str) -> dict:
+        found = {}
+        try:
+            with self._lock:
+                conn = self._connect()
+                for start in range(0, len(texts), 500):
+                    chunk = texts[start:start + 500]
+                    rows = conn.execute(
+                        f"SELECT text, translation FROM translations WHERE src = ? AND tgt = ? "
+                        f"AND text IN ({','.join('?' * len(chunk))})",
+                        [src, tgt, *chunk]
+                    )
+                    found.update(rows)
+                self.hits += len(found)
+                self.misses += len(set(texts)) - len(found)
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache read failed: {e}")
+        return found
+
+    def put_many(self, pairs: dict, src: str, tgt: str):
+        now = time.time()
+        try:
+            with self._lock:
+                conn = self._connect()
+                with conn:
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?)",
+                        [(src, tgt, text, translation, now) for text, translation in pairs.items()]
+                    )
+                self._writes += len(pairs)
+                if self._writes >= 1000:
+                    self._writes = 0
+                    self._prune(conn)
+        except sqlite3.Error as e:
+            logger.warning(f"Translation cache write failed: {e}")
+
+    def _prune(self, conn):
+        (count,) = conn.execute("SELECT COUNT(*) FROM translations").fetchone()
+        if count > self.max_entries:
+            with conn:
+                conn.execute(
+                    "DELETE FROM translations WHERE rowid IN "
+                    "(SELECT rowid FROM translations ORDER BY created LIMIT ?)",
+                    (count - self.max_entries,)
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "path": self.path,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+# -------------------------
+# SERVICE
+# -------------------------
+def _load_translator(model_id: str):
+    if model_id == MBART:
+        from src.reasoning.mbart_translator import MBartTranslator
+        return MBartTranslator()
+    from src.reasoning.opus_mt_translator import OpusMTTranslator
+    return OpusMTTranslator(model_id)
+
+
+class TranslationService:
+    def __init__(self, models: dict = None, fallback: str = MBART, cache: TranslationCache = None,
+                 batch_size: int = 16, max_new_tokens: int = 256, num_beams: int = 1, pool=None, loader=None):
+        # "src-tgt" -> model id
+        self.models = dict(models or {})
+        self.fallback = fallback
+        self.cache = cache
+        self.batch_size = max(1, batch_size)
+        self.max_new_tokens = max_new_tokens
+        self.num_beams = num_beams
+        self.pool = pool or get_model_pool()
+        self.loader = loader or _load_translator
+        self._lock = threading.Lock()
+        self.sentences = 0
+        self.translated = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    def model_for(self, src: str, tgt: str):
+        """Model id for a language pair, or None if it cannot be translated."""
+        if src not in LANGUAGES or tgt not in LANGUAGES or src == tgt:
+            return None
+        return self.models.get(f"{src}-{tgt}") or self.fallback
+
+    def translate(self, text: str, src: str, tgt: str) -> str:
+        return self.translate_batch([text], src, tgt)[0]
+
+    def translate_batch(self, texts: list, src: str, tgt: str) -> list:
+        model_id = self.model_for(src, tgt)
+        if model_id is None:
+            return list(texts)
+
+        split = [split_sentences(text or "") for text in texts]
+        unique = list(dict.fromkeys(part.strip() for parts in split for part in parts if _translatable(part)))
+        done = self.cache.get_many(unique, src, tgt) if self.cache is not None and unique else {}
+        missing = [s for s in unique if s not in done]
+        if missing:
+            new = self._translate(model_id, missing, src, tgt)
+            done.update(new)
+            if self.cache is not None:
+                self.cache.put_many(new, src, tgt)
+
+        with self._lock:
+            self.sentences += len(unique)
+        return ["".join(self._join(part, done) for part in parts) for parts in split]
+
+    @staticmethod
+    def _join(part: str, done: dict) -> str:
+        if not _translatable(part):
+            return part
+        # keep the sentence's surrounding whitespace
+        stripped = part.strip()
+        return part[:len(part) - len(part.lstrip())] + done.get(stripped, stripped) + part[len(part.rstrip()):]
+
+    def _translate(self, model_id: str, sentences: list, src: str, tgt: str) -> dict:
+        # similar lengths in one batch: less padding
+        ordered = sorted(sentences, key=len)
+        started = time.perf_counter()
+        out = {}
+        with self.pool.use(f"translate:{model_id}", lambda: self.loader(model_id)) as translator:
+            for start in range(0, len(ordered), self.batch_size):
+                batch = ordered[start:start + self.batch_size]
+                results = translator.translate(batch, src, tgt, max_new_tokens=self.max_new_tokens,
+                                               num_beams=self.num_beams)
+                out.update(zip(batch, results))
+                with self._lock:
+                    self.batches += 1
+        elapsed = time.perf_counter() - started
+        with self._lock:
+            self.translated += len(sentences)
+            self.seconds += elapsed
+        logger.info(f"Translated {len(sentences)} sentences {src}->{tgt} in {1000 * elapsed:.0f} ms")
+        return out
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = {
+                "sentences": self.sentences,
+                "translated": self.translated,
+                "batches": self.batches,
+                "model_ms": round(1000 * self.seconds, 1),
+            }
+        stats["cache"] = self.cache.stats() if self.cache is not None else None
+        return stats
+
+
+def get_translation_service():
+    """Shared TranslationService from `translation` in settings.yaml."""
+    global _SERVICE
+    if _SERVICE is None:
+        cfg = get_section("translation")
+        cache_path = cfg.get("cache_path")
+        _SERVICE = TranslationService(
+            models=cfg.get("models") or {},
+            fallback=cfg.get("fallback", MBART),
+            cache=TranslationCache(cache_path, max_entries=int(cfg.get("cache_max_entries") or 200000))
+            if cache_path else None,
+            batch_size=int(cfg.get("batch_size") or 16),
+            max_new_tokens=int(cfg.get("max_new_tokens") or 256),
+            num_beams=int(cfg.get("num_beams") or 1)
+        )
+    return _SERVICE
@@ -1,35 +1,30 @@
 import torch
 from transformers import AutoTokenizer, AutoModelForSeq2SeqLM
+from src.reasoning.backends import get_backend
 
 
 class QueryNormalizer:
     def __init__(self):
         self.device = "cuda" if torch.cuda.is_available() else "cpu"
+        self.model_id = "Helsinki-NLP/opus-mt-en-ur"
 
         try:
-            self.tokenizer = AutoTokenizer.from_pretrained("Helsinki-NLP/opus-mt-en-ur")
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_id)
         except Exception as e:
             msg = str(e).lower()
             if "sentencepiece" in msg:
                 raise ImportError("The tokenizer requires the 'sentencepiece' package. Install it with: pip install sentencepiece") from e
             raise
 
-        self.model = AutoModelForSeq2SeqLM.from_pretrained("Helsinki-NLP/opus-mt-en-ur").to(self.device)
+        self.backend = get_backend("opus_mt", self.model_id, self.tokenizer, self.device, self._load_torch)
+        self.model = getattr(self.backend, "model", None)
 
-    def normalize(self, query: str) -> str:
-        tokens = self.tokenizer(
-            query,
-            return_tensors="pt",
-            truncation=True
-        ).to(self.device)
-
-        with torch.no_grad():
-            out = self.model.generate(
-                **tokens,
-                max_length=64
-            )
+    def _load_torch(self):
+        model = AutoModelForSeq2SeqLM.from_pretrained(self.model_id).to(self.device)
+        return model, "fp32"
 
-        return self.tokenizer.decode(
-            out[0],
-            skip_special_tokens=True
-        )
+    def normalize(self, query: str) -> str:
+        return self.backend.generate(
+            [query],
+            max_new_tokens=64
+        )[0]
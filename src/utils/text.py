@@ -0,0 +1,15 @@
+import re
+import unicodedata
+
+# Latin + Urdu/Arabic/Devanagari punctuation
+_PUNCT = re.compile(r"[\s\.,!?;:'\"()\[\]{}\-–—_/\\|`~@#$%^&*+=<>؟۔،؛।॥]+")
+
+
+def normalize_query(text: str) -> str:
+    """Canonical form of a question for cache keys.
+
+    NFKC, case-folded, punctuation dropped and whitespace collapsed, so
+    "What is Imaan?" and "what is  imaan" map to the same key.
+    """
+    text = unicodedata.normalize("NFKC", text or "").casefold()
+    return _PUNCT.sub(" ", text).strip()
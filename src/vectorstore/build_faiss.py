@@ -1,13 +1,24 @@
+import os
 import pickle
+from src.core.threads import apply_library_threads, configure_threads
+
+# Thread environment must be in place before torch / FAISS spin up their pools
+configure_threads("build")
+
 import faiss
 import numpy as np
 from tqdm import tqdm
 from sentence_transformers import SentenceTransformer
+from src.vectorstore.bundle import (
+    CHUNKS_FILE, INDEX_FILE, bundle_dir, new_version, publish, write_manifest
+)
+
+apply_library_threads()
 
 # paths
 CHUNKS_PATH = "data/processed/chunks.pkl"
-FAISS_INDEX_PATH = "data/vector_store/faiss.index"
-CHUNKS_STORE_PATH = "data/vector_store/chunks.pkl"
+BUNDLE_ROOT = "data/vector_store"
+EMBEDDING_MODEL = "intfloat/multilingual-e5-large"
 
 # load chunks
 with open(CHUNKS_PATH, "rb") as f:
@@ -16,7 +27,7 @@ with open(CHUNKS_PATH, "rb") as f:
 print(f"Total chunks loaded: {len(chunks)}")
 
 # load embedding model (CPU friendly)
-model = SentenceTransformer("intfloat/multilingual-e5-large")
+model = SentenceTransformer(EMBEDDING_MODEL)
 
 embeddings = []
 
@@ -36,11 +47,18 @@ index.add(embeddings)
 
 print("FAISS index size:", index.ntotal)
 
-# save index
-faiss.write_index(index, FAISS_INDEX_PATH)
+# save as a new versioned bundle; running APIs swap to it once it is published
+version = new_version()
+bundle = bundle_dir(BUNDLE_ROOT, version)
+# a fresh directory: never write into an existing bundle
+os.makedirs(os.path.dirname(bundle), exist_ok=True)
+os.makedirs(bundle, exist_ok=False)
 
-# save chunks (metadata)
-with open(CHUNKS_STORE_PATH, "wb") as f:
+faiss.write_index(index, os.path.join(bundle, INDEX_FILE))
+with open(os.path.join(bundle, CHUNKS_FILE), "wb") as f:
     pickle.dump(chunks, f)
 
-print("FAISS index & chunks saved successfully")
+write_manifest(bundle, EMBEDDING_MODEL, dim, len(chunks), normalized=True)
+publish(BUNDLE_ROOT, version)
+
+print(f"FAISS index & chunks saved as bundle {version} ({bundle})")
@@ -0,0 +1,164 @@
+"""
+Versioned index bundles.
+
+A bundle is an immutable directory holding everything one index version
+needs, plus a manifest describing it:
+
+    data/vector_store/
+        CURRENT                    # name of the active bundle
+        bundles/<version>/
+            faiss.index
+            chunks.pkl
+            manifest.json          # embedding model, dim, normalization,
+                                   # chunk count, file checksums
+
+Bundles are never modified after `publish`; a new build writes a new
+directory and moves the CURRENT pointer (atomic rename), which running
+services pick up without a restart (see src/retrieval/index_watcher.py).
+"""
+import hashlib
+import json
+import os
+import shutil
+import time
+import uuid
+from src.core.logging import logger
+
+INDEX_FILE = "faiss.index"
+CHUNKS_FILE = "chunks.pkl"
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+BUNDLES_DIR = "bundles"
+
+
+class BundleError(ValueError):
+    """A bundle is missing, incomplete or does not match its manifest."""
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def new_version() -> str:
+    """Timestamp (sorts by build time) plus a random suffix, so builds in the same second never collide."""
+    return f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+
+
+def read_index(index_path: str, mmap: bool = False):
+    """Load a FAISS index, memory-mapped read-only when `mmap` is set.
+
+    A mapped index lives in the page cache, so forked API workers (and
+    other processes) share one copy. Index types FAISS cannot map are
+    loaded into memory as before.
+    """
+    import faiss
+
+    if mmap:
+        flags = faiss.IO_FLAG_READ_ONLY | faiss.IO_FLAG_MMAP | getattr(faiss, "IO_FLAG_MMAP_IFC", 0)
+        try:
+            return faiss.read_index(index_path, flags)
+        except RuntimeError as e:
+            logger.warning(f"Could not mmap {index_path} ({e}), loading it into memory")
+    return faiss.read_index(index_path)
+
+
+def bundle_dir(root: str, version: str) -> str:
+    return os.path.join(root, BUNDLES_DIR, version)
+
+
+def write_manifest(path: str, embedding_model: str, dim: int, chunk_count: int, normalized: bool = True,
+                   metric: str = "inner_product", version: str = None, extra: dict = None) -> dict:
+    """Write manifest.json for the index and chunk files already in `path`.
+
+    `extra` adds fields (e.g. shard number and partitioning for shard bundles).
+    """
+    manifest = {
+        "version": version or os.path.basename(os.path.normpath(path)),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "embedding_model": embedding_model,
+        "dim": int(dim),
+        "normalized": bool(normalized),
+        "metric": metric,
+        "chunk_count": int(chunk_count),
+        "files": {
+            name: {"sha256": file_sha256(os.path.join(path, name)), "bytes": os.path.getsize(os.path.join(path, name))}
+            for name in (INDEX_FILE, CHUNKS_FILE)
+        },
+        **(extra or {}),
+    }
+    with open(os.path.join(path, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest
+
+
+def read_manifest(path: str) -> dict:
+    try:
+        with open(os.path.join(path, MANIFEST_FILE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        raise BundleError(f"Cannot read manifest in {path}: {e}")
+
+
+def verify_files(path: str, manifest: dict):
+    """Check every file listed in the manifest exists with the right size and checksum."""
+    for name, info in (manifest.get("files") or {}).items():
+        file_path = os.path.join(path, name)
+        if not os.path.isfile(file_path):
+            raise BundleError(f"{name} missing from bundle {path}")
+        if os.path.getsize(file_path) != info.get("bytes"):
+            raise BundleError(f"{name} in {path} has the wrong size")
+        if file_sha256(file_path) != info.get("sha256"):
+            raise BundleError(f"{name} in {path} does not match its checksum")
+
+
+def current_version(root: str):
+    """Name of the active bundle, or None when `root` has no bundles yet."""
+    try:
+        with open(os.path.join(root, CURRENT_FILE), encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+
+def publish(root: str, version: str, keep: int = 3):
+    """Make `version` the active bundle and delete all but the `keep` newest others."""
+    path = bundle_dir(root, version)
+    verify_files(path, read_manifest(path))
+
+    tmp = os.path.join(root, f"{CURRENT_FILE}.{os.getpid()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version + "\n")
+    os.replace(tmp, os.path.join(root, CURRENT_FILE))
+
+    # versions sort by name (timestamps); running processes keep the files they mapped
+    others = sorted(v for v in os.listdir(os.path.join(root, BUNDLES_DIR)) if v != version)
+    for old in others[:max(0, len(others) - keep)]:
+        shutil.rmtree(bundle_dir(root, old), ignore_errors=True)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="List, verify or activate index bundles")
+    parser.add_argument("--root", default="data/vector_store")
+    parser.add_argument("--publish", metavar="VERSION", help="make VERSION the active bundle (e.g. roll back)")
+    parser.add_argument("--verify", metavar="VERSION", help="check VERSION against its manifest")
+    args = parser.parse_args()
+
+    if args.publish:
+        publish(args.root, args.publish)
+        print(f"Active bundle: {args.publish}")
+    elif args.verify:
+        verify_files(bundle_dir(args.root, args.verify), read_manifest(bundle_dir(args.root, args.verify)))
+        print(f"{args.verify}: OK")
+    else:
+        active = current_version(args.root)
+        folder = os.path.join(args.root, BUNDLES_DIR)
+        for version in sorted(os.listdir(folder)) if os.path.isdir(folder) else []:
+            manifest = read_manifest(bundle_dir(args.root, version))
+            mark = "*" if version == active else " "
+            print(f"{mark} {version}  {manifest['embedding_model']}  dim={manifest['dim']}  chunks={manifest['chunk_count']}")
@@ -5,6 +5,9 @@ Simple UI for testing the chatbot
 import sys
 import streamlit as st
 import os
+from src.core.threads import configure_threads
+
+configure_threads("streamlit")
 
 # Import evidence builder directly
 try:
@@ -18,9 +18,9 @@
 #     print()
 
 
-from src.retrieval.search import VectorSearcher
+from src.retrieval.search import FaissSearcher
 
-searcher = VectorSearcher()
+searcher = FaissSearcher.load_current()
 query = "وض بلہِ ونشیطانِ رجیم بسم اللہِ رحمان الرحیم"
 
 results = searcher.search(query, top_k=3)
@@ -29,5 +29,5 @@ for i, r in enumerate(results, 1):
     print(f"\n--- Result {i} ---")
     print("Score :", round(r['score'], 3))
     print("Title :", r['title'])
-    print("Text  :", r['text'][:200], "...")
+    print("Text  :", (r.get('text') or r.get('text_roman'))[:200], "...")
     print("URL   :", r['play_url'])
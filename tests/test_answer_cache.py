@@ -0,0 +1,39 @@
+from src.cache.answer_cache import AnswerCache
+
+
+def test_key_ignores_case_punctuation_and_spacing():
+    a = AnswerCache.make_key("What is Imaan?", "en", ["v1_0001", "v1_0002"])
+    b = AnswerCache.make_key("what is  imaan", "en", ["v1_0001", "v1_0002"])
+    c = AnswerCache.make_key("what is imaan", "en", ["v1_0003"])
+
+    assert a == b
+    assert a != c
+
+
+def test_lru_and_ttl(monkeypatch):
+    cache = AnswerCache(max_entries=2, ttl=10)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    cache.get("a")
+    cache.put("c", 3)
+
+    assert cache.get("b") is None      # least recently used
+    assert cache.get("a") == 1
+
+    import src.cache.answer_cache as module
+    now = module.time.time()
+    monkeypatch.setattr(module.time, "time", lambda: now + 11)
+    assert cache.get("a") is None      # expired
+
+
+def test_version_change_clears_disk_tier(tmp_path):
+    cache = AnswerCache(disk_dir=str(tmp_path))
+    cache.check_version("v1")
+    cache.put("k", {"answer": "x", "sources": []})
+
+    cache.clear()
+    assert cache.get("k") == {"answer": "x", "sources": []}   # served from disk
+
+    cache.check_version("v2")
+    assert cache.get("k") is None
+    assert not (tmp_path / "v1").exists()
@@ -0,0 +1,77 @@
+import pytest
+from src.reasoning.assisted import AssistedDecodingStats
+
+
+def test_acceptance_rate_from_forward_counts():
+    stats = AssistedDecodingStats(num_assistant_tokens=4, window=10)
+    # 3 tokens per target forward -> 2 of 4 draft tokens accepted per step
+    stats.record(True, new_tokens=90, forwards=30, seconds=1.0)
+
+    snap = stats.snapshot()
+    assert snap["tokens_per_forward"] == 3.0
+    assert snap["acceptance_rate"] == 0.5
+
+
+def test_low_acceptance_disables_for_cooldown():
+    stats = AssistedDecodingStats(num_assistant_tokens=4, min_acceptance_rate=0.3, window=2, cooldown=3)
+    stats.record(True, new_tokens=10, forwards=10, seconds=1.0)
+    stats.record(True, new_tokens=10, forwards=10, seconds=1.0)
+
+    assert stats.fallbacks == 1
+    assert [stats.active() for _ in range(4)] == [False, False, False, True]
+
+
+def test_baseline_requests_let_low_speedup_fall_back():
+    stats = AssistedDecodingStats(num_assistant_tokens=4, min_acceptance_rate=0.0, min_speedup=1.1,
+                                  window=2, cooldown=5, baseline_every=2)
+    for _ in range(3):
+        if stats.active():
+            stats.record(True, new_tokens=40, forwards=10, seconds=2.0)    # 20 tok/s with the draft
+        else:
+            stats.record(False, new_tokens=40, forwards=40, seconds=1.0)   # 40 tok/s without
+
+    assert stats.plain_calls == 1 and stats.assisted_calls == 2
+    assert stats.fallbacks == 1
+    assert not stats.active()
+
+
+def test_phi2_falls_back_to_plain_decoding_on_low_acceptance():
+    torch = pytest.importorskip("torch")
+    transformers = pytest.importorskip("transformers")
+    from src.reasoning.phi2_reasoner import Phi2Reasoner
+
+    class FakeLM(torch.nn.Module):
+        def __init__(self):
+            super().__init__()
+            self.layer = torch.nn.Linear(1, 1)
+            self.assisted = []
+
+        def forward(self, x):
+            return self.layer(x)
+
+        def generate(self, input_ids, attention_mask=None, max_new_tokens=8, assistant_model=None, **kwargs):
+            # one forward per token: no draft token is ever accepted
+            for _ in range(max_new_tokens):
+                self(torch.ones(1, 1))
+            self.assisted.append(assistant_model is not None)
+            return torch.zeros(1, input_ids.shape[1] + max_new_tokens, dtype=torch.long)
+
+    class FakeTokenizer:
+        def __call__(self, prompt, return_tensors=None):
+            return transformers.BatchEncoding({"input_ids": torch.ones(1, 3, dtype=torch.long),
+                                               "attention_mask": torch.ones(1, 3, dtype=torch.long)})
+
+        def decode(self, ids, skip_special_tokens=True):
+            return "jawab"
+
+    reasoner = Phi2Reasoner.__new__(Phi2Reasoner)
+    reasoner.model, reasoner.tokenizer, reasoner.device = FakeLM(), FakeTokenizer(), "cpu"
+    reasoner.draft = object()
+    reasoner.assisted = AssistedDecodingStats(num_assistant_tokens=4, min_acceptance_rate=0.3, window=2,
+                                              cooldown=2, baseline_every=0)
+
+    for _ in range(5):
+        assert reasoner.generate("sawal") == "jawab"
+
+    assert reasoner.model.assisted == [True, True, False, False, True]
+    assert reasoner.assisted_stats()["fallbacks"] == 1
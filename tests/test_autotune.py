@@ -0,0 +1,58 @@
+import pytest
+from src.bench.autotune import choose, grid_trials, pareto_front, quality, token_f1, update_section
+from src.core.config import load_settings
+
+SETTINGS = """\
+# Retrieval knobs
+pipeline:
+  # seq2seq | stub
+  reasoner: seq2seq
+  model: ${HF_MODEL:-google/flan-t5-small}
+  top_k: 5
+  num_beams: null
+
+# answer caches
+cache:
+  answers:
+    enabled: true
+"""
+
+
+def test_token_f1_and_quality():
+    assert token_f1("Namaz paanch waqt ki hai", "namaz paanch waqt ki farz hai") == pytest.approx(2 * 5 / 11)
+    assert token_f1("", "anything") == 0.0
+    assert quality(None, 0.4, {}) == 0.4
+    assert quality(1.0, 0.5, {"evidence": 1, "answer": 3}) == pytest.approx(0.625)
+
+
+def test_grid_frontier_and_choice():
+    trials = grid_trials({"top_k": 5, "num_beams": None}, {"top_k": [3, 5], "num_beams": [1, 4]}, max_trials=3)
+    assert trials[0] == {"top_k": 5, "num_beams": None}
+    assert len(trials) == 3
+
+    points = [
+        {"latency_ms": 100, "quality": 0.40},
+        {"latency_ms": 150, "quality": 0.38},   # dominated
+        {"latency_ms": 200, "quality": 0.55},
+        {"latency_ms": 400, "quality": 0.56},
+    ]
+    front = pareto_front(points)
+    assert [p["latency_ms"] for p in front] == [100, 200, 400]
+    assert choose(front, max_latency_ms=250)["latency_ms"] == 200
+    assert choose(front, max_latency_ms=50) is None
+    assert choose(front, tolerance=0.02)["latency_ms"] == 200
+
+
+def test_update_section_keeps_comments_and_placeholders(tmp_path):
+    path = tmp_path / "settings.yaml"
+    path.write_text(SETTINGS, encoding="utf-8")
+    update_section(str(path), "pipeline", {"top_k": 8, "num_beams": 2, "context_window": 1})
+
+    text = path.read_text(encoding="utf-8")
+    assert "# seq2seq | stub" in text and "${HF_MODEL:-google/flan-t5-small}" in text
+    settings = load_settings(str(path))
+    assert settings["pipeline"] == {
+        "reasoner": "seq2seq", "model": "google/flan-t5-small", "top_k": 8, "num_beams": 2, "context_window": 1
+    }
+    assert settings["cache"]["answers"]["enabled"] is True
+    assert text.index("context_window") < text.index("# answer caches")
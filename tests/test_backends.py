@@ -0,0 +1,89 @@
+import time
+import pytest
+
+pytest.importorskip("torch")
+from src.reasoning.backends import CTranslate2Backend
+
+
+class FakeTokenizer:
+    def encode(self, text, truncation=True, max_length=512):
+        return list(range(min(len(text.split()), max_length)))
+
+    def convert_ids_to_tokens(self, ids):
+        return [f"t{i}" for i in ids]
+
+    def convert_tokens_to_ids(self, tokens):
+        return tokens
+
+    def decode(self, ids, skip_special_tokens=True):
+        return " ".join(ids)
+
+
+class FakeResult:
+    def __init__(self, tokens):
+        self.hypotheses = [tokens]
+
+
+class FakeTranslator:
+    def __init__(self, output=("en_XX", "hello")):
+        self.output = list(output)
+        self.calls = []
+
+    def translate_batch(self, sources, **options):
+        self.calls.append(options)
+        return [FakeResult(self.output) for _ in sources]
+
+
+def _backend(translator):
+    backend = CTranslate2Backend.__new__(CTranslate2Backend)
+    backend.tokenizer = FakeTokenizer()
+    backend.precision = "int8"
+    backend.max_batch_size = 4
+    backend.translator = translator
+    backend.model_name = "mbart"
+    return backend
+
+
+def test_options_mapped_to_translate_batch():
+    translator = FakeTranslator()
+    out = _backend(translator).generate(
+        ["a b c", "d"], max_new_tokens=32, min_length=2, min_new_tokens=5, num_beams=4,
+        repetition_penalty=1.2, no_repeat_ngram_size=3, max_input_tokens=2, target_prefix="en_XX"
+    )
+
+    assert out == ["hello", "hello"]   # target prefix stripped
+    options = translator.calls[0]
+    assert options["target_prefix"] == [["en_XX"]] * 2
+    assert options["beam_size"] == 4 and options["max_batch_size"] == 4
+    assert options["max_decoding_length"] == 32 and options["min_decoding_length"] == 5
+    assert options["repetition_penalty"] == 1.2 and options["no_repeat_ngram_size"] == 3
+    assert "callback" not in options and "sampling_topp" not in options
+
+
+def test_sampling_options():
+    translator = FakeTranslator()
+    _backend(translator).generate(["a"], do_sample=True, temperature=0.7, top_p=0.9)
+    options = translator.calls[0]
+    assert options["sampling_topk"] == 0 and options["sampling_topp"] == 0.9
+    assert options["sampling_temperature"] == 0.7
+
+
+def test_greedy_deadline_callback_stops_decoding():
+    translator = FakeTranslator()
+    deadline = time.monotonic() + 0.05
+    _backend(translator).generate(["a"], deadline=deadline)
+
+    callback = translator.calls[0]["callback"]
+    assert callback(None) is False
+    time.sleep(max(0.0, deadline - time.monotonic()) + 0.01)
+    assert callback(None) is True
+
+
+def test_deadline_with_beams_or_already_passed():
+    translator = FakeTranslator()
+    backend = _backend(translator)
+    backend.generate(["a"], num_beams=2, deadline=time.monotonic() + 10)
+    assert "callback" not in translator.calls[0]
+
+    assert backend.generate(["a", "b"], deadline=time.monotonic() - 1) == ["", ""]
+    assert len(translator.calls) == 1
@@ -0,0 +1,29 @@
+import json
+import os
+from src.bench.report import latency_summary, percentile, write_results
+
+
+def test_percentiles_and_summary():
+    values = [i / 1000 for i in range(1, 101)]   # 1..100 ms
+    assert percentile(values, 0.5) == 0.05
+    assert percentile(values, 0.99) == 0.099
+    assert percentile(values, 1.0) == 0.1
+    assert percentile(values, 0.0) == 0.001
+    assert percentile([], 0.5) == 0.0
+
+    summary = latency_summary(values)
+    assert summary["count"] == 100
+    assert summary["p95_ms"] == 95.0
+    assert latency_summary([]) == {"count": 0}
+
+
+def test_write_results_appends_history(tmp_path):
+    first = write_results("retrieval", {"variants": [1]}, {"qps": 10}, str(tmp_path))
+    write_results("retrieval", {"variants": [2]}, {"qps": 12}, str(tmp_path))
+
+    with open(first, encoding="utf-8") as f:
+        assert json.load(f)["variants"] == [1]
+    with open(os.path.join(tmp_path, "retrieval.jsonl"), encoding="utf-8") as f:
+        history = [json.loads(line) for line in f]
+    assert [h["qps"] for h in history] == [10, 12]
+    assert "git_commit" in history[0]["meta"]
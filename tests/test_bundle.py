@@ -0,0 +1,46 @@
+import os
+import pytest
+from src.vectorstore.bundle import (
+    BundleError, CHUNKS_FILE, INDEX_FILE, bundle_dir, current_version, new_version, publish, read_manifest,
+    verify_files, write_manifest
+)
+
+
+def _make_bundle(root, version, payload=b"index"):
+    path = bundle_dir(str(root), version)
+    os.makedirs(path)
+    with open(os.path.join(path, INDEX_FILE), "wb") as f:
+        f.write(payload)
+    with open(os.path.join(path, CHUNKS_FILE), "wb") as f:
+        f.write(b"chunks")
+    write_manifest(path, "intfloat/multilingual-e5-large", 1024, 3)
+    return path
+
+
+def test_publish_moves_current_pointer_and_prunes_old_bundles(tmp_path):
+    assert current_version(str(tmp_path)) is None
+    for version in ("20240101-000000", "20240102-000000", "20240103-000000"):
+        _make_bundle(tmp_path, version)
+        publish(str(tmp_path), version, keep=1)
+
+    assert current_version(str(tmp_path)) == "20240103-000000"
+    assert sorted(os.listdir(tmp_path / "bundles")) == ["20240102-000000", "20240103-000000"]
+    assert read_manifest(bundle_dir(str(tmp_path), "20240103-000000"))["chunk_count"] == 3
+
+
+def test_modified_bundle_fails_verification(tmp_path):
+    path = _make_bundle(tmp_path, "v1")
+    verify_files(path, read_manifest(path))
+
+    with open(os.path.join(path, INDEX_FILE), "wb") as f:
+        f.write(b"INDEX")
+    with pytest.raises(BundleError):
+        verify_files(path, read_manifest(path))
+    with pytest.raises(BundleError):
+        publish(str(tmp_path), "v1")
+    assert current_version(str(tmp_path)) is None
+
+
+def test_new_versions_are_unique_within_a_second():
+    versions = {new_version() for _ in range(100)}
+    assert len(versions) == 100
@@ -0,0 +1,56 @@
+import time
+import pytest
+
+pytest.importorskip("langdetect")
+pytest.importorskip("sentence_transformers")
+from src.chat.chat_model import ChatModel
+
+CONTEXT = (
+    "📌 [00:10 – 00:40]\n"
+    "Imaan is belief in Allah, His angels, His books and His messengers.\n"
+    "It also includes belief in the Last Day and in divine decree."
+)
+
+
+class PartialLLM:
+    """Stands in for a reasoner whose generation was cut short by the deadline."""
+
+    def __init__(self, output):
+        self.output = output
+        self.calls = []
+
+    def generate(self, prompt, max_length=200, **options):
+        self.calls.append(options)
+        return self.output
+
+
+def _chat(llm):
+    chat = ChatModel.__new__(ChatModel)
+    chat.llm = llm
+    chat.settings = {}
+    chat.cache = None
+    chat.semantic_cache = None
+    chat.translation = {}
+    return chat
+
+
+def test_short_partial_answer_falls_back_to_extraction():
+    llm = PartialLLM("Imaan is")
+    data = {"context": CONTEXT, "sources": ["https://youtu.be/x?t=10"], "index_version": "v1"}
+
+    result = _chat(llm).respond("What is imaan?", "en", data, deadline=time.monotonic() + 5)
+
+    assert "deadline" in llm.calls[0]
+    assert "Imaan is belief in Allah" in result["answer"]
+    assert "Last Day" in result["answer"]
+    assert result["sources"] == data["sources"] and result["index_version"] == "v1"
+
+
+def test_full_answer_is_kept():
+    llm = PartialLLM("Imaan means faith: belief in Allah and everything He revealed.")
+    data = {"context": CONTEXT, "sources": ["https://youtu.be/x?t=10"]}
+
+    result = _chat(llm).respond("What is imaan?", "en", data)
+
+    assert "Imaan means faith" in result["answer"]
+    assert "Last Day" not in result["answer"]
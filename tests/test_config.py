@@ -0,0 +1,23 @@
+from src.core.config import _expand, load_settings
+
+
+def test_expand_env_placeholders(monkeypatch):
+    monkeypatch.setenv("REASONER_PRECISION", "int8")
+    monkeypatch.delenv("PRECISION_SELF_CHECK", raising=False)
+
+    data = _expand({
+        "precision": "${REASONER_PRECISION:-fp32}",
+        "self_check": "${PRECISION_SELF_CHECK:-false}",
+        "path": "logs/${REASONER_PRECISION}.log",
+        "unset": "${SOME_UNSET_VARIABLE}",
+    })
+
+    assert data["precision"] == "int8"
+    assert data["self_check"] is False
+    assert data["path"] == "logs/int8.log"
+    assert data["unset"] is None
+
+
+def test_settings_file_has_reasoning_section():
+    settings = load_settings("config/settings.yaml")
+    assert settings["reasoning"]["precision"]["default"] in ("fp32", "bf16", "int8")
@@ -0,0 +1,71 @@
+import pytest
+
+pytest.importorskip("faiss")
+pytest.importorskip("sentence_transformers")
+import src.retrieval.index_watcher as index_watcher
+from src.retrieval.index_watcher import IndexWatcher
+from src.vectorstore.bundle import BundleError
+
+
+class FakeSearcher:
+    def __init__(self, version, model_name="e5"):
+        self.version = version
+        self.model_name = model_name
+
+
+class FakeRetriever:
+    def __init__(self):
+        self.searcher = FakeSearcher("v1")
+
+    @property
+    def version(self):
+        return self.searcher.version
+
+    def swap(self, searcher):
+        old, self.searcher = self.searcher, searcher
+        return old
+
+
+def _watcher(monkeypatch, errors, now):
+    """Watcher whose CURRENT is v2; each load raises the next error in `errors` (None = loads)."""
+    loads = []
+
+    def from_bundle(path, reuse=None):
+        loads.append(path)
+        error = errors.pop(0)
+        if error is not None:
+            raise error
+        return FakeSearcher("v2")
+
+    monkeypatch.setattr(index_watcher, "current_version", lambda root: "v2")
+    monkeypatch.setattr(index_watcher.FaissSearcher, "from_bundle", staticmethod(from_bundle))
+    monkeypatch.setattr(index_watcher.time, "time", lambda: now[0])
+    return IndexWatcher(FakeRetriever(), root="store", retry_s=10, retry_max_s=15), loads
+
+
+def test_transient_load_failure_retried_after_backoff(monkeypatch):
+    now = [1000.0]
+    watcher, loads = _watcher(monkeypatch, [OSError("disk full"), RuntimeError("out of memory"), None], now)
+
+    assert not watcher.check()
+    assert watcher.status()["retrying"]["v2"]["attempts"] == 1
+    now[0] += 5
+    assert not watcher.check() and len(loads) == 1      # still backing off
+
+    now[0] += 6
+    assert not watcher.check() and len(loads) == 2
+    assert watcher.retrying["v2"]["retry_at"] == now[0] + 15   # doubled, capped
+
+    now[0] += 15
+    assert watcher.check()
+    assert watcher.retriever.version == "v2" and watcher.retrying == {} and watcher.failed == {}
+
+
+def test_broken_bundle_not_retried(monkeypatch):
+    now = [1000.0]
+    watcher, loads = _watcher(monkeypatch, [BundleError("checksum mismatch")], now)
+
+    assert not watcher.check()
+    now[0] += 3600
+    assert not watcher.check()
+    assert len(loads) == 1 and "v2" in watcher.failed
@@ -0,0 +1,50 @@
+from src.chat.langid import LanguageIdentifier, script_counts
+
+EN = [
+    "What is the meaning of faith in Islam",
+    "How many prayers are obligatory every day",
+    "Explain the story of the prophet in this lecture",
+    "Which surah talks about patience and gratitude",
+    "Why do we fast during the month of Ramadan",
+    "Tell me about the day of judgement",
+]
+ROMAN = [
+    "Imaan ka matlab kya hai",
+    "Namaz ki kitni rakat hoti hain",
+    "Roze kyun rakhe jaate hain Ramzan mein",
+    "Sabr aur shukr ke baare mein bataiye",
+    "Qayamat ke din kya hoga",
+    "Nabi ki kahani sunaiye is bayan mein",
+]
+
+
+def test_script_counts_single_pass():
+    assert script_counts("نماز kya hai") == (4, 0, 6)
+    assert script_counts("नमाज़ 12!") == (0, 5, 0)
+
+
+def test_script_decides_urdu_and_hindi():
+    langid = LanguageIdentifier()
+    assert langid.identify("نماز کی کتنی رکعات ہیں؟") == ("ur", 1.0)
+    assert langid.identify("नमाज़ में कितनी रकात हैं")[0] == "hi"
+    assert langid.identify("") == ("en", 1.0)
+    assert langid.identify("123 ?!")[1] == 0.0
+
+
+def test_ngram_model_separates_english_and_roman_urdu(tmp_path):
+    langid = LanguageIdentifier.train([(t, "en") for t in EN] + [(t, "roman") for t in ROMAN])
+    path = str(tmp_path / "langid.json")
+    langid.save(path)
+    langid = LanguageIdentifier.load(path)
+
+    results = langid.identify_batch(["What does the lecture say about prayer", "Namaz ka tareeqa kya hai"])
+    assert [lang for lang, _ in results] == ["en", "roman"]
+    assert all(confidence > 0.5 for _, confidence in results)
+    # deterministic
+    assert langid.identify_batch(["Namaz ka tareeqa kya hai"] * 3) == [results[1]] * 3
+
+
+def test_without_model_only_word_list_is_confident():
+    langid = LanguageIdentifier(roman_words={"kya", "hai"})
+    assert langid.identify("Imaan kya hai") == ("roman", 1.0)
+    assert langid.identify("What is faith")[1] == 0.0
@@ -0,0 +1,77 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from src.bench.loadtest import LoadTest, QueueSampler, arrival_gaps
+from src.core.deadline import deadline_after
+from src.reasoning.stub_reasoner import StubReasoner
+
+PROMPT = "Read this information:\nsabr ka matlab hai mushkil waqt mein Allah par bharosa rakhna\n\nQuestion: sabr?\n\nAnswer:"
+
+
+def test_stub_reasoner_is_deterministic_and_honors_deadline():
+    llm = StubReasoner(token_delay_ms=0, first_token_ms=0, max_new_tokens=8)
+    first = llm.generate(PROMPT)
+    assert first == llm.generate(PROMPT)
+    assert len(first.split()) == 8
+    assert set(first.split()) <= set(PROMPT.splitlines()[1].split())
+    assert llm.generate_batch([PROMPT, PROMPT], profile="fast") == [first, first]
+
+    slow = StubReasoner(token_delay_ms=50, first_token_ms=0, max_new_tokens=64)
+    started = time.perf_counter()
+    partial = slow.generate(PROMPT, deadline=deadline_after(0.2))
+    assert time.perf_counter() - started < 0.5
+    assert len(partial.split()) < 64
+
+
+def test_arrival_gaps():
+    gaps = arrival_gaps("constant", 4.0)
+    assert [next(gaps) for _ in range(3)] == [0.25, 0.25, 0.25]
+    poisson = arrival_gaps("poisson", 10.0, seed=1)
+    mean = sum(next(poisson) for _ in range(2000)) / 2000
+    assert 0.08 < mean < 0.12
+
+
+class _Handler(BaseHTTPRequestHandler):
+    calls = 0
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers["Content-Length"]))
+        _Handler.calls += 1
+        if _Handler.calls % 5 == 0:
+            return self._send(503, {"detail": "overloaded"})
+        self._send(200, {"answer": "ok", "timings": {"stages_ms": {"search": 2.0, "generation": 8.0}}})
+
+    def do_GET(self):
+        self._send(200, {"stages": {"generation": {"queued": 2, "running": 1}}})
+
+    def log_message(self, *args):
+        pass
+
+
+def test_closed_loop_against_fake_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        test = LoadTest(url, ["q1", "q2"])
+        sampler = QueueSampler(url, interval=0.05)
+        sampler.start()
+        test.closed(concurrency=4, duration=0.5)
+        sampler.stop()
+        summary = test.summary(0.5)
+    finally:
+        server.shutdown()
+
+    assert summary["requests"] > 0
+    assert set(summary["statuses"]) <= {"200", "503"}
+    assert 0 < summary["error_rate"] < 0.5
+    assert summary["stages"]["generation"]["p50_ms"] == 8.0
+    assert sampler.summary()["generation"]["queued_max"] == 2
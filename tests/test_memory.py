@@ -0,0 +1,28 @@
+import os
+from src.core.memory import parse_smaps_rollup, process_memory
+
+SMAPS = """55d4c0a00000-7ffd2b5fe000 ---p 00000000 00:00 0                          [rollup]
+Rss:             2048000 kB
+Pss:              700000 kB
+Shared_Clean:    1800000 kB
+Shared_Dirty:       4000 kB
+Private_Clean:     20000 kB
+Private_Dirty:    224000 kB
+Swap:                  0 kB
+"""
+
+
+def test_parse_smaps_rollup_splits_unique_and_shared():
+    report = parse_smaps_rollup(SMAPS)
+
+    assert report["rss"] == 2000.0
+    assert report["unique"] == round(244000 / 1024, 1)
+    assert report["shared"] == round(1804000 / 1024, 1)
+
+
+def test_process_memory_of_current_process():
+    report = process_memory()
+    if report is None:   # no /proc smaps_rollup on this platform
+        return
+    assert report["pid"] == os.getpid()
+    assert report["rss"] > 0
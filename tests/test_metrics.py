@@ -0,0 +1,45 @@
+import threading
+from src.core.metrics import Registry
+from src.core.tracing import current_trace, record_tokens, stage, start_trace
+
+
+def test_render_counter_histogram_and_collector():
+    registry = Registry()
+    requests = registry.counter("rag_requests_total", "Requests", ["endpoint"])
+    latency = registry.histogram("rag_latency_seconds", "Latency", ["endpoint"], buckets=(0.1, 1.0))
+    registry.add_collector(lambda: [("rag_ready", "gauge", "Ready", [({}, 1)])])
+
+    requests.inc(endpoint="/ask")
+    requests.inc(endpoint="/ask")
+    latency.observe(0.05, endpoint="/ask")
+    latency.observe(0.5, endpoint="/ask")
+
+    text = registry.render()
+    assert "# TYPE rag_requests_total counter" in text
+    assert 'rag_requests_total{endpoint="/ask"} 2' in text
+    assert 'rag_latency_seconds_bucket{endpoint="/ask",le="0.1"} 1' in text
+    assert 'rag_latency_seconds_bucket{endpoint="/ask",le="+Inf"} 2' in text
+    assert 'rag_latency_seconds_count{endpoint="/ask"} 2' in text
+    assert "rag_ready 1" in text
+
+
+def test_trace_collects_stages_and_tokens():
+    trace = start_trace()
+    with stage("search"):
+        pass
+    with stage("search"):
+        pass
+    record_tokens("chat", 120, 40)
+
+    breakdown = trace.breakdown()
+    assert list(breakdown["stages_ms"]) == ["search"]
+    assert breakdown["tokens"] == {"chat": {"prompt": 120, "output": 40}}
+
+
+def test_trace_does_not_leak_into_other_threads():
+    start_trace()
+    seen = []
+    worker = threading.Thread(target=lambda: seen.append(current_trace()))
+    worker.start()
+    worker.join()
+    assert seen == [None]
@@ -0,0 +1,86 @@
+import os
+import pytest
+import src.core.model_pool as model_pool
+from src.core.model_pool import ModelPool
+
+MB = 2 ** 20
+
+
+class FakeModel:
+    def __init__(self, name, size_mb):
+        self.name = name
+        self.size = size_mb * MB
+
+
+def _loader(name, size_mb, calls):
+    def load():
+        calls.append(name)
+        return FakeModel(name, size_mb)
+    return load
+
+
+def test_lru_eviction_under_budget(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_pool, "resident_bytes", lambda obj: obj.size)
+    pool = ModelPool(budget_mb=100, offload_dir=str(tmp_path))
+    calls = []
+
+    pool.get("chat", _loader("chat", 40, calls), pinned=True)
+    pool.get("gpt2", _loader("gpt2", 30, calls))
+    pool.get("mt5", _loader("mt5", 30, calls))
+    pool.get("gpt2", _loader("gpt2", 30, calls))          # hit, gpt2 is now more recent than mt5
+    pool.get("mbart", _loader("mbart", 30, calls))        # evicts mt5 (LRU), never the pinned chat model
+
+    stats = pool.stats()
+    assert calls == ["chat", "gpt2", "mt5", "mbart"]
+    assert {m["key"] for m in stats["models"]} == {"chat", "gpt2", "mbart"}
+    assert stats["used_mb"] == 100 and stats["evictions"] == 1 and stats["hits"] == 1
+
+    pool.get("mt5", _loader("mt5", 30, calls))            # reload evicts gpt2 before loading
+    assert calls[-1] == "mt5"
+    assert {m["key"] for m in pool.stats()["models"]} == {"chat", "mbart", "mt5"}
+
+
+def test_models_in_use_are_not_evicted(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_pool, "resident_bytes", lambda obj: obj.size)
+    pool = ModelPool(budget_mb=50, offload_dir=str(tmp_path))
+    calls = []
+
+    with pool.use("mbart", _loader("mbart", 40, calls)):
+        pool.get("opus_mt", _loader("opus_mt", 20, calls))    # over budget, but mbart is busy
+        assert {m["key"] for m in pool.stats()["models"]} == {"mbart", "opus_mt"}
+    pool.get("gpt2", _loader("gpt2", 20, calls))
+    assert {m["key"] for m in pool.stats()["models"]} == {"opus_mt", "gpt2"}
+
+
+def test_offload_without_torch_modules_drops_the_model(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_pool, "resident_bytes", lambda obj: obj.size)
+    pool = ModelPool(budget_mb=10, offload=True, offload_dir=str(tmp_path))
+    calls = []
+    pool.get("a", _loader("a", 8, calls))
+    pool.get("b", _loader("b", 8, calls))
+    stats = pool.stats()
+    assert [m["key"] for m in stats["models"]] == ["b"]
+    assert stats["offloads"] == 0 and stats["evictions"] == 1
+
+
+def test_offload_and_restore_torch_module(tmp_path):
+    torch = pytest.importorskip("torch")
+    pytest.importorskip("safetensors")
+
+    class Reasoner:
+        def __init__(self):
+            self.model = torch.nn.Linear(64, 64)
+
+    pool = ModelPool(budget_mb=0.02, offload=True, offload_dir=str(tmp_path))
+    first = pool.get("a", Reasoner)
+    weights = first.model.weight.detach().clone()
+    pool.get("b", Reasoner)                               # over budget: a is offloaded
+
+    assert pool.stats()["offloads"] == 1
+    assert first.model.weight.device.type == "meta"
+    assert os.listdir(pool.offload_dir) and pool.offload_dir.endswith(str(os.getpid()))
+    assert not [f for f in os.listdir(pool.offload_dir) if f.endswith(".tmp")]
+
+    again = pool.get("a", Reasoner)                       # restored in place, not rebuilt
+    assert again is first and pool.stats()["restores"] == 1
+    assert torch.equal(again.model.weight, weights)
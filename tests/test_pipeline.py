@@ -0,0 +1,50 @@
+import asyncio
+import threading
+from src.api.pipeline import AskPipeline
+
+
+class FakeChat:
+    def __init__(self):
+        self.lookup_threads = []
+
+    def detect(self, question):
+        return "en"
+
+    def detect_batch(self, questions):
+        return ["en"] * len(questions)
+
+    def retrieve(self, question, top_k=None):
+        return {"chunk_ids": ["a"]}
+
+    def retrieve_batch(self, questions, top_k=None):
+        return [{"chunk_ids": ["a"]} for _ in questions]
+
+    def lookup(self, question, query_lang, data, profile=None):
+        self.lookup_threads.append(threading.current_thread().name)
+        return {"answer": "cached"} if question == "hit" else None
+
+    def respond(self, question, query_lang, data, deadline, profile=None):
+        return {"answer": "generated"}
+
+    def respond_batch(self, items, deadline, profile=None):
+        return [{"answer": "generated"} for _ in items]
+
+
+def test_cache_lookups_run_off_the_event_loop():
+    chat = FakeChat()
+    pipeline = AskPipeline(chat, executors={})
+
+    async def run():
+        single = await pipeline.answer("hit")
+        batch = [item async for item in pipeline.answer_batch(["hit", "miss", "miss"])]
+        return single, batch
+
+    try:
+        single, batch = asyncio.run(run())
+    finally:
+        pipeline.shutdown()
+
+    assert single == {"answer": "cached"}
+    assert sorted((i, cached) for i, _, cached in batch) == [(0, True), (1, False), (2, False)]
+    assert len(chat.lookup_threads) == 4
+    assert all(name.startswith("retrieval-stage") for name in chat.lookup_threads)
@@ -0,0 +1,52 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+from transformers.pytorch_utils import Conv1D
+import src.reasoning.precision as precision
+from src.reasoning.precision import _agreement, _conv1d_to_linear, footprint_bytes, resolve_precision
+
+
+def test_conv1d_swapped_for_an_equivalent_linear():
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(Conv1D(6, 4), torch.nn.ReLU(), Conv1D(3, 6))
+    x = torch.randn(2, 5, 4)
+    with torch.no_grad():
+        expected = model(x)
+
+    _conv1d_to_linear(model)
+
+    assert not any(isinstance(m, Conv1D) for m in model.modules())
+    assert isinstance(model[0], torch.nn.Linear) and model[0].weight.shape == (6, 4)
+    with torch.no_grad():
+        assert torch.allclose(model(x), expected, atol=1e-6)
+
+
+def test_footprint_bytes():
+    linear = torch.nn.Linear(4, 4)                      # 16 weights + 4 biases
+    assert footprint_bytes(linear) == 20 * 4
+    assert footprint_bytes(linear.to(torch.bfloat16)) == 20 * 2
+
+    norm = torch.nn.BatchNorm1d(4)                      # buffers count too
+    assert footprint_bytes(norm) == 4 * 4 * 4 + 8
+
+
+def test_agreement():
+    assert _agreement([1, 2, 3, 4], [1, 2, 9, 4]) == 0.75
+    assert _agreement([1, 2], [1, 2, 3, 4]) == 0.5
+    assert _agreement([], []) == 1.0
+
+
+def test_resolve_precision(monkeypatch):
+    cfg = {"precision": {"default": "int8", "phi2": "BF16", "mt5": "fp8"}}
+    monkeypatch.setattr(precision, "get_section", lambda name: cfg)
+    monkeypatch.setattr(precision, "bf16_supported", lambda: True)
+
+    assert resolve_precision("gpt2", "cpu") == "int8"
+    assert resolve_precision("gpt2", "cpu", precision="fp32") == "fp32"
+    assert resolve_precision("phi2", "cpu") == "bf16"
+    assert resolve_precision("mt5", "cpu") == "fp32"             # unknown mode
+    assert resolve_precision("phi2", "cuda", cuda_mode="fp16") == "fp16"
+
+    monkeypatch.setattr(precision, "bf16_supported", lambda: False)
+    assert resolve_precision("phi2", "cpu") == "fp32"
@@ -0,0 +1,22 @@
+import pytest
+from src.reasoning.profiles import ProfileLatency, get_profile
+
+
+def test_builtin_profiles():
+    assert get_profile("fast")["num_beams"] == 1
+    assert get_profile("quality")["num_beams"] >= get_profile("balanced")["num_beams"]
+
+    with pytest.raises(ValueError):
+        get_profile("turbo")
+
+
+def test_profile_latency_summary():
+    latency = ProfileLatency()
+    for seconds in (0.1, 0.2, 0.3):
+        latency.record("fast", seconds)
+    latency.record(None, 1.0)
+
+    summary = latency.summary()
+    assert summary["fast"]["count"] == 3
+    assert summary["fast"]["p50_ms"] == 200.0
+    assert summary["default"]["count"] == 1
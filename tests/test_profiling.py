@@ -0,0 +1,57 @@
+import json
+import pytest
+from contextlib import nullcontext
+from src.core.profiling import RequestProfiler, torch_trace
+
+
+def _work(n, scale=1):
+    return sum(i * scale for i in range(n))
+
+
+def test_profile_written_listed_and_pruned(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), max_files=2, torch=False)
+    ids = []
+    for n in (10, 20, 30):
+        result, profile_id = profiler.run(_work, n, scale=2, meta={"question": f"q{n}"})
+        assert result == _work(n, 2)
+        ids.append(profile_id)
+
+    listed = profiler.list()
+    assert [p["id"] for p in listed] == ids[:0:-1]   # newest two, newest first
+    assert listed[0]["question"] == "q30"
+    assert {"python.prof", "python.txt", "meta.json"} <= set(listed[0]["files"])
+    assert "_work" in open(profiler.file_path(ids[2], "python.txt"), encoding="utf-8").read()
+
+
+def test_file_path_rejects_other_paths(tmp_path):
+    profiler = RequestProfiler(str(tmp_path), torch=False)
+    _, profile_id = profiler.run(_work, 5)
+    assert profiler.file_path(profile_id, "meta.json")
+    assert profiler.file_path(profile_id, "../../etc/passwd") is None
+    assert profiler.file_path("..", "meta.json") is None
+
+
+def test_no_torch_trace_outside_a_profile():
+    assert isinstance(torch_trace(), nullcontext)
+    assert not RequestProfiler(sample_rate=0).wanted()
+    assert RequestProfiler(sample_rate=0).wanted(requested=True)
+
+
+def test_one_torch_trace_per_generate_call(tmp_path):
+    torch = pytest.importorskip("torch")
+    model = torch.nn.Linear(4, 4)
+
+    def answer():
+        for name in ("llm", "opus-mt"):
+            with torch_trace(name):
+                model(torch.ones(1, 4))
+
+    profiler = RequestProfiler(str(tmp_path))
+    _, profile_id = profiler.run(answer)
+
+    files = profiler.list()[0]["files"]
+    assert {"torch_trace-1.json", "torch_trace-2.json"} <= set(files)
+    with open(profiler.file_path(profile_id, "meta.json"), encoding="utf-8") as f:
+        traces = json.load(f)["torch_traces"]
+    assert [(t["file"], t["model"]) for t in traces] == [("torch_trace-1.json", "llm"), ("torch_trace-2.json", "opus-mt")]
+    assert profiler.file_path(profile_id, "torch_trace-2.json")
@@ -0,0 +1,84 @@
+import asyncio
+import glob
+import os
+import time
+from src.api.recorder import TrafficRecorder, read_records
+from src.bench.replay import evidence_agreement, summarize
+from src.cache.single_flight import AsyncSingleFlight
+from src.core.tracing import Trace, annotate, current_trace, stage, start_trace
+
+
+def test_record_rotate_and_read_back(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path), max_mb=400 / 2 ** 20, keep=2)
+    trace = Trace()
+    trace.annotate("lang", "roman")
+    trace.annotate("chunk_ids", ["a_1", "a_2"])
+    trace.add_stage("search", 0.002)
+
+    for i in range(20):
+        recorder.record(f"sawal {i}", 200, 100.0 - i, trace=trace, index_version="v1")
+    assert recorder.flush()
+
+    assert len(glob.glob(os.path.join(tmp_path, "traffic-*-*.jsonl.gz"))) <= 2
+    records = read_records(str(tmp_path))
+    assert records and records == sorted(records, key=lambda r: r["t"])
+    assert records[-1]["q"] == "sawal 19"
+    assert records[-1]["lang"] == "roman" and records[-1]["ids"] == ["a_1", "a_2"]
+    assert records[-1]["stages"] == {"search": 2.0}
+
+
+def test_record_is_stamped_with_arrival_time(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path))
+    before = time.time()
+    recorder.record("sawal", 200, 2000.0)
+    assert recorder.flush()
+
+    (record,) = read_records(str(tmp_path))
+    assert before - 2.1 <= record["t"] <= before - 1.9
+    assert recorder.stats()["recorded"] == 1
+
+
+def test_coalesced_request_recorded_with_the_leaders_notes(tmp_path):
+    recorder = TrafficRecorder(str(tmp_path))
+    flight = AsyncSingleFlight()
+
+    async def answer(question):
+        with stage("search"):
+            annotate("lang", "ur")
+            annotate("chunk_ids", ["a_1"])
+            await asyncio.sleep(0.02)
+        return {"answer": "x"}, current_trace()
+
+    async def request(question):
+        trace = start_trace()
+        (result, leader_trace), shared = await flight.do("q", answer, question)
+        if shared:
+            trace.adopt(leader_trace)
+        recorder.record(question, 200, 20.0, trace=trace, shared=shared)
+
+    async def burst():
+        await asyncio.gather(asyncio.create_task(request("leader")), asyncio.create_task(request("follower")))
+
+    asyncio.run(burst())
+    assert recorder.flush()
+
+    records = {r["q"]: r for r in read_records(str(tmp_path))}
+    assert records["follower"]["shared"] and not records["leader"]["shared"]
+    for record in records.values():
+        assert record["lang"] == "ur" and record["ids"] == ["a_1"]
+        assert "search" in record["stages"]
+
+
+def test_summaries():
+    rows = [
+        {"status": 200, "ms": 100, "lang": "ur", "cache": "exact"},
+        {"status": 200, "ms": 300, "lang": "en", "cache": None},
+        {"status": 503, "ms": 5, "lang": "en"},
+    ]
+    summary = summarize(rows)
+    assert summary["error_rate"] == round(1 / 3, 4)
+    assert summary["cache_hit_rate"] == 0.5
+    assert set(summary["languages"]) == {"ur", "en"}
+
+    agreement = evidence_agreement([(["a", "b"], ["a", "c"]), (["x"], ["y"]), (None, ["z"])])
+    assert agreement == {"compared": 2, "top1": 0.5, "jaccard": round((1 / 3) / 2, 4)}
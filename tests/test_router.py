@@ -0,0 +1,131 @@
+import time
+import pytest
+import src.core.model_pool as model_pool
+from src.core.deadline import deadline_after
+from src.core.model_pool import ModelPool
+from src.reasoning.router import ReasonerRouter, _continuation
+
+
+class FakeModel:
+    def __init__(self, name, delay=0.0, fail=False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+
+    def generate(self, prompt, max_length=256, deadline=None, profile=None, **decoding):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("out of memory")
+        return f"{self.name}: {prompt}"
+
+    def generate_batch(self, prompts, **options):
+        return [self.generate(p, **options) for p in prompts]
+
+
+BACKENDS = {
+    "small": {"kind": "seq2seq", "languages": ["en", "roman"], "quality": 1, "prior_ms": 100},
+    "multi": {"kind": "stub", "languages": ["ur", "hi", "en", "roman"], "tiers": ["default", "quality"],
+              "quality": 2, "prior_ms": 120},
+}
+
+
+def _router(monkeypatch, tmp_path, models, backends=BACKENDS, **kwargs):
+    monkeypatch.setattr(model_pool, "resident_bytes", lambda obj: 0)
+    loaders = {kind: (lambda cfg, kind=kind: models[kind]) for kind in models}
+    return ReasonerRouter(backends, pool=ModelPool(offload_dir=str(tmp_path)), loaders=loaders, **kwargs)
+
+
+def test_routes_by_language_tier_and_quality(monkeypatch, tmp_path):
+    router = _router(monkeypatch, tmp_path, {"seq2seq": FakeModel("small"), "stub": FakeModel("multi")})
+
+    assert router.generate("sawal", lang="ur").startswith("multi")            # only multi serves Urdu
+    assert router.generate("question", lang="en").startswith("multi")         # better, within slack
+    assert router.generate("question", lang="en", profile="fast").startswith("small")
+    # a tier the language's only backend does not list still stays with that backend
+    assert router.generate("sawal", lang="ur", profile="fast").startswith("multi")
+
+    router = _router(monkeypatch, tmp_path, {"seq2seq": FakeModel("small"), "stub": FakeModel("multi")})
+    assert [b.name for b in router.rank("en", "quality", deadline=deadline_after(0.11))] == ["small", "multi"]
+
+
+def test_moving_latency_steers_away_from_slow_backend(monkeypatch, tmp_path):
+    slow = FakeModel("multi", delay=0.3)
+    router = _router(monkeypatch, tmp_path, {"seq2seq": FakeModel("small"), "stub": slow})
+
+    assert router.generate("question", lang="en").startswith("multi")
+    assert router.stats()["multi"]["ewma_ms"] >= 300
+    assert router.generate("question", lang="en").startswith("small")
+    # languages only the slow backend serves still go to it
+    assert router.generate("sawal", lang="hi").startswith("multi")
+
+
+def test_in_flight_calls_count_as_queue(monkeypatch, tmp_path):
+    backends = {"small": dict(BACKENDS["small"], prior_ms=100),
+                "multi": dict(BACKENDS["multi"], prior_ms=100, max_in_flight=1)}
+    router = _router(monkeypatch, tmp_path, {"seq2seq": FakeModel("small"), "stub": FakeModel("multi")}, backends)
+    router.backends["multi"].in_flight = 1
+    assert [b.name for b in router.rank("en")] == ["small", "multi"]
+
+
+def test_failure_falls_back_and_is_penalized(monkeypatch, tmp_path):
+    router = _router(monkeypatch, tmp_path, {"seq2seq": FakeModel("small"), "stub": FakeModel("multi", fail=True)})
+
+    assert router.generate("question", lang="en").startswith("small")
+    stats = router.stats()["multi"]
+    assert stats["errors"] == 1 and stats["ewma_ms"] >= 240
+
+    with pytest.raises(RuntimeError):
+        router.generate("sawal", lang="ur")     # the only backend for Urdu is failing
+
+def test_batch_groups_by_language(monkeypatch, tmp_path):
+    router = _router(monkeypatch, tmp_path, {"seq2seq": FakeModel("small"), "stub": FakeModel("multi")})
+    out = router.generate_batch(["a", "b", "c"], lang=["en", "ur", "en"], profile="fast")
+    assert [o.split(":")[0] for o in out] == ["small", "multi", "small"]
+
+
+def test_continuation_strips_prompt():
+    assert _continuation("Question: x\nAnswer:", "Question: x\nAnswer: forty") == "forty"
+    assert _continuation("Evidence\nAnswer:", "Evidence (trimmed)\nAnswer: yes") == "yes"
+
+
+def test_deadline_and_length_reach_every_backend_kind(monkeypatch, tmp_path):
+    seen = {}
+
+    class CausalModel:
+        def __init__(self, kind):
+            self.kind = kind
+
+        def generate(self, prompt, **options):
+            seen[self.kind] = options
+            return prompt + " jawab" if self.kind != "mt5" else "jawab"
+
+    deadline = deadline_after(5)
+    for kind in ("mt5", "gpt2", "phi2"):
+        router = _router(monkeypatch, tmp_path, {kind: CausalModel(kind)}, backends={kind: {}})
+        assert router.generate("sawal", max_length=32, deadline=deadline, profile="fast") == "jawab"
+        assert seen[kind] == {"profile": "fast", "max_new_tokens": 32, "deadline": deadline}
+
+
+def test_model_load_is_not_a_latency_sample(monkeypatch, tmp_path):
+    monkeypatch.setattr(model_pool, "resident_bytes", lambda obj: 0)
+
+    def slow_load(cfg):
+        time.sleep(0.3)
+        return FakeModel("multi")
+
+    router = ReasonerRouter({"multi": BACKENDS["multi"]}, pool=ModelPool(offload_dir=str(tmp_path)),
+                            loaders={"stub": slow_load})
+    assert router.generate("sawal", lang="ur").startswith("multi")
+    assert router.stats()["multi"]["ewma_ms"] < 100
+
+
+def test_idle_backend_decays_back_to_prior(monkeypatch, tmp_path):
+    router = _router(monkeypatch, tmp_path, {"seq2seq": FakeModel("small"), "stub": FakeModel("multi")},
+                     decay_s=0.05)
+    backend = router.backends["multi"]
+    backend.observe(10.0)                      # one slow spike
+    assert [b.name for b in router.rank("en")][0] == "small"
+
+    time.sleep(0.5)
+    assert abs(backend.expected() - 0.12) < 0.05
+    assert router.generate("question", lang="en").startswith("multi")
@@ -0,0 +1,68 @@
+import pytest
+
+np = pytest.importorskip("numpy")
+pytest.importorskip("faiss")
+from src.cache.semantic_cache import SemanticCache
+
+
+def _vec(*values):
+    v = np.zeros(4, dtype="float32")
+    v[:len(values)] = values
+    return v / np.linalg.norm(v)
+
+
+def test_lookup_threshold():
+    cache = SemanticCache(4, threshold=0.95)
+    cache.add(_vec(1, 0), "en", "What is imaan?", "answer", ["a"])
+
+    hit = cache.lookup(_vec(1, 0.1), "en")
+    assert hit["value"] == "answer" and hit["score"] >= 0.95
+    assert cache.lookup(_vec(1, 1), "en") is None
+
+
+def test_language_and_profile_isolation():
+    cache = SemanticCache(4, threshold=0.9)
+    cache.add(_vec(1, 0), "en", "q", "english", ["a"])
+    cache.add(_vec(1, 0), "ur", "q", "urdu", ["a"], profile="fast")
+
+    assert cache.lookup(_vec(1, 0), "en")["value"] == "english"
+    assert cache.lookup(_vec(1, 0), "ur") is None
+    assert cache.lookup(_vec(1, 0), "ur", "fast")["value"] == "urdu"
+    assert cache.lookup(_vec(1, 0), "en", "fast") is None
+
+
+def test_version_change_clears():
+    cache = SemanticCache(4)
+    cache.check_version("v1")
+    cache.add(_vec(1, 0), "en", "q", "old", ["a"])
+    cache.check_version("v1")
+    assert cache.lookup(_vec(1, 0), "en") is not None
+    cache.check_version("v2")
+    assert cache.lookup(_vec(1, 0), "en") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_failed_audit_evicts_entry():
+    cache = SemanticCache(4, threshold=0.9, min_overlap=0.5)
+    cache.add(_vec(1, 0), "en", "What is imaan?", "answer", ["a", "b"])
+
+    hit = cache.lookup(_vec(1, 0), "en")
+    assert cache.audit("What is imaan?", hit, ["a", "b"])
+    assert cache.lookup(_vec(1, 0), "en") is not None
+
+    hit = cache.lookup(_vec(1, 0), "en")
+    assert not cache.audit("What is namaz?", hit, ["x", "y"])
+    assert cache.lookup(_vec(1, 0), "en") is None
+    stats = cache.stats()
+    assert stats["entries"] == 0 and stats["false_hits"] == 1
+
+
+def test_unsampled_audit_still_evicts():
+    cache = SemanticCache(4, threshold=0.9, min_overlap=0.5)
+    cache.add(_vec(1, 0), "en", "What is imaan?", "answer", ["a", "b"])
+
+    hit = cache.lookup(_vec(1, 0), "en")
+    assert not cache.audit("What is namaz?", hit, ["x"], record=False)
+    assert cache.lookup(_vec(1, 0), "en") is None
+    stats = cache.stats()
+    assert stats["rejected"] == 1 and stats["audits"] == 0 and stats["false_hits"] == 0
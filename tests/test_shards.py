@@ -0,0 +1,68 @@
+import os
+import pickle
+import pytest
+from src.retrieval.shards import LocalShardCluster, ShardedSearcher, assign_shards, merge_topk, split_bundle
+from src.vectorstore.bundle import CHUNKS_FILE, INDEX_FILE, bundle_dir, publish, write_manifest
+
+
+def test_merge_topk_orders_hits_across_shards():
+    shard_a = [[{"chunk_id": "a1", "score": 0.9}, {"chunk_id": "a2", "score": 0.4}]]
+    shard_b = [[{"chunk_id": "b1", "score": 0.7}]]
+
+    merged = merge_topk([shard_a, shard_b], top_k=2)
+
+    assert [hit["chunk_id"] for hit in merged[0]] == ["a1", "b1"]
+
+
+def test_playlist_partition_keeps_playlists_together():
+    chunks = (
+        [{"chunk_id": f"p1_{i}", "playlist_id": "p1"} for i in range(4)]
+        + [{"chunk_id": f"p2_{i}", "playlist_id": "p2"} for i in range(3)]
+        + [{"chunk_id": "v_0", "playlist_id": None, "video_id": "v"}]
+    )
+
+    assignment = assign_shards(chunks, 2, by="playlist")
+
+    assert len(set(assignment[:4])) == 1
+    assert len(set(assignment[4:7])) == 1
+    assert assignment[0] != assignment[4]
+
+
+class _NoEncoder:
+    def get_sentence_embedding_dimension(self):
+        return 8
+
+
+def test_scatter_gather_matches_flat_index_and_survives_lost_shard(tmp_path):
+    faiss = pytest.importorskip("faiss")
+    np = pytest.importorskip("numpy")
+
+    rng = np.random.default_rng(0)
+    vectors = rng.normal(size=(60, 8)).astype("float32")
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    chunks = [{"chunk_id": f"c{i}", "text_roman": f"chunk {i}"} for i in range(60)]
+
+    root = str(tmp_path)
+    path = bundle_dir(root, "v1")
+    os.makedirs(path)
+    flat = faiss.IndexFlatIP(8)
+    flat.add(vectors)
+    faiss.write_index(flat, os.path.join(path, INDEX_FILE))
+    with open(os.path.join(path, CHUNKS_FILE), "wb") as f:
+        pickle.dump(chunks, f)
+    write_manifest(path, "test-encoder", 8, 60)
+    publish(root, "v1")
+    split_bundle(root, 3)
+
+    query = vectors[:2] + 0.1
+    _, expected = flat.search(query, 5)
+
+    with LocalShardCluster(root, 3, base_port=18201) as cluster:
+        searcher = ShardedSearcher(cluster.endpoints, timeout=2.0, model=_NoEncoder())
+        results = searcher.search_batch(["q1", "q2"], top_k=5, embeddings=query)
+        for row, ids in zip(results, expected):
+            assert [hit["chunk_id"] for hit in row] == [f"c{i}" for i in ids]
+
+        cluster.kill(1)
+        partial = searcher.search_batch(["q1"], top_k=5, embeddings=query[:1])
+        assert partial[0] and all(hit["shard"] != 1 for hit in partial[0])
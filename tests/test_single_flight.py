@@ -0,0 +1,82 @@
+import asyncio
+import pytest
+from src.cache.single_flight import AsyncSingleFlight
+
+
+def test_concurrent_calls_share_one_execution():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow_answer(question):
+        calls.append(question)
+        await asyncio.sleep(0.1)
+        return {"answer": question.upper()}
+
+    async def main():
+        results = await asyncio.gather(*(flight.do("imaan", slow_answer, "what is imaan") for _ in range(5)))
+        return results, flight.stats()["in_flight"]
+
+    results, in_flight = asyncio.run(main())
+
+    assert calls == ["what is imaan"]
+    assert all(result == {"answer": "WHAT IS IMAAN"} for result, _ in results)
+    assert sorted(shared for _, shared in results) == [False, True, True, True, True]
+    assert in_flight == 0
+    assert flight.stats() == {"in_flight": 0, "leaders": 1, "coalesced": 4}
+
+
+def test_followers_see_the_leader_error():
+    flight = AsyncSingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.05)
+        raise RuntimeError("generation failed")
+
+    async def main():
+        return await asyncio.gather(flight.do("q", failing), flight.do("q", failing), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert [str(e) for e in errors] == ["generation failed", "generation failed"]
+
+
+def test_cancelled_follower_leaves_the_shared_call_running():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def slow_answer():
+        calls.append(1)
+        await asyncio.sleep(0.1)
+        return "jawab"
+
+    async def main():
+        leader = asyncio.ensure_future(flight.do("q", slow_answer))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(flight.do("q", slow_answer))
+        await asyncio.sleep(0.01)
+        follower.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await follower
+        return await leader
+
+    assert asyncio.run(main()) == ("jawab", False)
+    assert calls == [1]
+
+
+def test_key_removed_once_the_call_completes():
+    flight = AsyncSingleFlight()
+    calls = []
+
+    async def answer():
+        calls.append(1)
+        return "jawab"
+
+    async def main():
+        first = await flight.do("q", answer)
+        await asyncio.sleep(0)      # done callbacks run on the next loop iteration
+        in_flight = flight.stats()["in_flight"]
+        second = await flight.do("q", answer)
+        return first, in_flight, second
+
+    first, in_flight, second = asyncio.run(main())
+    assert first == ("jawab", False) and second == ("jawab", False)
+    assert in_flight == 0 and calls == [1, 1]
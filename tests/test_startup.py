@@ -0,0 +1,34 @@
+import time
+from src.core.startup import Startup
+
+
+def test_background_load_reports_component_times():
+    startup = Startup()
+
+    def load(state):
+        with state.timed("llm"):
+            time.sleep(0.05)
+        with state.timed("retriever"):
+            pass
+
+    startup.run_in_background(load)
+
+    assert startup.wait(5)
+    report = startup.report()
+    assert report["state"] == "ready"
+    assert list(report["components_s"]) == ["llm", "retriever"]
+    assert report["components_s"]["llm"] >= 0.05
+
+
+def test_failed_load_is_not_ready():
+    startup = Startup()
+
+    def load(state):
+        raise FileNotFoundError("faiss.index")
+
+    startup.run_in_background(load)
+    startup._thread.join(5)
+
+    assert not startup.ready
+    assert startup.report()["state"] == "failed"
+    assert "faiss.index" in startup.report()["error"]
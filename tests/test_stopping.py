@@ -0,0 +1,25 @@
+import time
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+from src.reasoning.stopping import DeadlineCriteria, deadline_criteria
+
+
+def test_deadline_criteria_stops_once_the_deadline_passes():
+    criteria = DeadlineCriteria(time.monotonic() + 0.05)
+    input_ids = torch.zeros((2, 3), dtype=torch.long)
+
+    assert not criteria(input_ids, None).any()
+    assert not criteria.hit
+
+    time.sleep(0.06)
+    stop = criteria(input_ids, None)
+    assert stop.tolist() == [True, True]
+    assert criteria.hit
+
+
+def test_no_criteria_without_a_deadline():
+    assert deadline_criteria(None) == (None, None)
+    criteria, stopping = deadline_criteria(time.monotonic() + 10)
+    assert list(stopping) == [criteria]
@@ -0,0 +1,47 @@
+import sys
+import types
+from src.core import threads
+
+
+class FakeTorch(types.ModuleType):
+    def __init__(self):
+        super().__init__("torch")
+        self.threads = 8
+
+    def set_num_threads(self, n):
+        self.threads = n
+
+    def get_num_threads(self):
+        return self.threads
+
+    def set_num_interop_threads(self, n):
+        raise RuntimeError("already started")
+
+    def get_num_interop_threads(self):
+        return 1
+
+
+def test_configure_threads_leaves_unimported_libraries_alone(monkeypatch):
+    monkeypatch.setattr(threads, "thread_budget", lambda role=None: {"torch": 2, "faiss": 1, "tokenizers": 1})
+    monkeypatch.delitem(sys.modules, "torch", raising=False)
+    monkeypatch.delitem(sys.modules, "faiss", raising=False)
+    for name in ("OMP_NUM_THREADS", "MKL_NUM_THREADS", "RAYON_RS_NUM_CPUS", "TOKENIZERS_PARALLELISM"):
+        monkeypatch.setenv(name, "")
+
+    report = threads.configure_threads("api")
+
+    assert "torch" not in sys.modules and "faiss" not in sys.modules
+    assert "torch_threads" not in report
+    assert threads.os.environ["OMP_NUM_THREADS"] == "2"
+
+
+def test_library_threads_applied_once_imported(monkeypatch):
+    monkeypatch.setattr(threads, "thread_budget", lambda role=None: {"torch": 2, "torch_interop": 2, "faiss": 1})
+    monkeypatch.delitem(sys.modules, "faiss", raising=False)
+    torch = FakeTorch()
+    monkeypatch.setitem(sys.modules, "torch", torch)
+
+    report = threads.apply_library_threads("api")
+
+    assert torch.threads == 2
+    assert report["torch_threads"] == 2
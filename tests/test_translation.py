@@ -0,0 +1,61 @@
+import src.core.model_pool as model_pool
+from src.core.model_pool import ModelPool
+from src.translation.service import TranslationCache, TranslationService, split_sentences
+
+
+class FakeTranslator:
+    def __init__(self):
+        self.batches = []
+
+    def translate(self, texts, src, tgt, max_new_tokens=256, num_beams=1):
+        self.batches.append(list(texts))
+        return [f"<{tgt}>{t}" for t in texts]
+
+
+def _service(monkeypatch, tmp_path, translator, cache=True, **kwargs):
+    monkeypatch.setattr(model_pool, "resident_bytes", lambda obj: 0)
+    loaded = []
+
+    def loader(model_id):
+        loaded.append(model_id)
+        return translator
+
+    service = TranslationService(
+        models={"ur-en": "opus-ur-en"}, fallback="mbart",
+        cache=TranslationCache(str(tmp_path / "tr.sqlite")) if cache else None,
+        pool=ModelPool(offload_dir=str(tmp_path / "offload")), loader=loader, **kwargs
+    )
+    return service, loaded
+
+
+def test_split_sentences_round_trips():
+    text = "Pehla jumla۔ Doosra jumla? Third one.\n\n📖 42\nLast"
+    parts = split_sentences(text)
+    assert "".join(parts) == text
+    assert "Pehla jumla۔" in parts and "Third one." in parts and "Last" in parts
+
+
+def test_batches_sorted_by_length_and_cached(monkeypatch, tmp_path):
+    translator = FakeTranslator()
+    service, loaded = _service(monkeypatch, tmp_path, translator, batch_size=2)
+
+    out = service.translate_batch(["A long first sentence. Short. Mid one.", "Short."], "en", "ur")
+    assert out == ["<ur>A long first sentence. <ur>Short. <ur>Mid one.", "<ur>Short."]
+    assert translator.batches == [["Short.", "Mid one."], ["A long first sentence."]]
+    assert loaded == ["mbart"]
+
+    # a second service on the same file: everything comes from the cache
+    again, _ = _service(monkeypatch, tmp_path, FakeTranslator())
+    assert again.translate("Mid one. Short.", "en", "ur") == "<ur>Mid one. <ur>Short."
+    assert again.stats()["translated"] == 0 and again.cache.stats()["hits"] == 2
+
+
+def test_pair_models_and_unsupported_languages(monkeypatch, tmp_path):
+    translator = FakeTranslator()
+    service, loaded = _service(monkeypatch, tmp_path, translator, cache=False)
+
+    assert service.translate("Sawal", "ur", "en") == "<en>Sawal"
+    assert loaded == ["opus-ur-en"]
+    assert service.translate("Namaz kya hai", "roman", "en") == "Namaz kya hai"
+    assert service.translate("Same", "en", "en") == "Same"
+    assert service.translate("📖 123", "en", "hi") == "📖 123"